@@ -1,41 +1,195 @@
 import sys
 import os
+import json
+import time
+import logging
+import importlib
+import threading
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
-from app.ai.dataset_generator import DatasetGenerator
-from app.ai.nlp_extractor import NLPExtractor
-from app.ai.risk_predictor import RiskPredictor
-from app.ai.report_generator import ReportGenerator
-from app.ai.chatbot import DPRChatbot
 from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+from app.ai.prediction_cache import PredictionCache
+from app.ai.report_cache import REPORT_FILENAMES, portfolio_report_key, report_key
+from app.ai.report_payload import ReportPayloadCache, analytical_payload, payload_key
+from app.utils.normalization import ensure_normalized, normalize_extraction
 
-from app.ai.specialized_dpr_extractor import SpecializedDPRExtractor
+logger = logging.getLogger(__name__)
+
+# Sample DPR used to exercise the extraction, prediction and chart paths during warm-up
+WARM_UP_DPR_TEXT = """
+Project Title: Road Construction in Assam
+Department: Public Works Department
+Duration: 18 months
+Estimated Cost: ₹150 crore
+Contingency: ₹10 crore
+Start Date: 01/06/2024
+End Date: 01/12/2025
+Number of Employees: 150
+State: Assam
+District: Guwahati
+Risk Zone: Flood prone area
+Guidelines Followed: Yes
+"""
+
+if TYPE_CHECKING:
+    from app.ai.dataset_generator import DatasetGenerator
+    from app.ai.nlp_extractor import NLPExtractor
+    from app.ai.risk_predictor import RiskPredictor
+    from app.ai.report_generator import ReportGenerator
+    from app.ai.report_store import ReportStore
+    from app.ai.chatbot import DPRChatbot
+    from app.ai.specialized_dpr_extractor import SpecializedDPRExtractor
 
 
 class AIService:
     """
     Main AI service that integrates all AI/NLP components
+
+    Components are created on first use, so a route that only needs the
+    chatbot never pays for spaCy or the XGBoost models. Use
+    get_ai_service() to share one instance across the whole process.
+    Component modules are imported inside the factory as well, which keeps
+    matplotlib, reportlab, pandas, xgboost and spaCy out of startup.
     """
     
+    # Component name -> (module, class)
+    COMPONENTS = {
+        'dataset_generator': ('app.ai.dataset_generator', 'DatasetGenerator'),
+        'nlp_extractor': ('app.ai.nlp_extractor', 'NLPExtractor'),
+        'risk_predictor': ('app.ai.risk_predictor', 'RiskPredictor'),
+        'report_generator': ('app.ai.report_generator', 'ReportGenerator'),
+        'chatbot': ('app.ai.chatbot', 'DPRChatbot'),
+        'specialized_extractor': ('app.ai.specialized_dpr_extractor', 'SpecializedDPRExtractor')
+    }
+    
     def __init__(self):
-        self.dataset_generator = DatasetGenerator()
-        self.nlp_extractor = NLPExtractor()
-        self.risk_predictor = RiskPredictor()
-        self.report_generator = ReportGenerator()
-        self.chatbot = DPRChatbot()
-        # Add the specialized extractor
-        self.specialized_extractor = SpecializedDPRExtractor()
+        self._components = {}
+        self._locks = {name: threading.Lock() for name in self.COMPONENTS}
+        self._reload_lock = threading.Lock()
+        self.prediction_cache = PredictionCache()
+        self.report_payload_cache = ReportPayloadCache()
+        self._report_store = None
+    
+    def _get_component(self, name: str):
+        """
+        Return a component, creating it exactly once even under concurrent first use
+        """
+        component = self._components.get(name)
+        if component is None:
+            with self._locks[name]:
+                component = self._components.get(name)
+                if component is None:
+                    module_name, class_name = self.COMPONENTS[name]
+                    component_class = getattr(importlib.import_module(module_name), class_name)
+                    component = component_class()
+                    self._components[name] = component
+        return component
+    
+    @property
+    def dataset_generator(self) -> 'DatasetGenerator':
+        return self._get_component('dataset_generator')
+    
+    @property
+    def nlp_extractor(self) -> 'NLPExtractor':
+        return self._get_component('nlp_extractor')
+    
+    @property
+    def risk_predictor(self) -> 'RiskPredictor':
+        return self._get_component('risk_predictor')
+    
+    @property
+    def report_generator(self) -> 'ReportGenerator':
+        return self._get_component('report_generator')
+    
+    @report_generator.setter
+    def report_generator(self, generator: 'ReportGenerator'):
+        self._components['report_generator'] = generator
+    
+    @property
+    def report_store(self) -> 'ReportStore':
+        """
+        Where report PDFs are kept, get_report_store() unless one was assigned
+        """
+        if self._report_store is None:
+            from app.ai.report_store import get_report_store
+            self._report_store = get_report_store()
+        return self._report_store
+    
+    @report_store.setter
+    def report_store(self, store: 'ReportStore'):
+        self._report_store = store
+    
+    @property
+    def chatbot(self) -> 'DPRChatbot':
+        return self._get_component('chatbot')
+    
+    @property
+    def specialized_extractor(self) -> 'SpecializedDPRExtractor':
+        return self._get_component('specialized_extractor')
+    
+    def loaded_components(self) -> List[str]:
+        """
+        Names of the components that have been initialized so far
+        """
+        return [name for name in self.COMPONENTS if name in self._components]
+    
+    def reload_risk_predictor(self) -> 'RiskPredictor':
+        """
+        Load the registry's active model version and swap it in
+
+        The new predictor is fully loaded before a single reference swap makes
+        it visible, so requests never see a half-loaded model; predictions
+        already running finish on the previous one.
+        """
+        with self._reload_lock:
+            module_name, class_name = self.COMPONENTS['risk_predictor']
+            predictor = getattr(importlib.import_module(module_name), class_name)()
+            self._components['risk_predictor'] = predictor
+            self.prediction_cache.clear()
+        logger.info(f"Risk models reloaded: {predictor.model_info()}")
+        return predictor
+    
+    def preload(self, components: Tuple[str, ...] = None) -> None:
+        """
+        Initialize components ahead of first use (all of them by default)
+        """
+        for name in components or self.COMPONENTS:
+            getattr(self, name)
+    
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Load the models and run one dummy extraction, prediction and chart render
+
+        Returns the seconds spent on each step.
+        """
+        timings = {}
+        
+        def timed(step, func):
+            start = time.perf_counter()
+            result = func()
+            timings[step] = time.perf_counter() - start
+            logger.info(f"Warm-up: {step} took {timings[step]:.2f}s")
+            return result
+        
+        timed('load_extractor', lambda: self.specialized_extractor)
+        extraction = timed('extraction', lambda: self.specialized_extractor.extract_entities(WARM_UP_DPR_TEXT))
+        timed('load_risk_models', lambda: self.risk_predictor)
+        risk_scores = timed('prediction', lambda: self.predict_dpr_risks(extraction))
+        timed('load_report_generator', lambda: self.report_generator)
+        timed('chart_render', lambda: self.report_generator._chart('risk', risk_scores))
+        
+        logger.info(f"Warm-up finished in {sum(timings.values()):.2f}s")
+        return timings
     
     def generate_training_dataset(self, size: int = 1000, filename: str = "dpr_training_dataset.csv") -> str:
         """
         Generate synthetic training dataset
         """
         print(f"Generating training dataset with {size} samples...")
-        dataset = self.dataset_generator.generate_dataset(size)
-        self.dataset_generator.save_dataset_to_csv(dataset, filename)
+        self.dataset_generator.write_dataset(filename, size)
         print(f"Dataset saved to {filename}")
         return filename
     
@@ -47,6 +201,8 @@ class AIService:
         print("Extracting entities from DPR text...")
         # Use the specialized extractor which handles both generic and special cases
         extraction = self.specialized_extractor.extract_entities(text)
+        # Parse cost, contingency and duration once; features and sorting use the numbers
+        extraction = normalize_extraction(extraction)
         print("Entity extraction completed.")
         return extraction
     
@@ -56,7 +212,24 @@ class AIService:
         """
         print("Predicting DPR risks...")
         # Extract features for risk prediction
-        features = {
+        features = self.dpr_features(extraction)
+        
+        # Predict risks using trained models, reusing earlier predictions for the same features
+        predictor = self.risk_predictor
+        key = self.prediction_cache.key((predictor.version, predictor.loaded_at), predictor.features_to_array(features))
+        risk_scores = self.prediction_cache.get(key)
+        if risk_scores is None:
+            risk_scores = predictor.predict_risks(features)
+            self.prediction_cache.put(key, risk_scores)
+        print("Risk prediction completed.")
+        return risk_scores
+    
+    def dpr_features(self, extraction: EnhancedDPRExtraction) -> Dict[str, float]:
+        """
+        Risk model features for a DPR, with defaults for anything not extracted
+        """
+        extraction = ensure_normalized(extraction)
+        return {
             'contingency_ratio': self._calculate_contingency_ratio(extraction),
             'duration_months': self._extract_duration_months(extraction),
             'num_employees': extraction.num_employees or 50,
@@ -65,17 +238,13 @@ class AIService:
             'compliance_score': 1 if extraction.guidelines_followed else 0,
             'missing_docs_count': len(extraction.missing_documents) if extraction.missing_documents else 0
         }
-        
-        # Predict risks using trained models
-        risk_scores = self.risk_predictor.predict_risks(features)
-        print("Risk prediction completed.")
-        return risk_scores
     
-    def calculate_completeness_score(self, extraction: EnhancedDPRExtraction) -> float:
+    def calculate_completeness_score(self, extraction: EnhancedDPRExtraction, verbose: bool = True) -> float:
         """
         Calculate completeness score based on presence of key sections
         """
-        print("Calculating completeness score...")
+        if verbose:
+            print("Calculating completeness score...")
         
         # Define key sections that should be present in a complete DPR
         key_sections = [
@@ -99,14 +268,17 @@ class AIService:
         
         # Calculate completeness score (0-100)
         completeness_score = (present_sections / len(key_sections)) * 100
-        print(f"Completeness score: {completeness_score:.2f}%")
+        if verbose:
+            print(f"Completeness score: {completeness_score:.2f}%")
         return completeness_score
     
-    def generate_recommendations(self, risk_scores: Dict[str, float], completeness_score: float = 100.0) -> List[Recommendation]:
+    def generate_recommendations(self, risk_scores: Dict[str, float], completeness_score: float = 100.0,
+                                 verbose: bool = True) -> List[Recommendation]:
         """
         Generate recommendations based on risk scores and completeness
         """
-        print("Generating recommendations...")
+        if verbose:
+            print("Generating recommendations...")
         recommendations = []
         
         # Generate recommendations based on risk scores
@@ -184,9 +356,89 @@ class AIService:
                 priority="Low"
             ))
         
-        print(f"Generated {len(recommendations)} recommendations.")
+        if verbose:
+            print(f"Generated {len(recommendations)} recommendations.")
         return recommendations
     
+    def report_key(self,
+                   report_type: str,
+                   extraction: EnhancedDPRExtraction,
+                   risk_scores: Dict[str, float],
+                   recommendations: List[Recommendation]) -> str:
+        """
+        Content key of a report, as the report store files it
+        """
+        return report_key(report_type, extraction, risk_scores, recommendations,
+                          self.report_generator.template_id)
+
+    def get_or_generate_report(self,
+                               report_type: str,
+                               dpr_id: str,
+                               extraction: EnhancedDPRExtraction,
+                               risk_scores: Dict[str, float],
+                               recommendations: List[Recommendation]) -> Tuple[str, str]:
+        """
+        Return (filename, key) of a DPR's 'analytical' or 'recommendation' report
+
+        The PDF is kept in the report store under `key`, and only rendered
+        when the store has none with the same inputs. Concurrent calls for
+        the same report, in any thread, process or node sharing the store,
+        render it once; the others wait and find it stored. `filename` is
+        the name the DPR's report is downloaded as; record both on the DPR.
+        """
+        key = self.report_key(report_type, extraction, risk_scores, recommendations)
+        filename = REPORT_FILENAMES[report_type].format(dpr_id=dpr_id)
+        generator = self.report_generator
+        render = (generator.generate_analytical_report if report_type == 'analytical'
+                  else generator.generate_recommendation_report)
+        self._store_report(report_type, key,
+                           lambda path: render(dpr_id, extraction, risk_scores, recommendations, path))
+        return filename, key
+
+    def get_or_generate_portfolio_report(self, summary: dict) -> str:
+        """
+        Return the report store key of the portfolio report for `summary`
+        (portfolio_risk.portfolio_summary), rendering it if it is not stored
+        """
+        key = portfolio_report_key(summary, self.report_generator.template_id)
+        self._store_report('portfolio', key, lambda path: self.report_generator.generate_portfolio_report(summary, path))
+        return key
+
+    def _store_report(self, report_type: str, key: str, render) -> None:
+        if self.report_store.exists(key):
+            return
+        with self.report_store.lock(key):
+            if not self.report_store.exists(key):
+                print(f"Generating {report_type} report...")
+                self.report_store.put(key, render)
+                print(f"{report_type.capitalize()} report stored as {key}")
+
+    def analytical_payload_json(self, dpr_id: str, extraction_data: dict,
+                                risk_scores: Dict[str, float]) -> Tuple[str, bytes]:
+        """
+        Return (key, JSON) of the analytical report payload of a DPR's stored analysis
+
+        The JSON is built once per key and then served from report_payload_cache.
+        """
+        key = payload_key(dpr_id, extraction_data, risk_scores)
+        body = self.report_payload_cache.get(key)
+        if body is None:
+            payload = analytical_payload(dpr_id, EnhancedDPRExtraction(**extraction_data), risk_scores)
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.report_payload_cache.put(key, body)
+        return key, body
+
+    def render_report(self,
+                      report_type: str,
+                      dpr_id: str,
+                      extraction: EnhancedDPRExtraction,
+                      risk_scores: Dict[str, float],
+                      recommendations: List[Recommendation]) -> bytes:
+        """
+        Build a report in memory and return the PDF bytes, bypassing the report store
+        """
+        return self.report_generator.render_report(report_type, dpr_id, extraction, risk_scores, recommendations)
+
     def generate_analytical_report(self, 
                                  dpr_id: str,
                                  extraction: EnhancedDPRExtraction,
@@ -195,12 +447,7 @@ class AIService:
         """
         Generate analytical report with heatmaps
         """
-        print("Generating analytical report...")
-        filename = self.report_generator.generate_analytical_report(
-            dpr_id, extraction, risk_scores, recommendations
-        )
-        print(f"Analytical report saved as {filename}")
-        return filename
+        return self.get_or_generate_report('analytical', dpr_id, extraction, risk_scores, recommendations)[0]
     
     def generate_recommendation_report(self,
                                      dpr_id: str,
@@ -210,12 +457,7 @@ class AIService:
         """
         Generate recommendation report
         """
-        print("Generating recommendation report...")
-        filename = self.report_generator.generate_recommendation_report(
-            dpr_id, extraction, risk_scores, recommendations
-        )
-        print(f"Recommendation report saved as {filename}")
-        return filename
+        return self.get_or_generate_report('recommendation', dpr_id, extraction, risk_scores, recommendations)[0]
     
     def answer_dpr_question(self, 
                            question: str,
@@ -260,35 +502,131 @@ class AIService:
         """
         Calculate contingency ratio for risk prediction
         """
-        try:
-            if extraction.contingency and extraction.estimated_cost:
-                # Extract numeric values
-                contingency_text = extraction.contingency.lower().replace('₹', '').replace('crore', '').replace('lakh', '').strip()
-                estimated_text = extraction.estimated_cost.lower().replace('₹', '').replace('crore', '').replace('lakh', '').strip()
-                
-                contingency_value = float(contingency_text.split()[0]) if contingency_text.split() else 0
-                estimated_value = float(estimated_text.split()[0]) if estimated_text.split() else 0
-                
-                return contingency_value / estimated_value if estimated_value > 0 else 0
-        except:
-            pass
+        if extraction.contingency_inr is not None and extraction.estimated_cost_inr:
+            return extraction.contingency_inr / extraction.estimated_cost_inr
         return 0.05  # Default 5% contingency
     
-    def _extract_duration_months(self, extraction: EnhancedDPRExtraction) -> int:
+    def _extract_duration_months(self, extraction: EnhancedDPRExtraction) -> float:
         """
         Extract duration in months for risk prediction
         """
+        return extraction.duration_months or 12  # Default 12 months
+
+_ai_service = None
+_ai_service_lock = threading.Lock()
+
+
+def get_ai_service() -> AIService:
+    """
+    Return the process-wide AIService, creating it on first call
+    """
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                _ai_service = AIService()
+    return _ai_service
+
+# Warm-up progress: pending -> running -> done / failed, or disabled
+_warm_up_state = {"status": "pending", "timings": {}, "error": None}
+
+
+def run_warm_up():
+    """
+    Warm up the shared AI service in the calling thread, recording progress for /ready
+    """
+    _warm_up_state["status"] = "running"
+    try:
+        _warm_up_state["timings"] = get_ai_service().warm_up()
+        _warm_up_state["status"] = "done"
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        _warm_up_state.update(status="failed", error=str(e))
+
+
+def start_warm_up() -> threading.Thread:
+    """
+    Warm up the shared AI service in a background thread
+    """
+    thread = threading.Thread(target=run_warm_up, name="ai-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def disable_warm_up():
+    """
+    Mark warm-up as skipped so readiness does not wait for it
+    """
+    _warm_up_state["status"] = "disabled"
+
+
+def get_warm_up_state() -> dict:
+    """
+    Return the warm-up status and per-step timings
+    """
+    return {
+        "status": _warm_up_state["status"],
+        "timings": dict(_warm_up_state["timings"]),
+        "error": _warm_up_state["error"]
+    }
+
+
+def is_warm_up_ready() -> bool:
+    """
+    Whether warm-up completed or was skipped; a failed warm-up is not ready
+    """
+    return _warm_up_state["status"] in ("done", "disabled")
+
+# Seconds between checks of the model registry for a newly activated version (0 disables)
+MODEL_POLL_INTERVAL = float(os.getenv("MODEL_POLL_INTERVAL", "30"))
+
+_model_watcher_stop = threading.Event()
+_model_watcher_thread = None
+
+
+def check_model_version() -> bool:
+    """
+    Swap in the registry's active model version if it differs from the one being served
+
+    Does nothing until the risk models have been loaded; the first load
+    picks up the active version anyway. Returns True when models were reloaded.
+    """
+    from app.ai.model_registry import get_model_registry
+    
+    ai_service = get_ai_service()
+    if 'risk_predictor' not in ai_service.loaded_components():
+        return False
+    active = get_model_registry().active_version()
+    if active is None or active == ai_service.risk_predictor.version:
+        return False
+    ai_service.reload_risk_predictor()
+    return True
+
+
+def _watch_models(interval: float):
+    while not _model_watcher_stop.wait(interval):
         try:
-            if extraction.duration:
-                duration = extraction.duration.lower()
-                if "month" in duration:
-                    return int(duration.replace("months", "").replace("month", "").strip())
-                elif "year" in duration:
-                    years = int(duration.replace("years", "").replace("year", "").strip())
-                    return years * 12
-        except:
-            pass
-        return 12  # Default 12 months
+            check_model_version()
+        except Exception as e:
+            logger.error(f"Model version check failed: {e}")
+
+
+def start_model_watcher(interval: float = MODEL_POLL_INTERVAL):
+    """
+    Poll the model registry in a background thread and hot-swap new versions
+    """
+    global _model_watcher_thread
+    if interval <= 0 or (_model_watcher_thread is not None and _model_watcher_thread.is_alive()):
+        return
+    _model_watcher_stop.clear()
+    _model_watcher_thread = threading.Thread(
+        target=_watch_models, args=(interval,), name="model-watcher", daemon=True
+    )
+    _model_watcher_thread.start()
+
+
+def stop_model_watcher():
+    _model_watcher_stop.set()
 
 # Example usage
 if __name__ == "__main__":
@@ -1,8 +1,22 @@
-import pandas as pd
-import numpy as np
+import os
 import random
+import time
 from typing import List, Dict, Any
+import numpy as np
 from app.models.ai_models import EnhancedDPRExtraction, RiskLabel, Recommendation, TrainingDataPoint
+from app.utils.normalization import normalize_extraction
+
+# Columns of dpr_training_dataset.csv, in order
+DATASET_COLUMNS = [
+    "dpr_id", "project_title", "department", "region", "duration", "estimated_cost",
+    "fund_allocation", "contingency", "start_date", "end_date", "num_employees", "state",
+    "district", "risk_zone", "guidelines_followed", "risk_label", "recommendation_type",
+    "recommendation_description", "recommendation_priority", "contingency_ratio",
+    "duration_months", "num_machinery", "num_materials", "compliance_score", "missing_docs_count"
+]
+
+# Rows sampled and written at a time by write_dataset
+CHUNK_ROWS = 100_000
 
 class DatasetGenerator:
     """
@@ -94,6 +108,7 @@ class DatasetGenerator:
             guidelines_followed=random.choice([True, False]),
             missing_documents=random.sample(self.missing_docs, random.randint(0, 2)) if random.random() < 0.3 else []
         )
+        normalize_extraction(extraction)
         
         # Assign risk label based on some logic
         risk_label = self._assign_risk_label(extraction)
@@ -120,23 +135,14 @@ class DatasetGenerator:
         risks = []
         
         # Cost overrun risk based on contingency vs estimated cost
-        if extraction.contingency and extraction.estimated_cost:
-            try:
-                contingency_value = float(extraction.contingency.replace("₹", "").replace("crore", "").strip())
-                estimated_value = float(extraction.estimated_cost.replace("₹", "").replace("crore", "").strip())
-                if contingency_value / estimated_value < 0.05:  # Less than 5% contingency
-                    risks.append(RiskLabel.COST_OVERRUN)
-            except:
-                pass
+        if extraction.contingency_inr is not None and extraction.estimated_cost_inr:
+            if extraction.contingency_inr / extraction.estimated_cost_inr < 0.05:  # Less than 5% contingency
+                risks.append(RiskLabel.COST_OVERRUN)
         
         # Delay risk based on duration
-        if extraction.duration:
-            try:
-                duration_months = int(extraction.duration.replace("months", "").strip())
-                if duration_months < 12:  # Less than 12 months might be risky
-                    risks.append(RiskLabel.DELAY)
-            except:
-                pass
+        if extraction.duration_months is not None:
+            if extraction.duration_months < 12:  # Less than 12 months might be risky
+                risks.append(RiskLabel.DELAY)
         
         # Environmental risk based on risk zone
         if extraction.risk_zone and extraction.risk_zone != "None":
@@ -194,24 +200,13 @@ class DatasetGenerator:
         features = {}
         
         # Financial ratios
-        try:
-            if extraction.estimated_cost and extraction.contingency:
-                est_cost = float(extraction.estimated_cost.replace("₹", "").replace("crore", "").strip())
-                contingency = float(extraction.contingency.replace("₹", "").replace("crore", "").strip())
-                features['contingency_ratio'] = contingency / est_cost if est_cost > 0 else 0
-            else:
-                features['contingency_ratio'] = 0
-        except:
+        if extraction.estimated_cost_inr and extraction.contingency_inr is not None:
+            features['contingency_ratio'] = extraction.contingency_inr / extraction.estimated_cost_inr
+        else:
             features['contingency_ratio'] = 0
         
         # Duration in months
-        try:
-            if extraction.duration:
-                features['duration_months'] = int(extraction.duration.replace("months", "").strip())
-            else:
-                features['duration_months'] = 12
-        except:
-            features['duration_months'] = 12
+        features['duration_months'] = int(extraction.duration_months) if extraction.duration_months else 12
         
         # Employee count
         features['num_employees'] = extraction.num_employees or 50
@@ -241,10 +236,157 @@ class DatasetGenerator:
             dataset.append(data_point)
         return dataset
     
+    def generate_columns(self, size: int, seed: int = 42, start: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Sample `size` rows as NumPy arrays keyed by DATASET_COLUMNS
+
+        Follows the same distributions and labelling rules as
+        generate_synthetic_dpr, without building a pydantic object or
+        parsing strings per row. Rows are numbered from `start`, and the
+        same (size, seed, start) always gives the same rows.
+        """
+        rng = np.random.default_rng([seed, start])
+
+        def pick(values, idx):
+            return np.asarray(values, dtype=object)[idx]
+
+        def amounts(low, high):
+            values = rng.integers(low, high + 1, size)
+            return values, pick([f"₹{v} crore" for v in range(low, high + 1)], values - low)
+
+        def dates(first_year, last_year):
+            table = np.array([
+                [[f"{day:02d}-{month:02d}-{year}" for year in range(first_year, last_year + 1)]
+                 for month in range(1, 13)]
+                for day in range(1, 29)
+            ], dtype=object)
+            return table[rng.integers(0, 28, size), rng.integers(0, 12, size),
+                         rng.integers(0, last_year - first_year + 1, size)]
+
+        duration_months = rng.integers(6, 37, size)
+        estimated_cost, estimated_cost_text = amounts(50, 500)
+        _, fund_allocation_text = amounts(40, 450)
+        contingency, contingency_text = amounts(2, 20)
+        num_employees = rng.integers(10, 201, size)
+        risk_zone_idx = rng.integers(0, len(self.risk_zones), size)
+        guidelines_followed = rng.random(size) < 0.5
+        num_machinery = rng.integers(2, 6, size)
+        num_materials = rng.integers(2, 6, size)
+        missing_docs_count = np.where(rng.random(size) < 0.3, rng.integers(0, 3, size), 0)
+        contingency_ratio = contingency / estimated_cost
+
+        # Same rules as _assign_risk_label: one of the risks that apply, chosen at random
+        label_risks = [RiskLabel.COST_OVERRUN, RiskLabel.DELAY, RiskLabel.ENVIRONMENTAL, RiskLabel.RESOURCE]
+        applies = np.column_stack([
+            contingency_ratio < 0.05,
+            duration_months < 12,
+            pick(self.risk_zones, risk_zone_idx) != "None",
+            num_employees < 30
+        ])
+        n_applies = applies.sum(axis=1)
+        choice = (rng.random(size) * n_applies).astype(np.int64)
+        # Index of the (choice + 1)-th applying risk, or NONE when no risk applies
+        label_idx = np.where(
+            n_applies > 0,
+            np.argmax(np.cumsum(applies, axis=1) > choice[:, None], axis=1),
+            len(label_risks)
+        )
+        labels = label_risks + [RiskLabel.NONE]
+
+        # Recommendations as in _generate_recommendation, indexed like `labels`
+        recommendations = [
+            ("Budget Rebalance", "Increase contingency budget by 10%", "High"),
+            ("Timeline Adjustment", "Timeline too short — extend by 3 months", "High"),
+            ("Risk Mitigation", None, "High"),
+            ("Resource Planning", "Add alternate supplier for raw material shortage", "Medium"),
+            ("General Improvement", "Project appears well-structured with minimal risks", "Low")
+        ]
+        descriptions = pick([d for _, d, _ in recommendations], label_idx)
+        environmental = label_idx == labels.index(RiskLabel.ENVIRONMENTAL)
+        descriptions[environmental] = pick(
+            [f"Area prone to {hazard} — require mitigation planning" for hazard in ("flood", "landslide")],
+            rng.integers(0, 2, int(environmental.sum()))
+        )
+
+        return {
+            "dpr_id": np.array([f"DPR_{i:04d}" for i in range(start, start + size)], dtype=object),
+            "project_title": pick([f"Infrastructure Development Project {v}" for v in range(100, 1000)],
+                                  rng.integers(0, 900, size)),
+            "department": pick(self.departments, rng.integers(0, len(self.departments), size)),
+            "region": pick([f"Region {v}" for v in range(1, 11)], rng.integers(0, 10, size)),
+            "duration": pick([f"{v} months" for v in range(6, 37)], duration_months - 6),
+            "estimated_cost": estimated_cost_text,
+            "fund_allocation": fund_allocation_text,
+            "contingency": contingency_text,
+            "start_date": dates(2024, 2026),
+            "end_date": dates(2027, 2029),
+            "num_employees": num_employees,
+            "state": pick(self.states, rng.integers(0, len(self.states), size)),
+            "district": pick(self.districts, rng.integers(0, len(self.districts), size)),
+            "risk_zone": pick(self.risk_zones, risk_zone_idx),
+            "guidelines_followed": guidelines_followed,
+            "risk_label": pick([label.value for label in labels], label_idx),
+            "recommendation_type": pick([t for t, _, _ in recommendations], label_idx),
+            "recommendation_description": descriptions,
+            "recommendation_priority": pick([p for _, _, p in recommendations], label_idx),
+            "contingency_ratio": contingency_ratio,
+            "duration_months": duration_months,
+            "num_machinery": num_machinery,
+            "num_materials": num_materials,
+            "compliance_score": guidelines_followed.astype(np.int64),
+            "missing_docs_count": missing_docs_count
+        }
+
+    def write_dataset(self, filename: str = "dpr_training_dataset.csv", size: int = 1000, seed: int = 42,
+                      chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+        """
+        Generate `size` rows with generate_columns and write them a chunk at a time
+
+        Writes Parquet when `filename` ends in .parquet, CSV otherwise, with
+        the columns of dpr_training_dataset.csv. Memory use is bounded by
+        `chunk_rows`; output depends only on (size, seed, chunk_rows).
+        """
+        import pandas as pd
+
+        start = time.perf_counter()
+        parquet = filename.endswith(".parquet")
+        tmp_filename = f"{filename}.tmp"
+        writer = None
+        try:
+            for offset in range(0, size, chunk_rows):
+                chunk = pd.DataFrame(
+                    self.generate_columns(min(chunk_rows, size - offset), seed, offset),
+                    columns=DATASET_COLUMNS
+                )
+                if parquet:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_filename, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(tmp_filename, mode="w" if offset == 0 else "a", header=offset == 0, index=False)
+            if writer is not None:
+                writer.close()
+                writer = None
+            os.replace(tmp_filename, filename)
+        finally:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+
+        seconds = time.perf_counter() - start
+        return {"filename": filename, "rows": size, "seconds": seconds,
+                "rows_per_second": size / seconds if seconds else 0.0}
+
     def save_dataset_to_csv(self, dataset: List[TrainingDataPoint], filename: str = "dpr_training_dataset.csv"):
         """
         Save dataset to CSV for training
         """
+        import pandas as pd
+        
         # Convert to DataFrame
         rows = []
         for data_point in dataset:
@@ -0,0 +1,219 @@
+"""
+Matplotlib report charts (REPORT_CHART_BACKEND=matplotlib)
+
+The draw_* functions draw one chart into an empty figure. ReportGenerator
+renders them in the request thread with a fresh figure each time, or, when
+REPORT_CHART_WORKERS > 0, through render_charts: a small pool of worker
+processes that have already imported matplotlib, loaded the fonts and
+created the 10x6-inch figure they reuse for every chart. A report's charts
+then render concurrently, off pyplot's process-wide state in the server.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+from app.ai.report_payload import risk_similarity_matrix
+
+# Worker processes for chart rendering (0 renders in the calling thread)
+CHART_WORKERS = int(os.getenv('REPORT_CHART_WORKERS', '2'))
+
+FIGSIZE = (10, 6)
+DPI = 300
+
+
+def _pyplot():
+    """
+    Import pyplot on first chart render, using the non-interactive Agg backend
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def draw_risk_chart(fig, risk_scores: Dict[str, float]) -> None:
+    ax = fig.add_subplot()
+    risks = list(risk_scores.keys())
+    scores = list(risk_scores.values())
+
+    # Color bars based on risk level
+    colors_list = ['red' if score >= 0.7 else 'orange' if score >= 0.4 else 'green' for score in scores]
+
+    bars = ax.bar(risks, scores, color=colors_list)
+    ax.set_ylabel('Risk Score (0-1)')
+    ax.set_title('DPR Risk Analysis')
+    ax.set_ylim(0, 1)
+
+    # Add value labels on bars
+    for bar, score in zip(bars, scores):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
+               f'{score:.2f}', ha='center', va='bottom')
+
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+
+
+def draw_pie_chart(fig, risk_scores: Dict[str, float]) -> None:
+    ax = fig.add_subplot()
+
+    # Only show risks with score > 0.1
+    significant = {risk: score for risk, score in risk_scores.items() if score > 0.1}
+    if significant:
+        ax.pie(list(significant.values()), labels=list(significant), autopct='%1.1f%%', startangle=90)
+    else:
+        ax.pie([1], labels=['No Significant Risks'], autopct='%1.1f%%', startangle=90)
+
+    ax.set_title('Risk Distribution')
+
+
+def draw_correlation_chart(fig, risk_scores: Dict[str, float]) -> None:
+    ax = fig.add_subplot()
+    risk_factors = list(risk_scores.keys())
+    correlation_matrix = risk_similarity_matrix(risk_scores)
+
+    # Create heatmap
+    im = ax.imshow(correlation_matrix, cmap='coolwarm', aspect='auto')
+    ax.set_xticks(range(len(risk_factors)))
+    ax.set_yticks(range(len(risk_factors)))
+    ax.set_xticklabels(risk_factors, rotation=45, ha='right')
+    ax.set_yticklabels(risk_factors)
+    ax.set_title('Risk Factor Correlation Analysis')
+
+    # Add colorbar
+    cbar = fig.colorbar(im, ax=ax)
+    cbar.set_label('Correlation Strength')
+
+    # Add value annotations
+    for i, row in enumerate(correlation_matrix):
+        for j, value in enumerate(row):
+            ax.text(j, i, f'{value:.2f}', ha="center", va="center", color="black")
+
+    fig.tight_layout()
+
+
+def draw_cost_timeline_chart(fig, cost_crore: float, duration_months: float) -> None:
+    ax = fig.add_subplot()
+    categories = ['Estimated Cost (₹ crore)', 'Duration (Months)']
+    values = [cost_crore, duration_months]
+
+    bars = ax.bar(categories, values, color=['blue', 'green'])
+    ax.set_ylabel('Value')
+    ax.set_title('Cost vs Timeline Analysis')
+
+    # Add value labels on bars
+    for bar, value in zip(bars, values):
+        if bar.get_height() > 0:
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(values) * 0.01,
+                   f'{value:.1f}', ha='center', va='bottom')
+
+    fig.tight_layout()
+
+
+CHARTS = {
+    'risk': draw_risk_chart,
+    'pie': draw_pie_chart,
+    'correlation': draw_correlation_chart,
+    'cost_timeline': draw_cost_timeline_chart,
+}
+
+
+def _save_png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=DPI, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def render_png(chart: str, *args) -> bytes:
+    """
+    Render a chart in the calling thread with a new figure
+    """
+    plt = _pyplot()
+    fig = plt.figure(figsize=FIGSIZE)
+    try:
+        CHARTS[chart](fig, *args)
+        return _save_png(fig)
+    finally:
+        plt.close(fig)
+
+
+# Figure reused by every chart a worker process renders
+_worker_figure = None
+
+
+def _init_worker() -> None:
+    """
+    Import matplotlib, create the reusable figure and load the fonts by rendering once
+    """
+    global _worker_figure
+    plt = _pyplot()
+    _worker_figure = plt.figure(figsize=FIGSIZE)
+    draw_risk_chart(_worker_figure, {'warm_up': 0.5})
+    _save_png(_worker_figure)
+    _worker_figure.clf()
+
+
+def _render_in_worker(chart: str, args: tuple) -> bytes:
+    try:
+        CHARTS[chart](_worker_figure, *args)
+        return _save_png(_worker_figure)
+    finally:
+        _worker_figure.clf()
+
+
+def _ready() -> bool:
+    return True
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_chart_pool(workers: int = None) -> ProcessPoolExecutor:
+    """
+    This process's chart pool, started and warmed on first use
+
+    A process forked after the pool started (serve.py workers) gets its own.
+    """
+    global _pool, _pool_pid
+    workers = workers or CHART_WORKERS
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # spawn, not fork: the server process has threads running
+                pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_init_worker)
+                # Start every worker now so the first report does not wait for them
+                for future in [pool.submit(_ready) for _ in range(workers)]:
+                    future.result()
+                _pool, _pool_pid = pool, os.getpid()
+    return _pool
+
+
+def shutdown_chart_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_charts(jobs: List[Tuple[str, tuple]], workers: int = None) -> List[bytes]:
+    """
+    Render [(chart, args), ...] to PNG bytes, concurrently in the pool when workers > 0
+    """
+    workers = CHART_WORKERS if workers is None else workers
+    if workers <= 0:
+        return [render_png(chart, *args) for chart, args in jobs]
+    try:
+        pool = get_chart_pool(workers)
+        futures = [pool.submit(_render_in_worker, chart, args) for chart, args in jobs]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died; start a new pool next time and render this report here
+        shutdown_chart_pool()
+        return [render_png(chart, *args) for chart, args in jobs]
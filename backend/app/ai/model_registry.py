@@ -0,0 +1,339 @@
+"""
+Versioned registry for the risk models
+
+Each published version is an immutable set of model files
+(xgboost_*/randomforest_* .pkl and .npz) plus a manifest entry recording
+their sha256. The manifest's `active` field names the version processes
+should serve; activating another version is a single manifest write, and
+serving processes pick it up through AIService.reload_risk_predictor.
+
+Two stores are available, selected with MODEL_REGISTRY:
+
+- local (default): versions live in MODEL_REGISTRY_DIR/<version>/ next to
+  MODEL_REGISTRY_DIR/manifest.json
+- gridfs: versions live in the `models` GridFS bucket and the manifest in
+  the `model_registry` collection; files are cached in MODEL_REGISTRY_DIR
+  the first time a process loads a version
+
+Without an active version, models are loaded from backend/models as before.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.ai.tree_ensemble import file_digest
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Models shipped with the repo, and where save_models writes by default
+MODELS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'models'))
+
+REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', os.path.join(MODELS_DIR, 'registry'))
+
+# Files that make up a model version
+MODEL_FILE_PATTERNS = ('xgboost_*_model.pkl', 'xgboost_*_model.npz',
+                       'randomforest_*_model.pkl', 'randomforest_*_model.npz')
+
+
+def model_files(source_dir: str) -> Dict[str, str]:
+    """
+    Return {file name: sha256} for the model files in source_dir
+    """
+    files = {}
+    for pattern in MODEL_FILE_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(source_dir, pattern))):
+            files[os.path.basename(path)] = file_digest(path)
+    return files
+
+
+def fingerprint(files: Dict[str, str]) -> str:
+    """
+    Fingerprint of a set of model files, from their names and digests
+    """
+    digest = hashlib.sha256()
+    for name, file_sha in sorted(files.items()):
+        digest.update(f"{name}:{file_sha}\n".encode())
+    return digest.hexdigest()
+
+
+def _write_json_atomically(path: str, data: dict) -> None:
+    """
+    Replace path with data so readers see either the old or the new file, never a partial one
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.manifest-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry(ABC):
+    """
+    Common publish / activate logic; subclasses provide the storage
+    """
+
+    @abstractmethod
+    def read_manifest(self) -> dict:
+        ...
+
+    @abstractmethod
+    def _add_version(self, version: str, entry: dict, activate: bool) -> None:
+        ...
+
+    @abstractmethod
+    def _set_active(self, version: str) -> None:
+        ...
+
+    @abstractmethod
+    def _store(self, version: str, source_dir: str, files: Dict[str, str]) -> None:
+        ...
+
+    @abstractmethod
+    def version_dir(self, version: str) -> str:
+        """
+        Local directory holding the files of `version`
+        """
+
+    def active_version(self) -> Optional[str]:
+        return self.read_manifest().get('active')
+
+    def list_versions(self) -> List[dict]:
+        manifest = self.read_manifest()
+        return [
+            dict(entry, version=version, active=version == manifest.get('active'))
+            for version, entry in sorted(manifest.get('versions', {}).items())
+        ]
+
+    def publish(self, source_dir: str = MODELS_DIR, activate: bool = False, notes: str = None) -> str:
+        """
+        Copy the model files in source_dir into a new version and return its name
+
+        Publishing the same files twice returns the existing version.
+        """
+        files = model_files(source_dir)
+        if not files:
+            raise ValueError(f"No model files found in {source_dir}")
+
+        files_fingerprint = fingerprint(files)
+        for version, entry in self.read_manifest().get('versions', {}).items():
+            if entry.get('fingerprint') == files_fingerprint:
+                logger.info(f"Models in {source_dir} are already published as {version}")
+                if activate:
+                    self.activate(version)
+                return version
+
+        version = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{files_fingerprint[:8]}"
+        self._store(version, source_dir, files)
+        entry = {
+            'created_at': datetime.utcnow().isoformat(),
+            'fingerprint': files_fingerprint,
+            'files': files,
+            'notes': notes,
+        }
+        self._add_version(version, entry, activate)
+        logger.info(f"Published model version {version}" + (" (active)" if activate else ""))
+        return version
+
+    def activate(self, version: str) -> None:
+        if version not in self.read_manifest().get('versions', {}):
+            raise KeyError(f"Unknown model version: {version}")
+        self._set_active(version)
+        logger.info(f"Activated model version {version}")
+
+    def resolve_active(self) -> Tuple[Optional[str], str]:
+        """
+        Return (active version, directory to load it from)
+
+        Falls back to (None, MODELS_DIR) when nothing has been activated.
+        """
+        version = self.active_version()
+        if version is None:
+            return None, MODELS_DIR
+        return version, self.version_dir(version)
+
+
+class LocalModelRegistry(ModelRegistry):
+    """
+    Registry in a local (or shared network) directory
+    """
+
+    def __init__(self, root: str = REGISTRY_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, 'manifest.json')
+
+    @contextmanager
+    def _manifest_lock(self):
+        """
+        Serialize manifest updates across processes
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'active': None, 'versions': {}}
+
+    def _add_version(self, version: str, entry: dict, activate: bool) -> None:
+        with self._manifest_lock():
+            manifest = self.read_manifest()
+            manifest['versions'][version] = entry
+            if activate:
+                manifest['active'] = version
+            _write_json_atomically(self.manifest_path, manifest)
+
+    def _set_active(self, version: str) -> None:
+        with self._manifest_lock():
+            manifest = self.read_manifest()
+            manifest['active'] = version
+            _write_json_atomically(self.manifest_path, manifest)
+
+    def _store(self, version: str, source_dir: str, files: Dict[str, str]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        # Copy into a scratch directory and rename it into place, so a
+        # version directory is either complete or absent
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix=f'.{version}-')
+        try:
+            for name in files:
+                shutil.copy2(os.path.join(source_dir, name), os.path.join(tmp_dir, name))
+            os.rename(tmp_dir, os.path.join(self.root, version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+
+class GridFSModelRegistry(ModelRegistry):
+    """
+    Registry in MongoDB: files in GridFS, manifest in a collection
+    """
+
+    MANIFEST_ID = 'risk_models'
+
+    def __init__(self, database=None, cache_dir: str = REGISTRY_DIR):
+        if database is None:
+            from app.database import get_database
+            database = get_database()
+        import gridfs
+        self.bucket = gridfs.GridFSBucket(database, bucket_name='models')
+        self.manifests = database.get_collection('model_registry')
+        self.cache_dir = cache_dir
+
+    def read_manifest(self) -> dict:
+        doc = self.manifests.find_one({'_id': self.MANIFEST_ID}) or {}
+        return {'active': doc.get('active'), 'versions': doc.get('versions', {})}
+
+    def _add_version(self, version: str, entry: dict, activate: bool) -> None:
+        update = {f'versions.{version}': entry}
+        if activate:
+            update['active'] = version
+        self.manifests.update_one({'_id': self.MANIFEST_ID}, {'$set': update}, upsert=True)
+
+    def _set_active(self, version: str) -> None:
+        self.manifests.update_one({'_id': self.MANIFEST_ID}, {'$set': {'active': version}})
+
+    def _store(self, version: str, source_dir: str, files: Dict[str, str]) -> None:
+        for name, sha256 in files.items():
+            with open(os.path.join(source_dir, name), 'rb') as f:
+                self.bucket.upload_from_stream(
+                    f'{version}/{name}', f, metadata={'version': version, 'sha256': sha256}
+                )
+
+    def version_dir(self, version: str) -> str:
+        """
+        Download the version into the local cache once, verifying every file
+        """
+        target = os.path.join(self.cache_dir, version)
+        if os.path.isdir(target):
+            return target
+
+        files = self.read_manifest()['versions'][version]['files']
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=f'.{version}-')
+        try:
+            for name, sha256 in files.items():
+                path = os.path.join(tmp_dir, name)
+                with open(path, 'wb') as f:
+                    self.bucket.download_to_stream_by_name(f'{version}/{name}', f)
+                if file_digest(path) != sha256:
+                    raise ValueError(f"Checksum mismatch for {name} in model version {version}")
+            try:
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Another process cached the same version first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return target
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Return the registry selected by MODEL_REGISTRY (local or gridfs)
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                if os.getenv('MODEL_REGISTRY', 'local') == 'gridfs':
+                    _registry = GridFSModelRegistry()
+                else:
+                    _registry = LocalModelRegistry()
+    return _registry
+
+
+def reset_model_registry() -> None:
+    """
+    Forget the registry, so the next get_model_registry() builds one on a fresh database connection
+    """
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def resolve_active_models() -> Tuple[Optional[str], str]:
+    """
+    (version, directory) of the models to serve, falling back to MODELS_DIR if the registry is unavailable
+    """
+    try:
+        return get_model_registry().resolve_active()
+    except Exception as e:
+        logger.error(f"Model registry unavailable, loading models from {MODELS_DIR}: {e}")
+        return None, MODELS_DIR
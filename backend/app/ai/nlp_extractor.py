@@ -1,6 +1,5 @@
 import re
 from typing import Dict, List, Optional, Tuple
-import spacy
 from app.models.ai_models import EnhancedDPRExtraction
 
 class NLPExtractor:
@@ -12,6 +11,7 @@ class NLPExtractor:
 
     def __init__(self):
         try:
+            import spacy
             self.nlp = spacy.load("en_core_web_sm")
         except:
             print("Warning: spaCy model not available. Named Entity Recognition will be partial.")
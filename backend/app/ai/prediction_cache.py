@@ -0,0 +1,41 @@
+"""
+Bounded LRU cache of risk predictions
+
+Keys are the model version plus the 7 risk features as float32, the
+precision the models compare them at, so two DPRs share an entry exactly
+when the models cannot tell them apart. Many DPRs do: the defaults for
+missing values (50 employees, 3 machinery types, 12 months) are common.
+AIService clears the cache whenever it swaps in a new model version.
+"""
+import os
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.utils.lru_cache import LRUCache
+
+# Entries kept (0 disables caching)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+
+
+class PredictionCache(LRUCache):
+    """
+    Thread-safe LRU mapping of (model version, features) to risk score dicts
+
+    Scores are copied in and out, so callers may modify the dicts they get.
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE):
+        super().__init__(max_size)
+
+    @staticmethod
+    def key(model_version, features) -> Tuple[Hashable, ...]:
+        """
+        Cache key for a float32 feature row from RiskPredictor.features_to_array
+        """
+        return (model_version,) + tuple(features.tolist())
+
+    def get(self, key) -> Optional[Dict[str, float]]:
+        scores = super().get(key)
+        return dict(scores) if scores is not None else None
+
+    def put(self, key, scores: Dict[str, float]) -> None:
+        super().put(key, dict(scores))
@@ -0,0 +1,70 @@
+"""
+Content keys of generated report PDFs
+
+A report is a function of its type, the DPR's enhanced extraction, risk
+scores and recommendations, and the report template (layout version and
+chart backend). report_key hashes exactly those inputs; the report store
+(app/ai/report_store.py) keeps one PDF per key, so a report whose inputs
+have not changed is never rendered twice, whichever DPR or route asks for it.
+The portfolio report is keyed the same way by the aggregates it draws.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Per-DPR filename of each report type, as the download routes serve them
+REPORT_FILENAMES = {
+    'analytical': '{dpr_id}_Heatmap_Analysis.pdf',
+    'recommendation': '{dpr_id}_Recommendations_Report.pdf',
+}
+PORTFOLIO_REPORT_FILENAME = 'Portfolio_Risk_Heatmap.pdf'
+_FILENAME_PATTERNS = {
+    report_type: re.compile(re.escape(pattern).replace(re.escape('{dpr_id}'), r'(?P<dpr_id>[^/\\]+)') + '$')
+    for report_type, pattern in REPORT_FILENAMES.items()
+}
+
+
+def report_key(report_type: str, extraction: EnhancedDPRExtraction, risk_scores: Dict[str, float],
+               recommendations: List[Recommendation], template: str) -> str:
+    """
+    SHA-256 of everything a report's content depends on
+
+    `template` identifies the layout, see ReportGenerator.template_id.
+    """
+    inputs = {
+        'report_type': report_type,
+        'template': template,
+        'extraction': extraction.model_dump(mode='json'),
+        'risk_scores': {risk: float(score) for risk, score in risk_scores.items()},
+        'recommendations': [rec.model_dump(mode='json') for rec in recommendations],
+    }
+    return _digest(inputs)
+
+
+def portfolio_report_key(summary: dict, template: str) -> str:
+    """
+    SHA-256 of a portfolio report's inputs: portfolio_risk.portfolio_summary and the layout
+    """
+    return _digest({'report_type': 'portfolio', 'template': template, 'summary': summary})
+
+
+def _digest(inputs: dict) -> str:
+    canonical = json.dumps(inputs, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def parse_report_filename(filename: str) -> Optional[Tuple[str, str]]:
+    """
+    (dpr_id, report_type) of a per-DPR report filename, or None
+    """
+    for report_type, pattern in _FILENAME_PATTERNS.items():
+        match = pattern.match(filename)
+        if match:
+            return match.group('dpr_id'), report_type
+    return None
@@ -0,0 +1,190 @@
+"""
+Report charts drawn as reportlab vector graphics
+
+Each function returns a reportlab Drawing that can be placed in a report
+story like any other flowable. The charts are written into the PDF as a few
+hundred drawing operators, so there is no rasterizing or PNG encoding and
+they stay sharp at any zoom. They mirror the matplotlib charts in
+ReportGenerator, which remain available with REPORT_CHART_BACKEND=matplotlib.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, Group, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+from app.ai.report_payload import risk_similarity_matrix
+
+# Size the charts are placed at in the reports
+CHART_WIDTH = 6 * inch
+CHART_HEIGHT = 4 * inch
+
+# matplotlib's default colour cycle, so both backends look alike
+SERIES_COLORS = [colors.HexColor(c) for c in ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b')]
+
+# Endpoints and midpoint of matplotlib's coolwarm colormap
+_COOLWARM = [(0.230, 0.299, 0.754), (0.865, 0.865, 0.865), (0.706, 0.016, 0.150)]
+
+
+def risk_color(score: float) -> colors.Color:
+    if score >= 0.7:
+        return colors.red
+    elif score >= 0.4:
+        return colors.orange
+    return colors.green
+
+
+def coolwarm(value: float) -> colors.Color:
+    """
+    Colour of a value in [0, 1] on a blue-grey-red scale
+    """
+    value = min(1.0, max(0.0, value))
+    low, high, t = (_COOLWARM[0], _COOLWARM[1], value * 2) if value < 0.5 else (_COOLWARM[1], _COOLWARM[2], value * 2 - 1)
+    return colors.Color(*(a + (b - a) * t for a, b in zip(low, high)))
+
+
+def _drawing(title: str, width: float, height: float) -> Drawing:
+    drawing = Drawing(width, height)
+    drawing.add(String(width / 2, height - 16, title, fontName='Helvetica-Bold', fontSize=12, textAnchor='middle'))
+    return drawing
+
+
+def bar_chart(labels: Sequence[str], values: Sequence[float], bar_colors: Sequence[colors.Color], title: str,
+              value_max: float = None, value_format: str = '%.2f',
+              width: float = CHART_WIDTH, height: float = CHART_HEIGHT) -> Drawing:
+    drawing = _drawing(title, width, height)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 50, 70
+    chart.width, chart.height = width - 80, height - 110
+    chart.data = [list(values)]
+    chart.categoryAxis.categoryNames = list(labels)
+    chart.categoryAxis.labels.angle = 30
+    chart.categoryAxis.labels.boxAnchor = 'ne'
+    chart.categoryAxis.labels.fontSize = 8
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = value_max if value_max is not None else max(max(values, default=0) * 1.1, 1)
+    chart.valueAxis.labels.fontSize = 8
+    chart.barLabelFormat = value_format
+    chart.barLabels.nudge = 7
+    chart.barLabels.fontSize = 8
+    chart.bars.strokeColor = None
+    for i, color in enumerate(bar_colors):
+        chart.bars[(0, i)].fillColor = color
+    drawing.add(chart)
+    return drawing
+
+
+def risk_bar_chart(risk_scores: Dict[str, float], width: float = CHART_WIDTH, height: float = CHART_HEIGHT) -> Drawing:
+    """
+    Risk score per risk type on a 0-1 axis, coloured by risk level
+    """
+    scores = list(risk_scores.values())
+    return bar_chart(list(risk_scores), scores, [risk_color(s) for s in scores], 'DPR Risk Analysis',
+                     value_max=1, width=width, height=height)
+
+
+def risk_pie_chart(risk_scores: Dict[str, float], width: float = CHART_WIDTH, height: float = CHART_HEIGHT) -> Drawing:
+    """
+    Share of each risk type scoring above 0.1
+    """
+    drawing = _drawing('Risk Distribution', width, height)
+    significant = {risk: score for risk, score in risk_scores.items() if score > 0.1}
+    if not significant:
+        significant = {'No Significant Risks': 1.0}
+    total = sum(significant.values())
+
+    pie = Pie()
+    size = min(width, height) - 90
+    pie.x, pie.y = (width - size) / 2, (height - 16 - size) / 2
+    pie.width = pie.height = size
+    pie.data = list(significant.values())
+    pie.labels = [f"{risk} ({score / total:.1%})" for risk, score in significant.items()]
+    pie.startAngle = 90
+    pie.direction = 'anticlockwise'
+    pie.simpleLabels = False
+    pie.slices.strokeColor = colors.white
+    pie.slices.fontSize = 8
+    pie.slices.label_pointer_piePad = 4
+    for i in range(len(pie.data)):
+        pie.slices[i].fillColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+        pie.slices[i].labelRadius = 1.15
+    drawing.add(pie)
+    return drawing
+
+
+def heatmap(row_labels: List[str], col_labels: List[str], matrix: Sequence[Sequence[Optional[float]]], title: str,
+            legend: str = '', value_range: Tuple[float, float] = None, label_width: float = 110,
+            width: float = CHART_WIDTH, height: float = CHART_HEIGHT) -> Drawing:
+    """
+    Annotated heatmap, coloured on `value_range` or else the range of the values like matplotlib's imshow
+
+    None values are drawn as blank grey cells.
+    """
+    drawing = _drawing(title, width, height)
+    values = [v for row in matrix for v in row if v is not None]
+    low, high = value_range or (min(values, default=0.0), max(values, default=1.0))
+    span = (high - low) or 1.0
+
+    left, bottom = label_width, 70
+    grid_width, grid_height = width - left - 70, height - bottom - 30
+    cell_w = grid_width / max(len(col_labels), 1)
+    cell_h = grid_height / max(len(row_labels), 1)
+    for i, row in enumerate(matrix):
+        y = bottom + grid_height - (i + 1) * cell_h
+        for j, value in enumerate(row):
+            x = left + j * cell_w
+            if value is None:
+                drawing.add(Rect(x, y, cell_w, cell_h, fillColor=colors.lightgrey, strokeColor=None))
+                continue
+            drawing.add(Rect(x, y, cell_w, cell_h, fillColor=coolwarm((value - low) / span), strokeColor=None))
+            drawing.add(String(x + cell_w / 2, y + cell_h / 2 - 3, f'{value:.2f}', fontSize=8, textAnchor='middle'))
+        drawing.add(String(left - 4, y + cell_h / 2 - 3, row_labels[i], fontSize=8, textAnchor='end'))
+    for j, label in enumerate(col_labels):
+        # Rotated column labels under the grid
+        group = Group(String(0, 0, label, fontSize=8, textAnchor='end'))
+        group.translate(left + (j + 0.5) * cell_w, bottom - 6)
+        group.rotate(45)
+        drawing.add(group)
+
+    # Colour bar
+    steps = 20
+    bar_x, bar_h = width - 50, grid_height / steps
+    for k in range(steps):
+        drawing.add(Rect(bar_x, bottom + k * bar_h, 12, bar_h, fillColor=coolwarm(k / (steps - 1)), strokeColor=None))
+    drawing.add(String(bar_x + 16, bottom - 3, f'{low:.2f}', fontSize=7))
+    drawing.add(String(bar_x + 16, bottom + grid_height - 6, f'{high:.2f}', fontSize=7))
+    if legend:
+        group = Group(String(0, 0, legend, fontSize=8, textAnchor='middle'))
+        group.translate(bar_x + 40, bottom + grid_height / 2)
+        group.rotate(90)
+        drawing.add(group)
+    return drawing
+
+
+def risk_correlation_heatmap(risk_scores: Dict[str, float], width: float = CHART_WIDTH,
+                             height: float = CHART_HEIGHT) -> Drawing:
+    labels = list(risk_scores)
+    return heatmap(labels, labels, risk_similarity_matrix(risk_scores), 'Risk Factor Correlation Analysis',
+                   legend='Correlation Strength', width=width, height=height)
+
+
+def portfolio_heatmap(row_labels: List[str], counts: List[int], risk_types: List[str],
+                      means: List[List[Optional[float]]], title: str, width: float = CHART_WIDTH) -> Drawing:
+    """
+    Mean risk score per group and risk type on a fixed 0-1 scale, grown to fit the rows
+    """
+    labels = [f"{label if len(label) <= 24 else label[:22] + '...'} ({count:,})"
+              for label, count in zip(row_labels, counts)]
+    height = max(CHART_HEIGHT, 100 + 18 * len(labels))
+    return heatmap(labels, risk_types, means, title, legend='Mean Risk Score', value_range=(0.0, 1.0),
+                   label_width=160, width=width, height=height)
+
+
+def cost_timeline_chart(cost_crore: float, duration_months: float, width: float = CHART_WIDTH,
+                        height: float = CHART_HEIGHT) -> Drawing:
+    # The standard PDF fonts have no rupee sign
+    return bar_chart(['Estimated Cost (Rs crore)', 'Duration (Months)'], [cost_crore, duration_months],
+                     [colors.blue, colors.green], 'Cost vs Timeline Analysis', value_format='%.1f',
+                     width=width, height=height)
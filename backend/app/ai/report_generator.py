@@ -1,84 +1,157 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-import numpy as np
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, KeepTogether
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab import rl_config
 from reportlab.lib import colors
-from reportlab.pdfgen import canvas
 import io
-import base64
-from typing import Dict, List
+import os
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Tuple, Union
+from app.ai import report_charts
+from app.ai.report_charts import CHART_WIDTH, CHART_HEIGHT
+from app.ai.report_payload import dpr_quality, missing_critical_data, risk_level
 from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+from app.utils.normalization import ensure_normalized
+
+# 'vector' draws charts with reportlab graphics; 'matplotlib' embeds 300-dpi PNGs
+CHART_BACKEND = os.getenv('REPORT_CHART_BACKEND', 'vector')
+CHART_BACKENDS = ('vector', 'matplotlib')
+
+# Bump whenever a report's layout or wording changes, so cached reports are regenerated
+REPORT_TEMPLATE_VERSION = 1
+
+
+def _banded_table_style(header, body) -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), header),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), body),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+# Table styles shared by every report; Table.setStyle only reads them
+LABEL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+HEADER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+SUMMARY_TABLE_STYLE = _banded_table_style(colors.darkblue, colors.beige)
+RISK_TABLE_STYLE = _banded_table_style(colors.darkgreen, colors.lightgreen)
+ACTION_TABLE_STYLE = _banded_table_style(colors.darkblue, colors.lightblue)
+
+
+@lru_cache(maxsize=1)
+def report_styles() -> Tuple[StyleSheet1, Dict[str, ParagraphStyle]]:
+    """
+    The sample style sheet and the report paragraph styles, built once per process
+
+    Every ReportGenerator shares them, so they must not be modified.
+    """
+    styles = getSampleStyleSheet()
+    custom_styles = {
+        'Title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        ),
+        'Heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            spaceAfter=12,
+            textColor=colors.darkblue
+        ),
+        'SubHeading': ParagraphStyle(
+            'CustomSubHeading',
+            parent=styles['Heading3'],
+            fontSize=14,
+            spaceAfter=10,
+            textColor=colors.darkgreen
+        ),
+        'Normal': ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=6
+        ),
+        'RiskHigh': ParagraphStyle(
+            'RiskHigh',
+            parent=styles['Normal'],
+            textColor=colors.red,
+            fontSize=10,
+            spaceAfter=6
+        ),
+        'RiskMedium': ParagraphStyle(
+            'RiskMedium',
+            parent=styles['Normal'],
+            textColor=colors.orange,
+            fontSize=10,
+            spaceAfter=6
+        ),
+        'RiskLow': ParagraphStyle(
+            'RiskLow',
+            parent=styles['Normal'],
+            textColor=colors.green,
+            fontSize=10,
+            spaceAfter=6
+        )
+    }
+    return styles, custom_styles
+
+
+def configure_batch_rendering() -> None:
+    """
+    Process-wide reportlab settings for bulk rendering
+
+    Turns off the attribute validation reportlab runs on every chart shape,
+    about a tenth of a vector report's render time. Only call it in processes
+    that render the tested report templates and nothing else, such as the
+    workers of app.services.report_materialization.
+    """
+    rl_config.shapeChecking = 0
+
 
 class ReportGenerator:
     """
     Generate PDF reports for DPR analysis
     """
     
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.custom_styles = {
-            'Title': ParagraphStyle(
-                'CustomTitle',
-                parent=self.styles['Heading1'],
-                fontSize=24,
-                spaceAfter=30,
-                alignment=1  # Center alignment
-            ),
-            'Heading': ParagraphStyle(
-                'CustomHeading',
-                parent=self.styles['Heading2'],
-                fontSize=16,
-                spaceAfter=12,
-                textColor=colors.darkblue
-            ),
-            'SubHeading': ParagraphStyle(
-                'CustomSubHeading',
-                parent=self.styles['Heading3'],
-                fontSize=14,
-                spaceAfter=10,
-                textColor=colors.darkgreen
-            ),
-            'Normal': ParagraphStyle(
-                'CustomNormal',
-                parent=self.styles['Normal'],
-                fontSize=10,
-                spaceAfter=6
-            ),
-            'RiskHigh': ParagraphStyle(
-                'RiskHigh',
-                parent=self.styles['Normal'],
-                textColor=colors.red,
-                fontSize=10,
-                spaceAfter=6
-            ),
-            'RiskMedium': ParagraphStyle(
-                'RiskMedium',
-                parent=self.styles['Normal'],
-                textColor=colors.orange,
-                fontSize=10,
-                spaceAfter=6
-            ),
-            'RiskLow': ParagraphStyle(
-                'RiskLow',
-                parent=self.styles['Normal'],
-                textColor=colors.green,
-                fontSize=10,
-                spaceAfter=6
-            )
-        }
+    def __init__(self, chart_backend: str = None):
+        self.chart_backend = chart_backend or CHART_BACKEND
+        if self.chart_backend not in CHART_BACKENDS:
+            raise ValueError(f"Unknown chart backend {self.chart_backend!r}; expected one of {CHART_BACKENDS}")
+        # Identifies the reports this generator draws, for report_cache.report_key
+        self.template_id = f"{REPORT_TEMPLATE_VERSION}/{self.chart_backend}"
+        self.styles, self.custom_styles = report_styles()
     
     def generate_analytical_report(self, 
                                  dpr_id: str,
                                  extraction: EnhancedDPRExtraction,
                                  risk_scores: Dict[str, float],
                                  recommendations: List[Recommendation],
-                                 filename: str = None) -> str:
+                                 filename: Union[str, BinaryIO] = None) -> Union[str, BinaryIO]:
         """
         Generate detailed analytical report with heatmaps and improvement highlights
+
+        `filename` may also be a binary file object, e.g. io.BytesIO, to build the PDF in memory.
         """
         if filename is None:
             filename = f"{dpr_id}_Heatmap_Analysis.pdf"
@@ -102,27 +175,19 @@ class ReportGenerator:
             ["Estimated Cost", extraction.estimated_cost or "N/A"]
         ]
         project_table = Table(project_data)
-        project_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        project_table.setStyle(LABEL_TABLE_STYLE)
         story.append(project_table)
         story.append(Spacer(1, 20))
         
         # Risk Scores Visualization
         story.append(Paragraph("Risk Analysis Heatmap", self.custom_styles['Heading']))
-        risk_chart_buffer = self._create_risk_chart(risk_scores)
-        story.append(Image(risk_chart_buffer, width=6*inch, height=4*inch))
+        risk_chart, pie_chart, correlation_chart = self._charts(['risk', 'pie', 'correlation'], risk_scores, extraction)
+        story.append(risk_chart)
         story.append(Spacer(1, 20))
         
         # Risk Distribution Pie Chart
         story.append(Paragraph("Risk Distribution", self.custom_styles['Heading']))
-        pie_chart_buffer = self._create_pie_chart(risk_scores)
-        story.append(Image(pie_chart_buffer, width=6*inch, height=4*inch))
+        story.append(pie_chart)
         story.append(Spacer(1, 20))
         
         # Extracted Insights
@@ -135,21 +200,13 @@ class ReportGenerator:
             ["Environmental Risks", extraction.environmental_risks or "N/A"]
         ]
         insights_table = Table(insights_data)
-        insights_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        insights_table.setStyle(LABEL_TABLE_STYLE)
         story.append(insights_table)
         story.append(Spacer(1, 20))
         
         # Risk Correlation Analysis
         story.append(Paragraph("Risk Correlation Analysis", self.custom_styles['Heading']))
-        correlation_buffer = self._create_risk_correlation_chart(risk_scores, extraction)
-        story.append(Image(correlation_buffer, width=6*inch, height=4*inch))
+        story.append(correlation_chart)
         story.append(Spacer(1, 20))
         
         # Risk Summary
@@ -190,15 +247,7 @@ class ReportGenerator:
         story.append(Spacer(1, 10))
         
         # Check for missing critical data
-        missing_data = []
-        if not extraction.estimated_cost:
-            missing_data.append("• Estimated cost information")
-        if not extraction.duration:
-            missing_data.append("• Project duration information")
-        if not extraction.num_employees:
-            missing_data.append("• Employee/resource allocation data")
-        if not extraction.start_date or not extraction.end_date:
-            missing_data.append("• Complete timeline information")
+        missing_data = [f"• {item}" for item in missing_critical_data(extraction)]
         
         if missing_data:
             story.append(Paragraph("Missing Critical Information:", self.custom_styles['SubHeading']))
@@ -217,7 +266,8 @@ class ReportGenerator:
         
         # Build PDF
         doc.build(story)
-        print(f"Analytical report saved to {filename}")
+        if isinstance(filename, str):
+            print(f"Analytical report saved to {filename}")
         return filename
     
     def generate_recommendation_report(self,
@@ -225,9 +275,11 @@ class ReportGenerator:
                                      extraction: EnhancedDPRExtraction,
                                      risk_scores: Dict[str, float],
                                      recommendations: List[Recommendation],
-                                     filename: str = None) -> str:
+                                     filename: Union[str, BinaryIO] = None) -> Union[str, BinaryIO]:
         """
         Generate clean recommendation report with detailed, project-specific recommendations
+
+        `filename` may also be a binary file object, e.g. io.BytesIO, to build the PDF in memory.
         """
         if filename is None:
             filename = f"{dpr_id}_Recommendations_Report.pdf"
@@ -252,16 +304,7 @@ class ReportGenerator:
             ["Estimated Cost", extraction.estimated_cost or "N/A"]
         ]
         metadata_table = Table(metadata)
-        metadata_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        metadata_table.setStyle(SUMMARY_TABLE_STYLE)
         story.append(metadata_table)
         story.append(Spacer(1, 20))
         
@@ -275,14 +318,7 @@ class ReportGenerator:
             ["Environmental Risks", extraction.environmental_risks or "N/A"]
         ]
         fields_table = Table(fields_data)
-        fields_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        fields_table.setStyle(LABEL_TABLE_STYLE)
         story.append(fields_table)
         story.append(Spacer(1, 20))
         
@@ -296,16 +332,7 @@ class ReportGenerator:
             risks_analysis.append([risk_type, f"{score:.2f}", analysis])
         
         risks_analysis_table = Table(risks_analysis)
-        risks_analysis_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        risks_analysis_table.setStyle(RISK_TABLE_STYLE)
         story.append(risks_analysis_table)
         story.append(Spacer(1, 20))
         
@@ -319,16 +346,7 @@ class ReportGenerator:
             rec_data.append([f"{i}", rec.description, rec.priority, context])
         
         rec_table = Table(rec_data)
-        rec_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        rec_table.setStyle(ACTION_TABLE_STYLE)
         story.append(rec_table)
         story.append(Spacer(1, 20))
         
@@ -370,16 +388,7 @@ class ReportGenerator:
             ["Long-term (6+ months)", "Continuous improvement and optimization", "Ongoing"]
         ]
         timeline_table = Table(timeline_data)
-        timeline_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        timeline_table.setStyle(ACTION_TABLE_STYLE)
         story.append(timeline_table)
         story.append(Spacer(1, 20))
         
@@ -413,145 +422,107 @@ class ReportGenerator:
         
         # Build PDF
         doc.build(story)
-        print(f"Recommendation report saved to {filename}")
+        if isinstance(filename, str):
+            print(f"Recommendation report saved to {filename}")
         return filename
     
-    def _create_risk_chart(self, risk_scores: Dict[str, float]) -> io.BytesIO:
+    def generate_portfolio_report(self, summary: dict, filename: Union[str, BinaryIO]) -> Union[str, BinaryIO]:
         """
-        Create risk visualization chart
+        Generate the portfolio report: mean risk scores across all DPRs, by state and by department
+
+        `summary` is portfolio_risk.portfolio_summary. Charts are always vector
+        drawings, whatever the chart backend.
         """
-        # Create bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        risks = list(risk_scores.keys())
-        scores = list(risk_scores.values())
-        
-        # Color bars based on risk level
-        colors_list = []
-        for score in scores:
-            if score >= 0.7:
-                colors_list.append('red')
-            elif score >= 0.4:
-                colors_list.append('orange')
-            else:
-                colors_list.append('green')
-        
-        bars = ax.bar(risks, scores, color=colors_list)
-        ax.set_ylabel('Risk Score (0-1)')
-        ax.set_title('DPR Risk Analysis')
-        ax.set_ylim(0, 1)
-        
-        # Add value labels on bars
-        for bar, score in zip(bars, scores):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                   f'{score:.2f}', ha='center', va='bottom')
-        
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Save to buffer
+        doc = SimpleDocTemplate(filename, pagesize=A4)
+        story = []
+
+        story.append(Paragraph("DPR Portfolio Risk Report", self.custom_styles['Title']))
+        story.append(Paragraph(f"Mean AI risk scores across {summary['dprs']:,} analysed DPRs.",
+                               self.custom_styles['Normal']))
+        story.append(Spacer(1, 20))
+
+        # Portfolio averages
+        story.append(Paragraph("Portfolio Risk Overview", self.custom_styles['Heading']))
+        overview_data = [["Risk Type", "Mean Score", "Level"]]
+        for risk_type, score in zip(summary['risk_types'], summary['overall']):
+            overview_data.append([risk_type, f"{score:.2f}" if score is not None else "N/A",
+                                  self._get_risk_level(score) if score is not None else "N/A"])
+        overview_table = Table(overview_data)
+        overview_table.setStyle(HEADER_TABLE_STYLE)
+        story.append(overview_table)
+        story.append(Spacer(1, 20))
+
+        # One heatmap per dimension
+        for dimension, title in (('state', 'Risk by State'), ('department', 'Risk by Department')):
+            matrix = summary['matrices'][dimension]
+            if not matrix['labels']:
+                story.append(Paragraph(title, self.custom_styles['Heading']))
+                story.append(Paragraph("No analysed DPRs yet.", self.custom_styles['Normal']))
+                continue
+            chart = report_charts.portfolio_heatmap(matrix['labels'], matrix['counts'], summary['risk_types'],
+                                                    matrix['means'], f"Mean Risk Score by {dimension.title()}")
+            story.append(KeepTogether([Paragraph(title, self.custom_styles['Heading']), chart]))
+            story.append(Paragraph("Rows show the number of DPRs in brackets. Grey cells have no scores; "
+                                   "'Unknown' collects DPRs without a value and 'Other' the smallest groups.",
+                                   self.custom_styles['Normal']))
+            story.append(Spacer(1, 20))
+
+        doc.build(story)
+        if isinstance(filename, str):
+            print(f"Portfolio report saved to {filename}")
+        return filename
+
+    def render_report(self,
+                      report_type: str,
+                      dpr_id: str,
+                      extraction: EnhancedDPRExtraction,
+                      risk_scores: Dict[str, float],
+                      recommendations: List[Recommendation]) -> bytes:
+        """
+        Build an 'analytical' or 'recommendation' report in memory and return the PDF
+        """
+        generate = (self.generate_analytical_report if report_type == 'analytical'
+                    else self.generate_recommendation_report)
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        
-        return buffer
+        generate(dpr_id, extraction, risk_scores, recommendations, buffer)
+        return buffer.getvalue()
     
-    def _create_pie_chart(self, risk_scores: Dict[str, float]) -> io.BytesIO:
+    def _chart(self, chart: str, risk_scores: Dict[str, float], extraction: EnhancedDPRExtraction = None):
         """
-        Create pie chart of risk distribution
+        A report chart ('risk', 'pie', 'correlation' or 'cost_timeline') sized for the page,
+        as a vector Drawing or, with the matplotlib backend, a PNG Image
         """
-        # Create pie chart
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        risks = list(risk_scores.keys())
-        scores = list(risk_scores.values())
-        
-        # Only show risks with score > 0.1
-        filtered_risks = []
-        filtered_scores = []
-        for risk, score in zip(risks, scores):
-            if score > 0.1:
-                filtered_risks.append(risk)
-                filtered_scores.append(score)
-        
-        if filtered_scores:
-            ax.pie(filtered_scores, labels=filtered_risks, autopct='%1.1f%%', startangle=90)
-        else:
-            ax.pie([1], labels=['No Significant Risks'], autopct='%1.1f%%', startangle=90)
-        
-        ax.set_title('Risk Distribution')
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        
-        return buffer
+        return self._charts([chart], risk_scores, extraction)[0]
     
-    def _create_risk_correlation_chart(self, risk_scores: Dict[str, float], extraction: EnhancedDPRExtraction) -> io.BytesIO:
+    def _charts(self, charts: List[str], risk_scores: Dict[str, float], extraction: EnhancedDPRExtraction = None) -> list:
         """
-        Create risk correlation analysis chart
+        Several report charts at once; the matplotlib backend renders them concurrently
         """
-        # Create heatmap-style visualization
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Create a matrix of risk factors and their correlations
-        risk_factors = list(risk_scores.keys())
-        num_factors = len(risk_factors)
-        
-        # Create a correlation-like matrix (simplified for visualization)
-        correlation_matrix = np.random.rand(num_factors, num_factors)  # Placeholder
-        
-        # For actual correlation, we'll create a matrix based on risk scores
-        for i in range(num_factors):
-            for j in range(num_factors):
-                if i == j:
-                    correlation_matrix[i][j] = 1.0
-                else:
-                    # Simplified correlation based on risk score similarity
-                    score_diff = abs(risk_scores[risk_factors[i]] - risk_scores[risk_factors[j]])
-                    correlation_matrix[i][j] = 1.0 - score_diff
-        
-        # Create heatmap
-        im = ax.imshow(correlation_matrix, cmap='coolwarm', aspect='auto')
-        ax.set_xticks(np.arange(num_factors))
-        ax.set_yticks(np.arange(num_factors))
-        ax.set_xticklabels(risk_factors, rotation=45, ha='right')
-        ax.set_yticklabels(risk_factors)
-        ax.set_title('Risk Factor Correlation Analysis')
-        
-        # Add colorbar
-        cbar = plt.colorbar(im, ax=ax)
-        cbar.set_label('Correlation Strength')
-        
-        # Add value annotations
-        for i in range(num_factors):
-            for j in range(num_factors):
-                text = ax.text(j, i, f'{correlation_matrix[i, j]:.2f}',
-                              ha="center", va="center", color="black")
-        
-        plt.tight_layout()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        
-        return buffer
+        if self.chart_backend == 'matplotlib':
+            from app.ai.matplotlib_charts import render_charts
+            jobs = [(chart, self._chart_args(chart, risk_scores, extraction)) for chart in charts]
+            return [Image(io.BytesIO(png), width=CHART_WIDTH, height=CHART_HEIGHT) for png in render_charts(jobs)]
+        
+        drawings = {
+            'risk': report_charts.risk_bar_chart,
+            'pie': report_charts.risk_pie_chart,
+            'correlation': report_charts.risk_correlation_heatmap,
+            'cost_timeline': report_charts.cost_timeline_chart,
+        }
+        return [drawings[chart](*self._chart_args(chart, risk_scores, extraction)) for chart in charts]
+    
+    def _chart_args(self, chart: str, risk_scores: Dict[str, float], extraction: EnhancedDPRExtraction) -> tuple:
+        if chart == 'cost_timeline':
+            # Numeric cost and timeline, parsed once at extraction
+            extraction = ensure_normalized(extraction)
+            return ((extraction.estimated_cost_inr or 0) / 1e7, extraction.duration_months or 0)
+        return (risk_scores,)
     
     def _get_risk_level(self, score: float) -> str:
         """
         Determine risk level based on score
         """
-        if score >= 0.7:
-            return "High Risk"
-        elif score >= 0.4:
-            return "Medium Risk"
-        else:
-            return "Low Risk"
+        return risk_level(score)
     
     def _get_risk_style(self, risk_level: str) -> ParagraphStyle:
         """
@@ -568,12 +539,7 @@ class ReportGenerator:
         """
         Determine DPR quality based on average risk score
         """
-        if score <= 0.3:
-            return "Excellent"
-        elif score <= 0.6:
-            return "Good"
-        else:
-            return "Poor"
+        return dpr_quality(score)
     
     def _get_dpr_health(self, score: float) -> str:
         """
@@ -638,69 +604,3 @@ class ReportGenerator:
                 return f"High resource shortage risk ({max_risk_score:.2f}) with missing resource data."
         else:
             return f"Based on {max_risk_type} risk score of {max_risk_score:.2f}."
-    
-    def _create_cost_timeline_chart(self, extraction: EnhancedDPRExtraction) -> io.BytesIO:
-        """
-        Create cost vs timeline visualization
-        """
-        # Create bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Extract cost and timeline data
-        cost_value = 0
-        timeline_months = 0
-        
-        # Try to extract numeric values
-        if extraction.estimated_cost:
-            # Extract numeric value from cost string
-            cost_text = extraction.estimated_cost.lower().replace('₹', '').replace('rs', '').replace('rupees', '').strip()
-            try:
-                # Handle crore/lakh notation
-                if 'crore' in cost_text:
-                    cost_value = float(cost_text.split('crore')[0].strip()) * 10000000
-                elif 'lakh' in cost_text:
-                    cost_value = float(cost_text.split('lakh')[0].strip()) * 100000
-                else:
-                    # Try to extract first number
-                    import re
-                    numbers = re.findall(r'\d+\.?\d*', cost_text)
-                    if numbers:
-                        cost_value = float(numbers[0])
-            except:
-                cost_value = 1000000  # Default value
-        
-        if extraction.duration:
-            # Extract months from duration
-            duration_text = extraction.duration.lower()
-            try:
-                if 'month' in duration_text:
-                    timeline_months = int(duration_text.replace('months', '').replace('month', '').strip())
-                elif 'year' in duration_text:
-                    years = int(duration_text.replace('years', '').replace('year', '').strip())
-                    timeline_months = years * 12
-            except:
-                timeline_months = 12  # Default value
-        
-        # Create visualization
-        categories = ['Estimated Cost (₹)', 'Duration (Months)']
-        values = [cost_value / 1000000, timeline_months]  # Convert cost to crores for visualization
-        
-        bars = ax.bar(categories, values, color=['blue', 'green'])
-        ax.set_ylabel('Value')
-        ax.set_title('Cost vs Timeline Analysis')
-        
-        # Add value labels on bars
-        for bar, value in zip(bars, values):
-            if bar.get_height() > 0:
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(values) * 0.01,
-                       f'{value:.1f}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        
-        return buffer
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Analytical report content as JSON, for client-side rendering
+
+analytical_payload computes the sections ReportGenerator.generate_analytical_report
+draws (project information, risk levels, the numbers behind its charts,
+the missing-data assessment and the overall quality score) from the same
+helpers, so the PDF and the JSON agree. It imports no PDF or chart library.
+
+ReportPayloadCache keeps the serialized JSON of recent DPRs, keyed by
+payload_key: a hash of the DPR ID, stored extraction and risk scores, computed
+from the raw MongoDB fields without building any models. A cache hit costs
+one projected find_one and a hash; the key doubles as the response's ETag.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+from app.models.ai_models import EnhancedDPRExtraction
+from app.utils.lru_cache import LRUCache
+
+# Bump whenever the payload's structure or wording changes
+PAYLOAD_VERSION = 1
+
+# Serialized payloads kept (0 disables caching)
+REPORT_PAYLOAD_CACHE_SIZE = int(os.getenv("REPORT_PAYLOAD_CACHE_SIZE", "2048"))
+
+
+def risk_level(score: float) -> str:
+    if score >= 0.7:
+        return "High Risk"
+    elif score >= 0.4:
+        return "Medium Risk"
+    return "Low Risk"
+
+
+def dpr_quality(score: float) -> str:
+    """
+    DPR quality from its average risk score
+    """
+    if score <= 0.3:
+        return "Excellent"
+    elif score <= 0.6:
+        return "Good"
+    return "Poor"
+
+
+def overall_risk_level(average: float) -> str:
+    if average > 0.7:
+        return "HIGH"
+    elif average > 0.4:
+        return "MODERATE"
+    return "LOW"
+
+
+def risk_similarity_matrix(risk_scores: Dict[str, float]) -> List[List[float]]:
+    """
+    1 - |score difference| between every pair of risk types (1 on the diagonal)
+    """
+    scores = list(risk_scores.values())
+    return [[1.0 - abs(a - b) for b in scores] for a in scores]
+
+
+def missing_critical_data(extraction: EnhancedDPRExtraction) -> List[str]:
+    """
+    Critical information the extraction lacks, as listed in the data quality assessment
+    """
+    missing = []
+    if not extraction.estimated_cost:
+        missing.append("Estimated cost information")
+    if not extraction.duration:
+        missing.append("Project duration information")
+    if not extraction.num_employees:
+        missing.append("Employee/resource allocation data")
+    if not extraction.start_date or not extraction.end_date:
+        missing.append("Complete timeline information")
+    return missing
+
+
+def analytical_payload(dpr_id: str, extraction: EnhancedDPRExtraction, risk_scores: Dict[str, float]) -> dict:
+    """
+    The sections of a DPR's analytical report as plain JSON types
+    """
+    risk_scores = {risk_type: float(score) for risk_type, score in risk_scores.items()}
+    significant = {risk_type: score for risk_type, score in risk_scores.items() if score > 0.1}
+    total = sum(significant.values())
+
+    relationships = None
+    if len(risk_scores) > 1:
+        highest = max(risk_scores, key=risk_scores.get)
+        lowest = min(risk_scores, key=risk_scores.get)
+        average = sum(risk_scores.values()) / len(risk_scores)
+        relationships = {
+            'highest': {'risk_type': highest, 'score': risk_scores[highest]},
+            'lowest': {'risk_type': lowest, 'score': risk_scores[lowest]},
+            'average': average,
+            'level': overall_risk_level(average),
+        }
+
+    missing = missing_critical_data(extraction)
+    overall_score = sum(risk_scores.values()) / len(risk_scores) if risk_scores else None
+    return {
+        'dpr_id': dpr_id,
+        'version': PAYLOAD_VERSION,
+        'project_info': {
+            'project_title': extraction.project_title,
+            'department': extraction.department,
+            'state': extraction.state,
+            'district': extraction.district,
+            'duration': extraction.duration,
+            'estimated_cost': extraction.estimated_cost,
+        },
+        'insights': {
+            'start_date': extraction.start_date,
+            'end_date': extraction.end_date,
+            'num_employees': extraction.num_employees,
+            'risk_zone': extraction.risk_zone,
+            'environmental_risks': extraction.environmental_risks,
+        },
+        'risks': [
+            {'risk_type': risk_type, 'score': score, 'level': risk_level(score)}
+            for risk_type, score in risk_scores.items()
+        ],
+        'risk_distribution': {risk_type: score / total for risk_type, score in significant.items()},
+        'correlation': {'labels': list(risk_scores), 'matrix': risk_similarity_matrix(risk_scores)},
+        'risk_relationships': relationships,
+        'data_quality': {'missing': missing, 'complete': not missing},
+        'overall_quality': {
+            'score': overall_score,
+            'rating': dpr_quality(overall_score) if overall_score is not None else None,
+        },
+    }
+
+
+def payload_key(dpr_id: str, extraction_data: dict, risk_scores: Dict[str, float]) -> str:
+    """
+    SHA-256 of a DPR's ID, stored enhanced_extraction and ai_risk_scores, and PAYLOAD_VERSION
+    """
+    inputs = {'version': PAYLOAD_VERSION, 'dpr_id': dpr_id, 'extraction': extraction_data, 'risk_scores': risk_scores}
+    canonical = json.dumps(inputs, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ReportPayloadCache(LRUCache):
+    """
+    Thread-safe LRU mapping of payload_key to the serialized payload
+    """
+
+    def __init__(self, max_size: int = REPORT_PAYLOAD_CACHE_SIZE):
+        super().__init__(max_size)
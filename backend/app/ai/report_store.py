@@ -0,0 +1,265 @@
+"""
+Shared store for generated report PDFs
+
+Reports are stored once per report_cache.report_key, and a DPR's
+`reports.<type>_report_key` field records the key of its current report, so
+any node can serve any DPR's report. Nothing is written to the working
+directory.
+
+Two stores are available, selected with REPORT_STORE:
+
+- local (default): REPORT_STORE_DIR/<key[:2]>/<key[2:4]>/<key>.pdf, which
+  can be a shared network directory; the two shard levels keep directories
+  small with millions of reports
+- gridfs: the `reports` GridFS bucket, with the key as the file _id
+
+lock(key) serializes the rendering of one report across threads, processes
+and (through the shared directory or MongoDB) nodes, so concurrent requests
+for a report that is not stored yet render it once.
+"""
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, Optional
+
+from app.ai.report_cache import BACKEND_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+REPORT_STORE_DIR = os.getenv('REPORT_STORE_DIR', os.path.join(BACKEND_DIR, 'reports'))
+
+# Seconds a GridFS render lock is honoured before another node may take it over
+REPORT_LOCK_TIMEOUT = 300
+
+# In-process locks, shared by keys with the same hash stripe
+_LOCK_STRIPES = 64
+
+
+class StoredReport:
+    """
+    A stored PDF: its key (also its ETag), size and, for the local store, its path
+    """
+
+    def __init__(self, key: str, size: int, path: str = None, opener: Callable[[], BinaryIO] = None):
+        self.key = key
+        self.size = size
+        self.path = path
+        self._opener = opener
+
+    def open(self) -> BinaryIO:
+        """
+        Seekable binary file with the PDF
+        """
+        if self.path is not None:
+            return open(self.path, 'rb')
+        return self._opener()
+
+
+class ReportStore(ABC):
+    """
+    Common hit/miss accounting; subclasses provide the storage
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[StoredReport]:
+        ...
+
+    @abstractmethod
+    def _put(self, key: str, path: str) -> None:
+        """
+        Store the finished PDF at `path` under `key`
+        """
+
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> Optional[StoredReport]:
+        report = self._get(key)
+        if report is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return report
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        Hold the right to render `key`; check exists() again once acquired
+        """
+        with self._locks[int(key[:8], 16) % _LOCK_STRIPES]:
+            yield
+
+    def put(self, key: str, render: Callable[[str], object]) -> None:
+        """
+        Store the PDF `render(path)` writes to a scratch file
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self._scratch_dir(), prefix='.report-', suffix='.pdf')
+        os.close(fd)
+        try:
+            render(tmp_path)
+            self._put(key, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _scratch_dir(self) -> Optional[str]:
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            'store': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class LocalReportStore(ReportStore):
+    """
+    Store in a sharded local (or shared network) directory
+    """
+
+    def __init__(self, root: str = REPORT_STORE_DIR):
+        super().__init__()
+        self.root = root
+
+    def __reduce__(self):
+        # Sent to report materialization workers as its directory; locks are per process
+        return type(self), (self.root,)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], f"{key}.pdf")
+
+    def _get(self, key: str) -> Optional[StoredReport]:
+        path = self.path(key)
+        try:
+            return StoredReport(key, os.stat(path).st_size, path=path)
+        except FileNotFoundError:
+            return None
+
+    def _scratch_dir(self) -> str:
+        # Scratch files on the same filesystem, so _put is a rename
+        os.makedirs(self.root, exist_ok=True)
+        return self.root
+
+    def _put(self, key: str, path: str) -> None:
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        In-process lock plus an flock on a lock file next to the shard, for other processes
+        """
+        with super().lock(key):
+            lock_path = os.path.join(self.root, '.locks', f"{key}.lock")
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            with open(lock_path, 'w') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    # Waiters holding the unlinked file find the report stored
+                    if self._get(key) is not None and os.path.exists(lock_path):
+                        os.remove(lock_path)
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, object]:
+        return dict(super().stats(), directory=self.root)
+
+
+class GridFSReportStore(ReportStore):
+    """
+    Store in MongoDB's `reports` GridFS bucket
+    """
+
+    def __init__(self, database=None):
+        super().__init__()
+        if database is None:
+            from app.database import get_database
+            database = get_database()
+        import gridfs
+        self.bucket = gridfs.GridFSBucket(database, bucket_name='reports')
+        self.files = database.get_collection('reports.files')
+        self.locks = database.get_collection('report_locks')
+
+    def __reduce__(self):
+        # Report materialization workers open their own connection
+        return GridFSReportStore, ()
+
+    def _get(self, key: str) -> Optional[StoredReport]:
+        doc = self.files.find_one({'_id': key}, {'length': 1})
+        if doc is None:
+            return None
+        return StoredReport(key, doc['length'], opener=lambda: self.bucket.open_download_stream(key))
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        In-process lock plus a lease document in report_locks, polled until released or stored
+        """
+        from pymongo.errors import DuplicateKeyError
+        with super().lock(key):
+            acquired = False
+            while not acquired:
+                now = datetime.utcnow()
+                try:
+                    self.locks.insert_one({'_id': key, 'expires_at': now + timedelta(seconds=REPORT_LOCK_TIMEOUT)})
+                    acquired = True
+                except DuplicateKeyError:
+                    if self._get(key) is not None:
+                        break
+                    # Take over the lease of a node that died while rendering
+                    self.locks.delete_one({'_id': key, 'expires_at': {'$lt': now}})
+                    time.sleep(0.2)
+            try:
+                yield
+            finally:
+                if acquired:
+                    self.locks.delete_one({'_id': key})
+
+    def _put(self, key: str, path: str) -> None:
+        from gridfs.errors import FileExists
+        with open(path, 'rb') as f:
+            try:
+                self.bucket.upload_from_stream_with_id(key, f"{key}.pdf", f,
+                                                       metadata={'contentType': 'application/pdf'})
+            except FileExists:
+                # Another node stored the same report first
+                pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """
+    Return the store selected by REPORT_STORE (local or gridfs)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if os.getenv('REPORT_STORE', 'local') == 'gridfs':
+                    _store = GridFSReportStore()
+                else:
+                    _store = LocalReportStore()
+    return _store
+
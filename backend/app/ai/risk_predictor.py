@@ -1,78 +1,164 @@
-import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix
-import xgboost as xgb
 import joblib
-from typing import Dict, List, Tuple
-from app.models.ai_models import RiskLabel
-from sklearn.dummy import DummyClassifier
+import warnings
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import os
+import time
+from datetime import datetime
+
+from app.ai.model_registry import MODELS_DIR, resolve_active_models
+from app.ai.tree_ensemble import CompiledEnsemble, compile_model, file_digest
+
+# pandas, scikit-learn and xgboost are imported where they are used so that
+# importing this module stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Model inputs, in column order
+FEATURE_COLUMNS = [
+    'contingency_ratio',
+    'duration_months',
+    'num_employees',
+    'num_machinery',
+    'num_materials',
+    'compliance_score',
+    'missing_docs_count'
+]
+
+# Risk targets, in the column order used by predict_risks_batch
+TARGETS = ['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']
+
+# Score used when a target has no model or its prediction fails
+DEFAULT_RISK_SCORE = 0.5
+
+# Name of the single model that predicts every target (see train_model)
+MULTI_OUTPUT_MODEL = 'multi_output'
+
+# risk_label value each target is derived from when a dataset has no target columns
+RISK_LABEL_TARGETS = {
+    'Cost Overrun': 'cost_overruns',
+    'Delay': 'schedule_delays',
+    'Resource': 'resource_shortages',
+    'Environmental': 'environmental_risks',
+}
+
+def save_model_files(model, filepath: str) -> None:
+    """
+    Write `model` to filepath.pkl and its compiled copy to filepath.npz
+    """
+    joblib.dump(model, filepath + '.pkl')
+    # Compiled copy for serving without xgboost
+    compiled = compile_model(model)
+    compiled.source_digest = file_digest(filepath + '.pkl')
+    compiled.save(filepath + '.npz')
 
 class RiskPredictor:
     """
     Predict risks in DPRs using XGBoost machine learning model
+
+    Models are served from their compiled NumPy form (see tree_ensemble) when
+    one is available, so serving does not need xgboost or scikit-learn.
     """
     
-    def __init__(self):
+    def __init__(self, model_dir: str = None, version: str = None):
+        """
+        Load the models in model_dir, by default the registry's active version
+        (or backend/models when nothing has been published)
+        """
+        if model_dir is None:
+            version, model_dir = resolve_active_models()
+        self.model_dir = model_dir
+        self.version = version
         self.models = {}
-        self.feature_columns = [
-            'contingency_ratio',
-            'duration_months',
-            'num_employees',
-            'num_machinery',
-            'num_materials',
-            'compliance_score',
-            'missing_docs_count'
-        ]
+        # Set instead of `models` when one model predicts all TARGETS
+        self.multi_output_model = None
+        self.feature_columns = list(FEATURE_COLUMNS)
         # Load trained models
+        start = time.perf_counter()
         self._load_models()
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_at = datetime.utcnow()
     
     def _load_models(self):
         """
         Load trained models from disk
         """
-        model_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'models')
+        model_dir = self.model_dir
+        
+        # A multi-output model replaces the per-target models
+        model = self._load_model(model_dir, 'xgboost', MULTI_OUTPUT_MODEL)
+        if model is not None:
+            self.multi_output_model = model
+            print("Loaded multi-output XGBoost model")
+            return
         
         # Try to load XGBoost models first
-        for target in ['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']:
-            model_path = os.path.join(model_dir, f'xgboost_{target}_model.pkl')
-            if os.path.exists(model_path):
-                try:
-                    self.models[target] = joblib.load(model_path)
-                    print(f"Loaded XGBoost model for {target}")
-                except Exception as e:
-                    print(f"Failed to load XGBoost model for {target}: {e}")
+        for target in TARGETS:
+            model = self._load_model(model_dir, 'xgboost', target)
+            if model is not None:
+                self.models[target] = model
+                print(f"Loaded XGBoost model for {target}")
         
         # If no XGBoost models, try Random Forest
         if not self.models:
-            for target in ['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']:
-                model_path = os.path.join(model_dir, f'randomforest_{target}_model.pkl')
-                if os.path.exists(model_path):
-                    try:
-                        self.models[target] = joblib.load(model_path)
-                        print(f"Loaded Random Forest model for {target}")
-                    except Exception as e:
-                        print(f"Failed to load Random Forest model for {target}: {e}")
+            for target in TARGETS:
+                model = self._load_model(model_dir, 'randomforest', target)
+                if model is not None:
+                    self.models[target] = model
+                    print(f"Loaded Random Forest model for {target}")
         
         # If still no models, create fallback
         if not self.models:
             print("No trained models found. Creating fallback models.")
             self._create_fallback_models()
     
-    def prepare_data(self, csv_file: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def _load_model(self, model_dir: str, kind: str, target: str):
+        """
+        Load one model, preferring its compiled .npz form over the pickle
+
+        The compiled form is only used if it was compiled from the pickle that
+        is on disk now, so a retrained model is never shadowed by a stale one.
+        """
+        pickle_path = os.path.join(model_dir, f'{kind}_{target}_model.pkl')
+        compiled_path = os.path.join(model_dir, f'{kind}_{target}_model.npz')
+        
+        if os.path.exists(compiled_path):
+            try:
+                compiled = CompiledEnsemble.load(compiled_path)
+                if not os.path.exists(pickle_path) or compiled.source_digest == file_digest(pickle_path):
+                    return compiled
+                print(f"Compiled {kind} model for {target} is out of date, loading the pickle")
+            except Exception as e:
+                print(f"Failed to load compiled {kind} model for {target}: {e}")
+        
+        if os.path.exists(pickle_path):
+            try:
+                return joblib.load(pickle_path)
+            except Exception as e:
+                print(f"Failed to load {kind} model for {target}: {e}")
+        return None
+    
+    def prepare_data(self, csv_file: str) -> Tuple['pd.DataFrame', 'pd.DataFrame']:
         """
         Prepare data for training from CSV file
         """
+        import pandas as pd
+        
         # Load data
         df = pd.read_csv(csv_file)
         
         # Select features
         X = df[self.feature_columns]
         
-        # Select targets
-        y = df[['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']]
+        # Select targets, or derive them from risk_label when the dataset
+        # only has the label (as dpr_training_dataset.csv does)
+        if all(target in df.columns for target in TARGETS):
+            y = df[TARGETS]
+        else:
+            y = pd.DataFrame({
+                target: (df['risk_label'] == label).astype(float)
+                for label, target in RISK_LABEL_TARGETS.items()
+            })[TARGETS]
         
         # Handle missing values
         X = X.fillna(0)
@@ -80,96 +166,135 @@ class RiskPredictor:
         
         return X, y
     
-    def train_model(self, X: pd.DataFrame, y: pd.DataFrame) -> None:
+    def train_model(self, X: 'pd.DataFrame', y: 'pd.DataFrame', multi_output: bool = False) -> None:
         """
-        Train XGBoost models for each risk type
+        Train XGBoost models for each risk type and load them
+
+        Trains through the training pipeline (see training_pipeline), one
+        process per target. With multi_output=True, trains a single model
+        with one leaf vector per tree covering every target instead.
         """
+        from app.ai.training_pipeline import train_risk_models
+        
         try:
-            models = {}
-            for target in y.columns:
-                print(f"Training model for {target}...")
-                
-                # Split data
-                X_train, X_test, y_train, y_test = train_test_split(
-                    X, y[target], test_size=0.2, random_state=42
-                )
-                
-                # Create XGBoost regressor
-                model = xgb.XGBRegressor(
-                    n_estimators=100,
-                    max_depth=6,
-                    learning_rate=0.1,
-                    random_state=42
-                )
-                
-                # Train model
-                model.fit(X_train, y_train)
-                models[target] = model
-                
-                # Evaluate model
-                y_pred = model.predict(X_test)
-                rmse = np.sqrt(np.mean((y_test - y_pred) ** 2))
-                print(f"{target} RMSE: {rmse:.4f}")
+            report = train_risk_models(
+                X[self.feature_columns].to_numpy(np.float32),
+                y[TARGETS].to_numpy(np.float32),
+                output_dir=MODELS_DIR,
+                multi_output=multi_output
+            )
+            for result in report['models']:
+                for target, rmse in result['validation_rmse'].items():
+                    print(f"{target} RMSE: {rmse:.4f} ({result['trees']} trees)")
             
-            # Save models
-            self.models = models
-            self.save_models()
+            # Load what was just saved
+            self.model_dir = MODELS_DIR
+            self.version = None
+            self.models = {}
+            self.multi_output_model = None
+            self._load_models()
         except Exception as e:
             print(f"Error training models: {str(e)}")
             # Fall back to dummy models
             self._create_fallback_models()
     
-    def predict_risks(self, features: Dict[str, float]) -> Dict[str, float]:
+    def features_to_array(self, features: Dict[str, float]) -> np.ndarray:
         """
-        Predict risk scores for given features using trained models
+        Convert a feature dict into a row ordered like feature_columns (missing values become 0)
         """
-        try:
-            # Convert features to DataFrame
-            X = pd.DataFrame([features])
-            
-            # Handle missing columns
-            for col in self.feature_columns:
-                if col not in X.columns:
-                    X[col] = 0
-            
-            # Reorder columns
-            X = X[self.feature_columns]
-            
-            # Handle missing values
-            X = X.fillna(0)
-            
-            # Predict using trained models
-            risk_scores = {}
-            for target, model in self.models.items():
+        return np.array(
+            [features.get(col) or 0 for col in self.feature_columns],
+            dtype=np.float32
+        )
+    
+    def predict_risks_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict risk scores for an (n, 7) feature matrix ordered like feature_columns
+
+        Returns an (n, 4) array with one column per entry in TARGETS, clipped to [0, 1].
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Expected {len(self.feature_columns)} feature columns, got {X.shape[1]}")
+        
+        # Handle missing values
+        X = np.nan_to_num(X, nan=0.0)
+        
+        scores = np.full((X.shape[0], len(TARGETS)), DEFAULT_RISK_SCORE)
+        with warnings.catch_warnings():
+            # Models fitted on DataFrames warn about unnamed NumPy input
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            if self.multi_output_model is not None:
+                try:
+                    scores[:] = self.multi_output_model.predict(X)
+                except Exception as e:
+                    print(f"Error predicting with multi-output model: {e}")
+            for column, target in enumerate(TARGETS):
+                model = self.models.get(target)
+                if model is None:
+                    continue
                 try:
-                    prediction = model.predict(X)[0]
-                    # Ensure prediction is between 0 and 1
-                    risk_scores[target] = float(max(0.0, min(1.0, prediction)))
+                    scores[:, column] = model.predict(X)
                 except Exception as e:
                     print(f"Error predicting {target}: {e}")
-                    risk_scores[target] = 0.5  # Default value
-            
-            return risk_scores
+        
+        # Ensure predictions are between 0 and 1
+        return np.clip(scores, 0.0, 1.0)
+    
+    def predict_risks(self, features: Dict[str, float]) -> Dict[str, float]:
+        """
+        Predict risk scores for given features using trained models
+        """
+        try:
+            scores = self.predict_risks_batch(self.features_to_array(features))[0]
+            return {target: float(score) for target, score in zip(TARGETS, scores)}
         except Exception as e:
             print(f"Error in predict_risks: {str(e)}")
             # Return default probabilities
-            return {
-                'cost_overruns': 0.5,
-                'schedule_delays': 0.5,
-                'resource_shortages': 0.5,
-                'environmental_risks': 0.5
-            }
+            return {target: DEFAULT_RISK_SCORE for target in TARGETS}
     
-    def save_models(self, filepath_prefix: str = "models") -> None:
+    def model_info(self) -> Dict[str, object]:
+        """
+        Which model version this predictor serves and how long it took to load
+        """
+        return {
+            'version': self.version,
+            'layout': 'multi_output' if self.multi_output_model is not None else 'per_target',
+            'model_types': sorted({type(model).__name__ for model in self._all_models()}),
+            'loaded_at': self.loaded_at.isoformat(),
+            'load_seconds': round(self.load_seconds, 4),
+        }
+    
+    def _all_models(self) -> List:
+        if self.multi_output_model is not None:
+            return [self.multi_output_model]
+        return list(self.models.values())
+    
+    def save_models(self, filepath_prefix: str = MODELS_DIR) -> None:
         """
         Save trained models to files
+
+        Saves to backend/models regardless of the working directory; publish
+        them with `python manage_models.py publish` to serve them.
         """
         try:
             os.makedirs(filepath_prefix, exist_ok=True)
+            multi_output_prefix = os.path.join(filepath_prefix, f"xgboost_{MULTI_OUTPUT_MODEL}_model")
+            if self.multi_output_model is not None:
+                save_model_files(self.multi_output_model, multi_output_prefix)
+                print(f"Multi-output model saved to {multi_output_prefix}.pkl")
+                return
+            
             for target, model in self.models.items():
-                filepath = os.path.join(filepath_prefix, f"xgboost_{target}_model.pkl")
-                joblib.dump(model, filepath)
-                print(f"Model for {target} saved to {filepath}")
+                filepath = os.path.join(filepath_prefix, f"xgboost_{target}_model")
+                save_model_files(model, filepath)
+                print(f"Model for {target} saved to {filepath}.pkl")
+            # Per-target models only load when there is no multi-output model
+            for extension in ('.pkl', '.npz'):
+                if os.path.exists(multi_output_prefix + extension):
+                    os.remove(multi_output_prefix + extension)
         except Exception as e:
             print(f"Error saving models: {str(e)}")
     
@@ -181,8 +306,7 @@ class RiskPredictor:
             # Create dummy regressors
             from sklearn.dummy import DummyRegressor
             
-            targets = ['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']
-            for target in targets:
+            for target in TARGETS:
                 model = DummyRegressor(strategy="mean")
                 # Fit with dummy data
                 X_dummy = np.random.rand(100, len(self.feature_columns))
@@ -195,8 +319,7 @@ class RiskPredictor:
             print(f"Error creating fallback models: {str(e)}")
             # Create minimal models
             from sklearn.dummy import DummyRegressor
-            targets = ['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']
-            for target in targets:
+            for target in TARGETS:
                 model = DummyRegressor(strategy="constant", constant=0.5)
                 X_dummy = np.array([[0]*len(self.feature_columns)])
                 y_dummy = np.array([0.5])
@@ -210,4 +333,6 @@ if __name__ == "__main__":
     # predictor = RiskPredictor()
     # X, y = predictor.prepare_data("dpr_training_dataset.csv")
     # predictor.train_model(X, y)
+    # or, for a single model covering every target:
+    # predictor.train_model(X, y, multi_output=True)
     pass
\ No newline at end of file
@@ -61,6 +61,11 @@ class EnhancedDPRExtraction(BaseModel):
     yearly_budget: Optional[str] = Field(None)
     budget: Optional[str] = Field(None)
 
+    # Numeric values of the fields above, set once by app.utils.normalization.normalize_extraction
+    estimated_cost_inr: Optional[float] = Field(None)
+    contingency_inr: Optional[float] = Field(None)
+    duration_months: Optional[float] = Field(None)
+
     # Resources
     num_employees: Optional[int] = Field(None)
     resource_allocation: Optional[str] = Field(None)
@@ -0,0 +1,253 @@
+"""
+Training pipeline for the risk models
+
+One pipeline for every way the risk models are trained (train_risk_model.py
+and RiskPredictor.train_model):
+
+1. The dataset (CSV or Parquet) is read once, only for the feature and target
+   columns, and cached as float32 .npy files keyed on the file's path, size
+   and modification time. Later runs on the same file skip parsing.
+2. A seeded split holds out a validation set shared by every target.
+3. Each target trains in its own process on memory-mapped copies of the
+   cached matrix. The processes use XGBoost's histogram method and stop
+   early once validation RMSE stops improving.
+4. Models are saved as .pkl plus compiled .npz, and training_report.json
+   records wall time, trees kept and validation RMSE per target.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.ai.model_registry import MODELS_DIR
+from app.ai.risk_predictor import (
+    FEATURE_COLUMNS, MULTI_OUTPUT_MODEL, RISK_LABEL_TARGETS, TARGETS, save_model_files
+)
+
+CACHE_DIR = os.getenv('FEATURE_CACHE_DIR', os.path.join(MODELS_DIR, 'cache'))
+
+# Upper bound on boosting rounds; early stopping picks the actual number
+DEFAULT_PARAMS = {
+    'n_estimators': 1000,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'tree_method': 'hist',
+    'early_stopping_rounds': 20,
+    'eval_metric': 'rmse',
+    'random_state': 42,
+}
+
+VALIDATION_FRACTION = 0.1
+
+REPORT_FILE = 'training_report.json'
+
+
+def _cache_key(dataset_path: str) -> str:
+    stat = os.stat(dataset_path)
+    key = json.dumps([os.path.abspath(dataset_path), stat.st_size, stat.st_mtime_ns, FEATURE_COLUMNS, TARGETS])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _read_dataset(dataset_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read the feature and target columns of a CSV or Parquet dataset
+
+    Datasets without target columns (like dpr_training_dataset.csv) get
+    them from risk_label, one 0/1 column per risk type.
+    """
+    import pandas as pd
+
+    if dataset_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        available = pq.ParquetFile(dataset_path).schema.names
+    else:
+        available = pd.read_csv(dataset_path, nrows=0).columns.tolist()
+    has_targets = all(target in available for target in TARGETS)
+    columns = FEATURE_COLUMNS + (TARGETS if has_targets else ['risk_label'])
+
+    if dataset_path.endswith('.parquet'):
+        df = pd.read_parquet(dataset_path, columns=columns)
+    else:
+        # "None" is a risk label, not a missing value
+        df = pd.read_csv(dataset_path, usecols=columns, keep_default_na=False, na_values=[''])
+
+    X = df[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(np.float32)
+    if has_targets:
+        y = df[TARGETS].fillna(0).to_numpy(np.float32)
+    else:
+        labels = df['risk_label'].to_numpy()
+        target_labels = {target: label for label, target in RISK_LABEL_TARGETS.items()}
+        y = np.column_stack([labels == target_labels[target] for target in TARGETS]).astype(np.float32)
+    return X, y
+
+
+def load_feature_matrix(dataset_path: str, cache_dir: str = CACHE_DIR) -> Tuple[Dict[str, str], bool]:
+    """
+    Return ({'X': path, 'y': path}) of the cached .npy feature and target matrices, and whether the cache was hit
+    """
+    target_dir = os.path.join(cache_dir, _cache_key(dataset_path))
+    paths = {'X': os.path.join(target_dir, 'X.npy'), 'y': os.path.join(target_dir, 'y.npy')}
+    if os.path.isdir(target_dir):
+        return paths, True
+
+    X, y = _read_dataset(dataset_path)
+    _write_matrices(target_dir, X, y)
+    return paths, False
+
+
+def _write_matrices(target_dir: str, X: np.ndarray, y: np.ndarray) -> None:
+    """
+    Write X.npy and y.npy into target_dir, which appears only once both are complete
+    """
+    parent = os.path.dirname(target_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    np.save(os.path.join(tmp_dir, 'X.npy'), np.ascontiguousarray(X, dtype=np.float32))
+    np.save(os.path.join(tmp_dir, 'y.npy'), np.ascontiguousarray(y, dtype=np.float32))
+    try:
+        os.rename(tmp_dir, target_dir)
+    except OSError:
+        # Another run cached the same dataset first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _split(n_rows: int, validation_fraction: float, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.random.default_rng(seed).permutation(n_rows)
+    n_validation = max(1, int(n_rows * validation_fraction))
+    return np.sort(order[n_validation:]), np.sort(order[:n_validation])
+
+
+def _train_one(name: str, columns: List[int], paths: Dict[str, str], output_dir: str,
+               params: dict, validation_fraction: float, n_jobs: int) -> dict:
+    """
+    Train and save the model for `name` on target columns `columns` (runs in a worker process)
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    X = np.load(paths['X'], mmap_mode='r')
+    y = np.load(paths['y'], mmap_mode='r')
+    train_rows, validation_rows = _split(len(X), validation_fraction, params.get('random_state', 42))
+    y_columns = y[:, columns[0]] if len(columns) == 1 else y[:, columns]
+
+    model_params = dict(params, n_jobs=n_jobs)
+    if len(columns) > 1:
+        model_params['multi_strategy'] = 'multi_output_tree'
+    model = xgb.XGBRegressor(**model_params)
+    model.fit(
+        X[train_rows], y_columns[train_rows],
+        eval_set=[(X[validation_rows], y_columns[validation_rows])],
+        verbose=False
+    )
+    fit_seconds = time.perf_counter() - start
+
+    prediction = model.predict(X[validation_rows]).reshape(len(validation_rows), -1)
+    truth = np.asarray(y_columns[validation_rows]).reshape(len(validation_rows), -1)
+    rmse = np.sqrt(np.mean((truth - prediction) ** 2, axis=0))
+
+    save_model_files(model, os.path.join(output_dir, f'xgboost_{name}_model'))
+    return {
+        'model': name,
+        'targets': [TARGETS[column] for column in columns],
+        'seconds': round(time.perf_counter() - start, 3),
+        'fit_seconds': round(fit_seconds, 3),
+        'trees': int(model.best_iteration) + 1,
+        'validation_rmse': {TARGETS[column]: round(float(value), 5) for column, value in zip(columns, rmse)},
+    }
+
+
+def _train_cached(paths: Dict[str, str], output_dir: str, multi_output: bool, workers: int,
+                  params: dict, validation_fraction: float) -> List[dict]:
+    if multi_output:
+        jobs = [(MULTI_OUTPUT_MODEL, list(range(len(TARGETS))))]
+    else:
+        jobs = [(target, [column]) for column, target in enumerate(TARGETS)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    # Split the cores between the processes training at the same time
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+    args = [(name, columns, paths, output_dir, params, validation_fraction, n_jobs) for name, columns in jobs]
+
+    if workers == 1:
+        return [_train_one(*job) for job in args]
+    # spawn, not fork: forking a process that has started OpenMP threads can deadlock
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(_train_one, *job) for job in args]
+        return [future.result() for future in futures]
+
+
+def _finish(output_dir: str, multi_output: bool, results: List[dict], report: dict) -> dict:
+    # Only one layout may be present, since a multi-output model takes precedence when loading
+    if not multi_output:
+        for extension in ('.pkl', '.npz'):
+            stale = os.path.join(output_dir, f'xgboost_{MULTI_OUTPUT_MODEL}_model{extension}')
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    report['models'] = results
+    with open(os.path.join(output_dir, REPORT_FILE), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def train_risk_models(X: np.ndarray, y: np.ndarray, output_dir: str = MODELS_DIR, multi_output: bool = False,
+                      workers: int = None, params: dict = None,
+                      validation_fraction: float = VALIDATION_FRACTION) -> dict:
+    """
+    Train on in-memory (n, 7) features and (n, 4) targets ordered like TARGETS
+
+    Returns the training report, also written to output_dir/training_report.json.
+    """
+    start = time.perf_counter()
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    os.makedirs(output_dir, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix='risk-features-')
+    try:
+        target_dir = os.path.join(scratch, 'matrix')
+        _write_matrices(target_dir, X, y)
+        paths = {'X': os.path.join(target_dir, 'X.npy'), 'y': os.path.join(target_dir, 'y.npy')}
+        results = _train_cached(paths, output_dir, multi_output, workers, params, validation_fraction)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = _base_report(len(X), multi_output, params, validation_fraction, start)
+    return _finish(output_dir, multi_output, results, report)
+
+
+def train_from_dataset(dataset_path: str, output_dir: str = MODELS_DIR, multi_output: bool = False,
+                       workers: int = None, params: dict = None,
+                       validation_fraction: float = VALIDATION_FRACTION, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Train on a CSV or Parquet dataset, reusing its cached feature matrix when possible
+    """
+    start = time.perf_counter()
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    os.makedirs(output_dir, exist_ok=True)
+
+    paths, cache_hit = load_feature_matrix(dataset_path, cache_dir)
+    prepare_seconds = time.perf_counter() - start
+    results = _train_cached(paths, output_dir, multi_output, workers, params, validation_fraction)
+
+    report = _base_report(len(np.load(paths['X'], mmap_mode='r')), multi_output, params, validation_fraction, start)
+    report.update(dataset=os.path.abspath(dataset_path), feature_cache_hit=cache_hit,
+                  prepare_seconds=round(prepare_seconds, 3))
+    return _finish(output_dir, multi_output, results, report)
+
+
+def _base_report(rows: int, multi_output: bool, params: dict, validation_fraction: float, start: float) -> dict:
+    return {
+        'trained_at': datetime.utcnow().isoformat(),
+        'rows': rows,
+        'layout': 'multi_output' if multi_output else 'per_target',
+        'validation_fraction': validation_fraction,
+        'params': params,
+        'wall_seconds': round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,335 @@
+"""
+Compiled tree ensembles
+
+Converts fitted XGBoost regressors and scikit-learn random forests into flat
+NumPy arrays (one entry per node across all trees) and evaluates them with a
+vectorized traversal. A compiled ensemble is saved as a single .npz file and
+loads without xgboost or scikit-learn installed.
+
+Leaf nodes point to themselves, so after `max_depth` steps every row has
+reached a leaf in every tree and no per-node branching is needed.
+"""
+import hashlib
+import json
+from typing import Any, Dict
+
+import numpy as np
+
+# Rows evaluated per traversal step; bounds the (rows, trees) index matrix
+CHUNK_ROWS = 512
+
+
+class CompiledEnsemble:
+    """
+    Tree ensemble stored as flat node arrays
+
+    A row goes to the left child when `x < threshold` (XGBoost) or
+    `x <= threshold` (scikit-learn); missing values follow `default_left`.
+    The prediction is `base_score` plus the sum (XGBoost) or mean
+    (random forest) of the leaf values, passed through the objective's link.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, default_left: np.ndarray, value: np.ndarray,
+                 roots: np.ndarray, max_depth: int, n_features: int, kind: str,
+                 base_score: float = 0.0, aggregate: str = 'sum', strict: bool = True,
+                 link: str = 'identity', source_digest: str = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.children = np.column_stack([left, right]).ravel()
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.n_features_in_ = self.n_features
+        self.kind = kind
+        self.base_score = float(base_score)
+        self.aggregate = aggregate
+        self.strict = bool(strict)
+        self.link = link
+        # sha256 of the pickle this ensemble was compiled from, if any
+        self.source_digest = source_digest
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def n_outputs(self) -> int:
+        return self.value.shape[1] if self.value.ndim == 2 else 1
+
+    def leaf_indices(self, X: np.ndarray) -> np.ndarray:
+        """
+        Return the (n, n_trees) matrix of leaf node indices each row lands in
+        """
+        x = np.asarray(X, dtype=np.float32)
+        has_missing = np.isnan(x).any()
+        # Offset of each row in the flattened input
+        row_offsets = (np.arange(x.shape[0], dtype=np.int32) * self.n_features)[:, None]
+        x = x.ravel()
+        nodes = np.broadcast_to(self.roots, (len(row_offsets), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            values = x.take(row_offsets + self.feature.take(nodes))
+            if self.strict:
+                go_right = values >= self.threshold.take(nodes)
+            else:
+                go_right = values > self.threshold.take(nodes)
+            if has_missing:
+                go_right = np.where(np.isnan(values), ~self.default_left.take(nodes), go_right)
+            # children holds (left, right) pairs
+            nodes = self.children.take(2 * nodes + go_right)
+        return nodes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict an (n, n_features) matrix, returning n scores
+        (or an (n, n_outputs) matrix for multi-output ensembles)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} feature columns, got {X.shape[1]}")
+
+        scores = np.empty((X.shape[0],) + self.value.shape[1:], dtype=np.float64)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            leaves = self.value.take(self.leaf_indices(X[start:start + CHUNK_ROWS]), axis=0)
+            # Accumulate tree by tree in the value dtype, as both libraries do,
+            # so results match to the last bit (cumsum adds strictly in order)
+            if self.aggregate == 'mean':
+                total = np.cumsum(leaves, axis=1, dtype=self.value.dtype)[:, -1] / self.n_trees
+            else:
+                base = np.full((leaves.shape[0], 1) + leaves.shape[2:], self.base_score, dtype=self.value.dtype)
+                total = np.cumsum(np.concatenate([base, leaves], axis=1), axis=1, dtype=self.value.dtype)[:, -1]
+            scores[start:start + CHUNK_ROWS] = total
+
+        if self.link == 'logistic':
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        return scores
+
+    def save(self, path: str) -> None:
+        """
+        Write the ensemble to a single .npz file
+        """
+        meta = {
+            'kind': self.kind,
+            'base_score': self.base_score,
+            'aggregate': self.aggregate,
+            'strict': self.strict,
+            'link': self.link,
+            'max_depth': self.max_depth,
+            'n_features': self.n_features,
+            'source_digest': self.source_digest,
+        }
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                feature=self.feature,
+                threshold=self.threshold,
+                left=self.left,
+                right=self.right,
+                default_left=self.default_left,
+                value=self.value,
+                roots=self.roots,
+                meta=np.array(json.dumps(meta)),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledEnsemble':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(
+                feature=data['feature'],
+                threshold=data['threshold'],
+                left=data['left'],
+                right=data['right'],
+                default_left=data['default_left'],
+                value=data['value'],
+                roots=data['roots'],
+                **meta,
+            )
+
+
+def file_digest(path: str) -> str:
+    """
+    sha256 of a file, used to tie a compiled ensemble to its source pickle
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Depth of a tree given its child arrays (-1 marks a leaf)
+    """
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        # Children always come after their parent in both libraries' layouts
+        for child in (left[node], right[node]):
+            if child != -1:
+                depth[child] = depth[node] + 1
+    return int(depth.max())
+
+
+def _concatenate(trees: list) -> Dict[str, Any]:
+    """
+    Stack per-tree node arrays into flat arrays with global node indices
+    """
+    arrays = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'default_left', 'value')}
+    roots = []
+    max_depth = 0
+    offset = 0
+    for tree in trees:
+        n = len(tree['left'])
+        node_ids = np.arange(n) + offset
+        is_leaf = tree['left'] == -1
+        # Both children of a leaf are the leaf itself, so traversal stays put
+        arrays['feature'].append(np.where(is_leaf, 0, tree['feature']).astype(np.int32))
+        arrays['threshold'].append(np.where(is_leaf, 0, tree['threshold']).astype(np.float32))
+        arrays['left'].append(np.where(is_leaf, node_ids, tree['left'] + offset).astype(np.int32))
+        arrays['right'].append(np.where(is_leaf, node_ids, tree['right'] + offset).astype(np.int32))
+        arrays['default_left'].append(np.asarray(tree['default_left'], dtype=bool))
+        leaf_mask = is_leaf.reshape((-1,) + (1,) * (tree['value'].ndim - 1))
+        arrays['value'].append(np.where(leaf_mask, tree['value'], 0).astype(tree['value'].dtype))
+        roots.append(offset)
+        max_depth = max(max_depth, _tree_depth(tree['left'], tree['right']))
+        offset += n
+    flat = {key: np.concatenate(parts) for key, parts in arrays.items()}
+    flat['roots'] = np.array(roots, dtype=np.int32)
+    flat['max_depth'] = max_depth
+    return flat
+
+
+def _xgboost_leaf_values(tree: dict, n_targets: int) -> np.ndarray:
+    """
+    Leaf weights of one XGBoost tree, shape (n_nodes,) or (n_nodes, n_targets)
+    """
+    if n_targets == 1:
+        # Leaves keep their (already shrunk) weight in split_conditions
+        return np.array(tree['split_conditions'], dtype=np.float32)
+    # Multi-output trees ("multi_output_tree") keep a weight vector per node
+    if int(tree['tree_param']['size_leaf_vector']) != n_targets:
+        raise ValueError("One-output-per-tree multi-target models cannot be compiled")
+    return np.array(tree['base_weights'], dtype=np.float32).reshape(-1, n_targets)
+
+
+def compile_xgboost(model) -> CompiledEnsemble:
+    """
+    Compile a fitted XGBRegressor (or Booster)
+
+    Multi-target models must use multi_strategy="multi_output_tree"; their
+    compiled form predicts an (n, n_targets) matrix.
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+
+    objective = learner['objective']['name']
+    if objective in ('reg:squarederror', 'reg:linear', 'reg:absoluteerror', 'reg:pseudohubererror'):
+        link = 'identity'
+    elif objective == 'reg:logistic':
+        link = 'logistic'
+    else:
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    model_param = learner['learner_model_param']
+    if int(model_param.get('num_class', '0')) > 1:
+        raise ValueError("XGBoost classifiers cannot be compiled")
+    n_targets = int(model_param.get('num_target', '1'))
+
+    gbtree = learner['gradient_booster']
+    if gbtree['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost booster: {gbtree['name']}")
+    trees = gbtree['model']['trees']
+
+    # The sklearn wrapper predicts with the best iteration after early stopping
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is not None:
+        trees = trees[:int(best_iteration) + 1]
+
+    base_score = float(model_param['base_score'])
+    if link == 'logistic':
+        # base_score is stored as a probability
+        base_score = float(np.log(base_score / (1.0 - base_score)))
+
+    flat = _concatenate([
+        {
+            'feature': np.array(tree['split_indices'], dtype=np.int64),
+            'threshold': np.array(tree['split_conditions'], dtype=np.float32),
+            'left': np.array(tree['left_children'], dtype=np.int64),
+            'right': np.array(tree['right_children'], dtype=np.int64),
+            'default_left': np.array(tree['default_left'], dtype=bool),
+            'value': _xgboost_leaf_values(tree, n_targets),
+        }
+        for tree in trees
+    ])
+    return CompiledEnsemble(
+        n_features=int(model_param['num_feature']),
+        kind='xgboost',
+        base_score=base_score,
+        aggregate='sum',
+        strict=True,
+        link=link,
+        **flat,
+    )
+
+
+def _float32_at_most(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 values not above float64 thresholds
+
+    scikit-learn compares float32 inputs against float64 thresholds; for a
+    float32 `x`, `x <= t` holds exactly when `x <= _float32_at_most(t)`.
+    """
+    rounded = threshold.astype(np.float32)
+    too_big = rounded.astype(np.float64) > threshold
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def compile_random_forest(model) -> CompiledEnsemble:
+    """
+    Compile a fitted scikit-learn RandomForestRegressor (or ExtraTreesRegressor)
+    """
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if tree.value.shape[1] != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        trees.append({
+            'feature': tree.feature.astype(np.int64),
+            'threshold': _float32_at_most(tree.threshold),
+            'left': tree.children_left.astype(np.int64),
+            'right': tree.children_right.astype(np.int64),
+            # Forests fitted without missing values never see NaN after nan_to_num
+            'default_left': getattr(tree, 'missing_go_to_left', np.ones(tree.node_count)).astype(bool),
+            'value': tree.value[:, 0, 0],
+        })
+    flat = _concatenate(trees)
+    return CompiledEnsemble(
+        n_features=int(model.n_features_in_),
+        kind='randomforest',
+        aggregate='mean',
+        strict=False,
+        **flat,
+    )
+
+
+def compile_model(model) -> CompiledEnsemble:
+    """
+    Compile an XGBoost or random forest regressor, whichever `model` is
+    """
+    if hasattr(model, 'get_booster'):
+        return compile_xgboost(model)
+    if hasattr(model, 'estimators_'):
+        return compile_random_forest(model)
+    raise TypeError(f"Cannot compile {type(model).__name__}")
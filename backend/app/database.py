@@ -1,6 +1,8 @@
 import os
+import time
 import logging
-import urllib.parse
+import threading
+from datetime import datetime
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
@@ -50,99 +52,144 @@ if MONGODB_URL and "mongodb" in MONGODB_URL:
 else:
     logger.info(f"Attempting to connect to MongoDB at: {MONGODB_URL}")
 
-# Initialize client as None
+# Seconds between background connection checks
+MONGO_PROBE_INTERVAL = float(os.getenv("MONGO_PROBE_INTERVAL", "30"))
+
+# The client is created on first use. MongoClient does not block while it is
+# constructed, so neither importing this module nor the first collection
+# lookup waits for the server; only real queries do.
 client = None
 database = None
+_client_lock = threading.Lock()
+
+# Last result of check_connection(), refreshed by the background probe
+_connection_state = {
+    "connected": False,
+    "checked_at": None,
+    "latency_ms": None,
+    "error": "not checked yet"
+}
+_probe_thread = None
+_probe_stop = threading.Event()
 
-try:
-    client = MongoClient(
-        MONGODB_URL, 
-        serverSelectionTimeoutMS=10000,  # Increased timeout
-        connectTimeoutMS=20000,
-        socketTimeoutMS=20000
-    )
-    # Test the connection
-    client.admin.command('ping')
-    logger.info("MongoDB connection successful")
-    
-    # Access database
-    database = client.dpr_evaluation_system
-    # Test database access
-    database.list_collection_names()
-    logger.info("Database access successful")
-    
-except Exception as e:
-    logger.error(f"Failed to connect to MongoDB: {e}")
-    # If we're on Render, this is a critical error
-    if os.getenv("RENDER"):
-        logger.error("CRITICAL: MongoDB connection failed on Render. Check your MONGODB_URL environment variable.")
-        logger.error("Common issues and solutions:")
-        logger.error("1. Incorrect username or password - Verify your credentials")
-        logger.error("2. Database user not created in MongoDB Atlas - Create a database user in Atlas")
-        logger.error("3. Network access not configured - Add Render's IP to MongoDB Atlas whitelist")
-        logger.error("4. Database user doesn't have access - Ensure user has read/write permissions")
-        logger.error("5. Wrong connection string format - Must use mongodb+srv:// not mongodb://")
-        logger.error("")
-        logger.error("To fix this:")
-        logger.error("1. Go to your Render dashboard")
-        logger.error("2. Select your service")
-        logger.error("3. Go to Environment tab")
-        logger.error("4. Add MONGODB_URL with your MongoDB Atlas SRV connection string")
-        logger.error("5. Redeploy your service")
-    else:
-        logger.info("Using in-memory fallback for development")
-        # Create a mock database for development/testing
-        from pymongo import MongoClient as MockMongoClient
-        client = MockMongoClient("mongodb://localhost:27017", serverSelectionTimeoutMS=1)
-        database = client.dpr_evaluation_system
-
-# Collections (with fallback)
-try:
-    if database is not None:
-        users_collection = database.get_collection("users")
-        dprs_collection = database.get_collection("dprs")
-        risks_collection = database.get_collection("risks")
-        feedbacks_collection = database.get_collection("feedbacks")
-    else:
-        logger.error("Database is None, cannot create collections")
-        # Create mock collections for development
-        from pymongo import MongoClient as MockMongoClient
-        mock_client = MockMongoClient("mongodb://localhost:27017", serverSelectionTimeoutMS=1)
-        mock_db = mock_client.dpr_evaluation_system
-        users_collection = mock_db.get_collection("users")
-        dprs_collection = mock_db.get_collection("dprs")
-        risks_collection = mock_db.get_collection("risks")
-        feedbacks_collection = mock_db.get_collection("feedbacks")
-except Exception as e:
-    logger.error(f"Failed to create collections: {e}")
-    # Create mock collections as fallback
-    try:
-        from pymongo import MongoClient as MockMongoClient
-        mock_client = MockMongoClient("mongodb://localhost:27017", serverSelectionTimeoutMS=1)
-        mock_db = mock_client.dpr_evaluation_system
-        users_collection = mock_db.get_collection("users")
-        dprs_collection = mock_db.get_collection("dprs")
-        risks_collection = mock_db.get_collection("risks")
-        feedbacks_collection = mock_db.get_collection("feedbacks")
-    except Exception as e2:
-        logger.error(f"Failed to create mock collections: {e2}")
-        # Set to None as last resort
-        users_collection = None
-        dprs_collection = None
-        risks_collection = None
-        feedbacks_collection = None
 
 def get_database():
+    global client, database
+    if database is None:
+        with _client_lock:
+            if database is None:
+                client = MongoClient(
+                    MONGODB_URL,
+                    serverSelectionTimeoutMS=10000,
+                    connectTimeoutMS=20000,
+                    socketTimeoutMS=20000,
+                    connect=False
+                )
+                database = client.dpr_evaluation_system
     return database
 
+def close_client() -> None:
+    """
+    Close the MongoDB client and forget it, so the next get_database() opens a new one
+
+    A MongoClient is not fork-safe: serve.py calls this in the master before
+    forking, so each worker connects on its own.
+    """
+    global client, database
+    with _client_lock:
+        if client is not None:
+            client.close()
+        client = None
+        database = None
+
 def get_users_collection():
-    return users_collection
+    return get_database().get_collection("users")
 
 def get_dprs_collection():
-    return dprs_collection
+    return get_database().get_collection("dprs")
 
 def get_risks_collection():
-    return risks_collection
+    return get_database().get_collection("risks")
 
 def get_feedbacks_collection():
-    return feedbacks_collection
\ No newline at end of file
+    return get_database().get_collection("feedbacks")
+
+
+def _log_connection_help():
+    """
+    Explain the usual causes of a failed connection on Render
+    """
+    logger.error("CRITICAL: MongoDB connection failed on Render. Check your MONGODB_URL environment variable.")
+    logger.error("Common issues and solutions:")
+    logger.error("1. Incorrect username or password - Verify your credentials")
+    logger.error("2. Database user not created in MongoDB Atlas - Create a database user in Atlas")
+    logger.error("3. Network access not configured - Add Render's IP to MongoDB Atlas whitelist")
+    logger.error("4. Database user doesn't have access - Ensure user has read/write permissions")
+    logger.error("5. Wrong connection string format - Must use mongodb+srv:// not mongodb://")
+
+
+def check_connection() -> dict:
+    """
+    Ping MongoDB once and update the cached connection state
+    """
+    first_check = _connection_state["checked_at"] is None
+    was_connected = _connection_state["connected"]
+    start = time.perf_counter()
+    try:
+        get_database().client.admin.command('ping')
+        _connection_state.update(
+            connected=True,
+            checked_at=datetime.utcnow(),
+            latency_ms=round((time.perf_counter() - start) * 1000, 1),
+            error=None
+        )
+        if not was_connected:
+            logger.info("MongoDB connection successful")
+    except Exception as e:
+        _connection_state.update(
+            connected=False,
+            checked_at=datetime.utcnow(),
+            latency_ms=None,
+            error=str(e)
+        )
+        # Only log state changes so a long outage doesn't flood the logs
+        if first_check or was_connected:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            if os.getenv("RENDER"):
+                _log_connection_help()
+    return get_connection_state()
+
+
+def get_connection_state() -> dict:
+    """
+    Return the cached connection state without touching the database
+    """
+    return dict(_connection_state)
+
+
+def _probe_loop(interval: float):
+    while not _probe_stop.is_set():
+        check_connection()
+        _probe_stop.wait(interval)
+
+
+def start_connection_probe(interval: float = MONGO_PROBE_INTERVAL) -> threading.Thread:
+    """
+    Start the background thread that keeps the connection state fresh
+    """
+    global _probe_thread
+    if _probe_thread is None or not _probe_thread.is_alive():
+        _probe_stop.clear()
+        _probe_thread = threading.Thread(
+            target=_probe_loop, args=(interval,), name="mongo-probe", daemon=True
+        )
+        _probe_thread.start()
+    return _probe_thread
+
+
+def stop_connection_probe():
+    """
+    Stop the background connection probe
+    """
+    _probe_stop.set()
+
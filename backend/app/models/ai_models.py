@@ -18,6 +18,11 @@ class EnhancedDPRExtraction(BaseModel):
     yearly_budget: Optional[str] = None
     contingency: Optional[str] = None
     
+    # Numeric values of the fields above, set once by normalize_extraction
+    estimated_cost_inr: Optional[float] = None
+    contingency_inr: Optional[float] = None
+    duration_months: Optional[float] = None
+    
     # Timeline Data
     start_date: Optional[str] = None
     end_date: Optional[str] = None
@@ -11,6 +11,7 @@ class FileType(str, Enum):
 class DPRExtraction(BaseModel):
     project_title: Optional[str] = None
     budget: Optional[str] = None
+    budget_inr: Optional[float] = None
     timeline: Optional[str] = None
     resource_allocation: Optional[str] = None
     location: Optional[str] = None
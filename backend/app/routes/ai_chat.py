@@ -1,13 +1,13 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 from bson import ObjectId
-from app.ai.ai_service import AIService
+from app.ai.ai_service import get_ai_service
 from app.database import get_dprs_collection
 from datetime import datetime
 import json
 
 router = APIRouter()
-ai_service = AIService()
+ai_service = get_ai_service()
 
 class ChatRequest(BaseModel):
     question: str
@@ -1,5 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, status
 from typing import List
 import uuid
 from datetime import datetime
@@ -9,41 +8,34 @@ from app.models.risk import RiskCreate, RiskScore
 from app.utils.dpr_processor import extract_text_from_pdf, extract_text_from_word, extract_text_from_image, extract_dpr_elements
 from app.database import get_dprs_collection, get_risks_collection
 from app.services.risk_calculator import calculate_risk_scores
-from app.ai.ai_service import AIService
+from app.ai.ai_service import get_ai_service
+from app.ai.report_cache import REPORT_FILENAMES
+from app.routes import reports
 from app.models.ai_models import EnhancedDPRExtraction
-import os
 
 router = APIRouter()
-ai_service = AIService()
+ai_service = get_ai_service()
 
 @router.get("/reports/{report_filename}")
-async def download_report(report_filename: str):
+async def download_report(report_filename: str, request: Request):
     """Download a generated report PDF"""
-    # Check if file exists in backend directory (where reports are generated)
-    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    file_path = os.path.join(backend_dir, report_filename)
-    
-    # Also check in current directory as fallback
-    if not os.path.exists(file_path):
-        file_path = os.path.join(os.getcwd(), report_filename)
-    
-    # Also check in the root directory
-    if not os.path.exists(file_path):
-        file_path = os.path.join(os.path.dirname(backend_dir), report_filename)
-    
-    print(f"Looking for report file: {file_path}")
-    
-    if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Report not found: {report_filename}"
+    return await reports.download_report(report_filename, request)
+
+def dpr_report_placeholders(dpr_id: str, enhanced_extraction, ai_risk_scores, recommendations) -> dict:
+    """
+    A DPR's "reports" field: each report's filename and content key
+
+    Nothing is rendered here. A report is rendered the first time it is
+    downloaded (or by materialize_reports.py), and most never are.
+    """
+    report_files = {}
+    for report_type in ("analytical", "recommendation"):
+        field = f"{report_type}_report"
+        report_files[field] = REPORT_FILENAMES[report_type].format(dpr_id=dpr_id)
+        report_files[f"{field}_key"] = ai_service.report_key(
+            report_type, enhanced_extraction, ai_risk_scores, recommendations
         )
-    
-    return FileResponse(
-        path=file_path,
-        filename=report_filename,
-        media_type='application/pdf'
-    )
+    return report_files
 
 @router.post("/upload", response_model=DPRResponse)
 async def upload_dpr(
@@ -84,6 +76,7 @@ async def upload_dpr(
     extracted_data = DPRExtraction(
         project_title=enhanced_extraction.project_title,
         budget=enhanced_extraction.budget,
+        budget_inr=enhanced_extraction.estimated_cost_inr,
         timeline=enhanced_extraction.timeline,
         resource_allocation=enhanced_extraction.resource_allocation,
         location=enhanced_extraction.location,
@@ -105,7 +98,7 @@ async def upload_dpr(
     dpr_doc["id"] = str(result.inserted_id)
     
     # Calculate and store risk scores using enhanced extraction
-    risk_scores = calculate_risk_scores(extracted_data)
+    risk_scores = calculate_risk_scores(extracted_data, dpr_doc["id"])
     risk_doc = {
         "dpr_id": dpr_doc["id"],
         "project_title": enhanced_extraction.project_title or "Unknown Project",
@@ -164,6 +157,7 @@ async def upload_dpr_with_ai(
     extracted_data = DPRExtraction(
         project_title=enhanced_extraction.project_title,
         budget=enhanced_extraction.budget,
+        budget_inr=enhanced_extraction.estimated_cost_inr,
         timeline=enhanced_extraction.timeline,
         resource_allocation=enhanced_extraction.resource_allocation,
         location=enhanced_extraction.location,
@@ -206,19 +200,10 @@ async def upload_dpr_with_ai(
     risks_collection = get_risks_collection()
     risks_collection.insert_one(risk_doc)
     
-    # Generate reports if requested
+    # Record the reports if requested; they are rendered on first download
     report_files = {}
     if generate_reports:
-        analytical_report = ai_service.generate_analytical_report(
-            dpr_id, enhanced_extraction, ai_risk_scores, recommendations
-        )
-        recommendation_report = ai_service.generate_recommendation_report(
-            dpr_id, enhanced_extraction, ai_risk_scores, recommendations
-        )
-        report_files = {
-            "analytical_report": analytical_report,
-            "recommendation_report": recommendation_report
-        }
+        report_files = dpr_report_placeholders(dpr_id, enhanced_extraction, ai_risk_scores, recommendations)
         
         # Update DPR document with report information
         dprs_collection.update_one(
@@ -301,13 +286,8 @@ async def analyze_dpr_with_ai(dpr_id: str):
     ai_risk_scores = ai_service.predict_dpr_risks(enhanced_extraction)
     recommendations = ai_service.generate_recommendations(ai_risk_scores, completeness_score)
     
-    # Generate reports
-    analytical_report = ai_service.generate_analytical_report(
-        dpr_id, enhanced_extraction, ai_risk_scores, recommendations
-    )
-    recommendation_report = ai_service.generate_recommendation_report(
-        dpr_id, enhanced_extraction, ai_risk_scores, recommendations
-    )
+    # Reports are rendered on first download
+    report_files = dpr_report_placeholders(dpr_id, enhanced_extraction, ai_risk_scores, recommendations)
     
     # Update DPR document with AI analysis results
     dprs_collection.update_one(
@@ -316,7 +296,8 @@ async def analyze_dpr_with_ai(dpr_id: str):
             "enhanced_extraction": enhanced_extraction.dict(),
             "ai_risk_scores": ai_risk_scores,
             "recommendations": [rec.dict() for rec in recommendations],
-            "completeness_score": completeness_score
+            "completeness_score": completeness_score,
+            "reports": report_files
         }}
     )
     
@@ -326,10 +307,7 @@ async def analyze_dpr_with_ai(dpr_id: str):
         "ai_risk_scores": ai_risk_scores,
         "recommendations": [rec.dict() for rec in recommendations],
         "completeness_score": completeness_score,
-        "reports": {
-            "analytical_report": analytical_report,
-            "recommendation_report": recommendation_report
-        }
+        "reports": report_files
     }
 
 @router.get("/{dpr_id}/completeness", response_model=dict)
@@ -380,16 +358,27 @@ async def get_dpr_completeness(dpr_id: str):
         "completeness_score": completeness_score
     }
 
+# Numeric dashboard sort keys and the indexed fields they sort on (see init_db.py)
+DASHBOARD_SORT_FIELDS = {
+    "estimated_cost": "enhanced_extraction.estimated_cost_inr",
+    "duration": "enhanced_extraction.duration_months",
+}
+
 @router.get("/organization/dashboard", response_model=List[DPRResponse])
-async def get_all_dprs_for_organization():
+async def get_all_dprs_for_organization(
+    sort_by: str = Query("uploaded_at", pattern="^(uploaded_at|estimated_cost|duration)$")
+):
     """
-    Get all DPRs for organization dashboard
+    Get all DPRs for organization dashboard, newest first or by estimated cost or duration (largest first)
     """
     dprs_collection = get_dprs_collection()
     risks_collection = get_risks_collection()
     
     # Find all DPRs
-    dprs = list(dprs_collection.find({}))
+    if sort_by in DASHBOARD_SORT_FIELDS:
+        dprs = list(dprs_collection.find({}).sort(DASHBOARD_SORT_FIELDS[sort_by], -1))
+    else:
+        dprs = list(dprs_collection.find({}))
     
     # Format response with error handling
     formatted_dprs = []
@@ -439,7 +428,8 @@ async def get_all_dprs_for_organization():
         except:
             return datetime.min
     
-    formatted_dprs.sort(key=get_sort_key, reverse=True)
+    if sort_by == "uploaded_at":
+        formatted_dprs.sort(key=get_sort_key, reverse=True)
     
     return formatted_dprs
 
@@ -1,28 +1,72 @@
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import FileResponse
+import os
+import re
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+import anyio
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from bson import ObjectId
-from app.ai.ai_service import AIService
+from bson.errors import InvalidId
+from starlette.concurrency import run_in_threadpool
+from app.ai.ai_service import get_ai_service
+from app.ai.report_cache import PORTFOLIO_REPORT_FILENAME, REPORT_FILENAMES, parse_report_filename
 from app.database import get_dprs_collection
 from app.models.ai_models import EnhancedDPRExtraction, Recommendation
-import os
+from app.services.portfolio_risk import load_snapshot, portfolio_summary
+from app.services.report_export import EXPORT_PROJECTION, export_query, stream_reports_zip
+from app.services.report_materialization import DPRNotAnalysedError, report_inputs
+from app.utils.stored_file_response import etag_matches, stored_file_response
 
 router = APIRouter()
-ai_service = AIService()
+ai_service = get_ai_service()
+
+# Reports built in memory at once by /{dpr_id}/{report_type}/view; further requests wait
+REPORT_RENDER_CONCURRENCY = int(os.getenv("REPORT_RENDER_CONCURRENCY", "4"))
+STREAM_CHUNK_SIZE = 64 * 1024
+_render_limiter = None
 
 class ReportRequest(BaseModel):
     dpr_id: str
     report_type: str  # "analytical" or "recommendation"
 
+class ReportType(str, Enum):
+    analytical = "analytical"
+    recommendation = "recommendation"
+
 class ReportResponse(BaseModel):
     message: str
     report_path: str
 
+def dpr_report_inputs(dpr: dict) -> Tuple[EnhancedDPRExtraction, Dict[str, float], List[Recommendation]]:
+    """
+    report_inputs of a DPR, with its errors as HTTP responses
+    """
+    try:
+        return report_inputs(dpr)
+    except DPRNotAnalysedError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="DPR has not been analyzed with AI yet. Please run AI analysis first."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deserializing enhanced extraction: {str(e)}"
+        )
+
 @router.post("/generate", response_model=ReportResponse)
 async def generate_report(report_request: ReportRequest):
     """
     Generate AI-powered reports for a DPR
     """
+    # Rendering, and waiting on another render of the same report, blocks
+    return await run_in_threadpool(generate_dpr_report, report_request)
+
+def generate_dpr_report(report_request: ReportRequest) -> ReportResponse:
+    """
+    Render a DPR's report into the report store unless it is stored, and record it on the DPR
+    """
     dprs_collection = get_dprs_collection()
     
     # Find DPR by ID
@@ -32,95 +76,222 @@ async def generate_report(report_request: ReportRequest):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="DPR not found"
         )
+    enhanced_extraction, ai_risk_scores, recommendations = dpr_report_inputs(dpr)
     
-    # Get enhanced extraction
-    enhanced_extraction_data = dpr.get("enhanced_extraction")
-    if not enhanced_extraction_data:
+    if report_request.report_type not in ("analytical", "recommendation"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="DPR has not been analyzed with AI yet. Please run AI analysis first."
+            detail="Invalid report type. Use 'analytical' or 'recommendation'."
         )
     
-    # Deserialize enhanced extraction
+    # Generate the report, unless one with the same inputs is already cached
+    reports = dpr.get("reports", {})
+    field = f"{report_request.report_type}_report"
+    report_filename, report_key = ai_service.get_or_generate_report(
+        report_request.report_type, report_request.dpr_id, enhanced_extraction, ai_risk_scores, recommendations
+    )
+    
+    # Update DPR with report information
+    if reports.get(field) != report_filename or reports.get(f"{field}_key") != report_key:
+        dprs_collection.update_one(
+            {"_id": ObjectId(report_request.dpr_id)},
+            {"$set": {f"reports.{field}": report_filename, f"reports.{field}_key": report_key}}
+        )
+    
+    return ReportResponse(
+        message=f"{report_request.report_type.capitalize()} report generated successfully",
+        report_path=report_filename
+    )
+
+def stored_report_response(request: Request, dpr_id: str, report_type: str):
+    """
+    Serve a DPR's report from the report store, rendering it first if it is not stored yet
+
+    The key is computed from the DPR's current analysis, so a report is
+    never stale after the DPR is re-analysed or rescored.
+    """
     try:
-        enhanced_extraction = EnhancedDPRExtraction(**enhanced_extraction_data)
-    except Exception as e:
+        dpr = get_dprs_collection().find_one({"_id": ObjectId(dpr_id)})
+    except InvalidId:
+        dpr = None
+    if not dpr:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error deserializing enhanced extraction: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="DPR not found"
         )
     
-    # Get AI analysis results
-    ai_risk_scores = dpr.get("ai_risk_scores")
-    recommendations_data = dpr.get("recommendations", [])
+    field = f"{report_type}_report"
+    stored = None
+    if dpr.get("enhanced_extraction") and dpr.get("ai_risk_scores"):
+        enhanced_extraction, ai_risk_scores, recommendations = dpr_report_inputs(dpr)
+        report_filename, key = ai_service.get_or_generate_report(
+            report_type, dpr_id, enhanced_extraction, ai_risk_scores, recommendations
+        )
+        if key != dpr.get("reports", {}).get(f"{field}_key"):
+            get_dprs_collection().update_one(
+                {"_id": dpr["_id"]},
+                {"$set": {f"reports.{field}": report_filename, f"reports.{field}_key": key}}
+            )
+        stored = ai_service.report_store.get(key)
     
-    if not ai_risk_scores:
+    if stored is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="DPR has not been analyzed with AI yet. Please run AI analysis first."
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {report_type} report is available for this DPR"
         )
-    
-    recommendations = []
-    for rec_data in recommendations_data:
-        try:
-            rec = Recommendation(**rec_data)
-            recommendations.append(rec)
-        except:
-            pass
-    
-    # Generate report based on type
-    if report_request.report_type == "analytical":
-        report_filename = ai_service.generate_analytical_report(
-            report_request.dpr_id, enhanced_extraction, ai_risk_scores, recommendations
+    return stored_file_response(request, stored, REPORT_FILENAMES[report_type].format(dpr_id=dpr_id))
+
+@router.get("/download/{report_filename}")
+async def download_report(report_filename: str, request: Request):
+    """
+    Download a generated report by its filename ({dpr_id}_Heatmap_Analysis.pdf or
+    {dpr_id}_Recommendations_Report.pdf)
+    """
+    parsed = parse_report_filename(report_filename)
+    if parsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Report not found: {report_filename}"
         )
-    elif report_request.report_type == "recommendation":
-        report_filename = ai_service.generate_recommendation_report(
-            report_request.dpr_id, enhanced_extraction, ai_risk_scores, recommendations
+    dpr_id, report_type = parsed
+    return await run_in_threadpool(stored_report_response, request, dpr_id, report_type)
+
+@router.get("/export")
+async def export_reports(state: Optional[str] = None, district: Optional[str] = None,
+                         department: Optional[str] = None, quarter: Optional[str] = None,
+                         uploaded_by: Optional[str] = None, report_type: Optional[ReportType] = None):
+    """
+    Download the reports of every DPR matching the filters as one ZIP
+
+    Filters combine: state, district and department (case-insensitive),
+    quarter of upload (YYYY-Qn, e.g. 2024-Q3) and uploader. Both report types
+    are included unless report_type is given. Reports not rendered yet are
+    rendered while the archive streams; index.csv lists every DPR with the
+    status of its reports.
+    """
+    try:
+        query = export_query(state, district, department, quarter, uploaded_by)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-    else:
+    report_types = [report_type.value] if report_type else list(REPORT_FILENAMES)
+    # The cursor is only iterated by the response, in the threadpool
+    cursor = get_dprs_collection().find(query, projection=EXPORT_PROJECTION)
+
+    label = "_".join(value for value in (state, district, department, quarter) if value) or "all"
+    filename = f"dpr_reports_{re.sub(r'[^A-Za-z0-9-]+', '-', label)}.zip"
+    return StreamingResponse(stream_reports_zip(ai_service, cursor, report_types), media_type="application/zip",
+                             headers={
+                                 "content-disposition": f'attachment; filename="{filename}"',
+                                 "cache-control": "no-store",
+                             })
+
+def portfolio_report_response(request: Request):
+    summary = portfolio_summary(load_snapshot(get_dprs_collection()))
+    key = ai_service.get_or_generate_portfolio_report(summary)
+    return stored_file_response(request, ai_service.report_store.get(key), PORTFOLIO_REPORT_FILENAME)
+
+@router.get("/portfolio")
+async def get_portfolio_report(request: Request):
+    """
+    Download the portfolio report: mean AI risk scores of all analysed DPRs
+    as state x risk type and department x risk type heatmaps
+
+    The PDF is keyed by the aggregated scores, so it is only rendered again
+    once they change.
+    """
+    return await run_in_threadpool(portfolio_report_response, request)
+
+@router.get("/{dpr_id}/{report_type}")
+async def get_dpr_report(dpr_id: str, report_type: ReportType, request: Request):
+    """
+    Download a DPR's current analytical or recommendation report
+
+    The report is rendered on the first download. Supports Range requests
+    and ETag revalidation (If-None-Match).
+    """
+    return await run_in_threadpool(stored_report_response, request, dpr_id, report_type.value)
+
+def report_payload_response(request: Request, dpr_id: str) -> Response:
+    try:
+        dpr = get_dprs_collection().find_one({"_id": ObjectId(dpr_id)},
+                                             {"enhanced_extraction": 1, "ai_risk_scores": 1})
+    except InvalidId:
+        dpr = None
+    if not dpr:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="DPR not found"
+        )
+    if not dpr.get("enhanced_extraction") or not dpr.get("ai_risk_scores"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid report type. Use 'analytical' or 'recommendation'."
+            detail="DPR has not been analyzed with AI yet. Please run AI analysis first."
+        )
+    try:
+        key, body = ai_service.analytical_payload_json(dpr_id, dpr["enhanced_extraction"], dpr["ai_risk_scores"])
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deserializing enhanced extraction: {str(e)}"
         )
-    
-    # Update DPR with report information
-    reports = dpr.get("reports", {})
-    if report_request.report_type == "analytical":
-        reports["analytical_report"] = report_filename
-    else:
-        reports["recommendation_report"] = report_filename
-    
-    dprs_collection.update_one(
-        {"_id": ObjectId(report_request.dpr_id)},
-        {"$set": {"reports": reports}}
-    )
-    
-    return ReportResponse(
-        message=f"{report_request.report_type.capitalize()} report generated successfully",
-        report_path=report_filename
-    )
 
-@router.get("/download/{report_filename}")
-async def download_report(report_filename: str):
+    etag = f'"{key}"'
+    # Changes when the DPR is re-analysed, so revalidate
+    headers = {"etag": etag, "cache-control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+@router.get("/{dpr_id}/analytical/data")
+async def get_dpr_report_data(dpr_id: str, request: Request):
     """
-    Download a generated report
+    The sections of a DPR's analytical report as JSON, for rendering in the client
+
+    Project information, insights, risk scores with levels, the numbers
+    behind the risk distribution and correlation charts, the missing-data
+    assessment and the overall quality score, as the PDF shows them. The
+    JSON is cached per analysis, and the ETag answers If-None-Match with 304.
     """
-    # Check if file exists in backend directory
-    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    file_path = os.path.join(backend_dir, report_filename)
-    
-    # Also check in current directory as fallback
-    if not os.path.exists(file_path):
-        file_path = os.path.join(os.getcwd(), report_filename)
-    
-    if not os.path.exists(file_path):
+    return await run_in_threadpool(report_payload_response, request, dpr_id)
+
+@router.get("/{dpr_id}/{report_type}/view")
+async def view_dpr_report(dpr_id: str, report_type: ReportType):
+    """
+    Build a DPR's report in memory and stream it for viewing in the browser
+
+    Nothing is written to disk or to the report store. At most
+    REPORT_RENDER_CONCURRENCY reports are built at a time, which bounds the
+    memory in use under load.
+    """
+    global _render_limiter
+    try:
+        dpr = await run_in_threadpool(get_dprs_collection().find_one, {"_id": ObjectId(dpr_id)})
+    except InvalidId:
+        dpr = None
+    if not dpr:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Report not found: {report_filename}"
+            detail="DPR not found"
         )
-    
-    return FileResponse(
-        path=file_path,
-        filename=report_filename,
-        media_type='application/pdf'
-    )
\ No newline at end of file
+    enhanced_extraction, ai_risk_scores, recommendations = dpr_report_inputs(dpr)
+
+    if _render_limiter is None:
+        _render_limiter = anyio.CapacityLimiter(REPORT_RENDER_CONCURRENCY)
+    pdf = await anyio.to_thread.run_sync(
+        ai_service.render_report, report_type.value, dpr_id, enhanced_extraction, ai_risk_scores, recommendations,
+        limiter=_render_limiter
+    )
+
+    def chunks():
+        for offset in range(0, len(pdf), STREAM_CHUNK_SIZE):
+            yield pdf[offset:offset + STREAM_CHUNK_SIZE]
+
+    filename = REPORT_FILENAMES[report_type.value].format(dpr_id=dpr_id)
+    return StreamingResponse(chunks(), media_type="application/pdf", headers={
+        "content-length": str(len(pdf)),
+        "content-disposition": f'inline; filename="{filename}"',
+        "cache-control": "no-store",
+    })
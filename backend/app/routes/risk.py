@@ -1,14 +1,64 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from bson import ObjectId
 from datetime import datetime
 from app.models.risk import RiskCreate, RiskResponse, RiskScore
 from app.database import get_risks_collection, get_dprs_collection
-from app.ai.ai_service import AIService
+from app.ai.ai_service import get_ai_service
 from app.models.ai_models import EnhancedDPRExtraction
 
 router = APIRouter()
-ai_service = AIService()
+ai_service = get_ai_service()
+
+def _model_status() -> dict:
+    from app.ai.model_registry import get_model_registry
+    info = ai_service.risk_predictor.model_info()
+    info["prediction_cache"] = ai_service.prediction_cache.stats()
+    try:
+        info["registry_active_version"] = get_model_registry().active_version()
+    except Exception as e:
+        info["registry_error"] = str(e)
+    return info
+
+# Declared before /{dpr_id} so "models" and "rescore" are not taken for DPR IDs
+@router.get("/models", response_model=dict)
+async def get_model_status():
+    """Report the risk model version this process serves and how long it took to load"""
+    return await run_in_threadpool(_model_status)
+
+@router.post("/models/reload", response_model=dict)
+async def reload_models():
+    """Swap in the registry's active model version without restarting"""
+    try:
+        await run_in_threadpool(ai_service.reload_risk_predictor)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reloading models: {str(e)}"
+        )
+    return await run_in_threadpool(_model_status)
+
+@router.post("/rescore", status_code=status.HTTP_202_ACCEPTED, response_model=dict)
+async def rescore_all_dprs(chunk_size: int = Query(1000, ge=1, le=10000)):
+    """
+    Rescore every analyzed DPR with the current models in the background
+
+    Use after a model update; poll GET /api/risk/rescore for progress.
+    """
+    from app.services.risk_rescoring import start_rescore, get_rescore_state
+    if not start_rescore(chunk_size):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A rescoring run is already in progress"
+        )
+    return get_rescore_state()
+
+@router.get("/rescore", response_model=dict)
+async def get_rescore_status():
+    """Progress and throughput (docs/second) of the latest rescoring run"""
+    from app.services.risk_rescoring import get_rescore_state
+    return get_rescore_state()
 
 @router.get("/{dpr_id}", response_model=RiskResponse)
 async def get_risk_assessment(dpr_id: str):
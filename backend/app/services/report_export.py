@@ -0,0 +1,188 @@
+"""
+Streamed ZIP export of DPR reports
+
+stream_reports_zip turns a cursor of DPR documents into the bytes of a ZIP
+archive holding their analytical and/or recommendation reports, plus an
+index.csv listing every DPR and what was included. Reports missing from the
+report store are rendered on the fly by a small thread pool that works a
+bounded window ahead of the ZIP writer, while stored reports are copied in
+CHUNK_SIZE pieces. zipfile writes to an unseekable stream (sizes go in data
+descriptors after each entry), so nothing is buffered beyond the window and
+one chunk, however many reports the export holds.
+"""
+import csv
+import os
+import re
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from app.ai.report_cache import REPORT_FILENAMES
+from app.services.report_materialization import report_inputs
+
+# Threads rendering missing reports for one export
+EXPORT_WORKERS = int(os.getenv('REPORT_EXPORT_WORKERS', '4'))
+
+CHUNK_SIZE = 256 * 1024
+
+_QUARTER = re.compile(r'^(\d{4})-Q([1-4])$')
+
+INDEX_COLUMNS = ['dpr_id', 'project_title', 'state', 'district', 'department', 'uploaded_at', 'report_type',
+                 'file', 'status']
+
+# DPR fields the export reads
+EXPORT_PROJECTION = {'enhanced_extraction': 1, 'ai_risk_scores': 1, 'recommendations': 1, 'reports': 1,
+                     'uploaded_at': 1, 'extracted_data.project_title': 1}
+
+
+def quarter_range(quarter: str) -> Tuple[datetime, datetime]:
+    """
+    [start, end) of a quarter written as YYYY-Qn
+    """
+    match = _QUARTER.match(quarter)
+    if not match:
+        raise ValueError(f"Quarter must look like 2024-Q3, got {quarter!r}")
+    year, q = int(match.group(1)), int(match.group(2))
+    start = datetime(year, 3 * q - 2, 1)
+    end = datetime(year + 1, 1, 1) if q == 4 else datetime(year, 3 * q + 1, 1)
+    return start, end
+
+
+def export_query(state: str = None, district: str = None, department: str = None, quarter: str = None,
+                 uploaded_by: str = None) -> dict:
+    """
+    MongoDB filter for the DPRs of an export; location and department match case-insensitively
+    """
+    query = {}
+    for field, value in (('state', state), ('district', district), ('department', department)):
+        if value:
+            query[f'enhanced_extraction.{field}'] = {'$regex': f'^{re.escape(value.strip())}$', '$options': 'i'}
+    if quarter:
+        start, end = quarter_range(quarter)
+        query['uploaded_at'] = {'$gte': start, '$lt': end}
+    if uploaded_by:
+        query['uploaded_by'] = uploaded_by
+    return query
+
+
+class _ZipOutput:
+    """
+    Write-only, unseekable sink that hands out what was written since the last take()
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _stored_report(ai_service, dpr: dict, report_type: str):
+    """
+    (stored report or None, status, whether it was rendered now) of one report
+    """
+    if not (dpr.get('enhanced_extraction') and dpr.get('ai_risk_scores')):
+        return None, 'not analysed', False
+
+    try:
+        inputs = report_inputs(dpr)
+        key = ai_service.report_key(report_type, *inputs)
+        stored = ai_service.report_store.get(key)
+        if stored is not None:
+            return stored, 'included', False
+        ai_service.get_or_generate_report(report_type, str(dpr['_id']), *inputs)
+    except Exception as e:
+        return None, f'failed: {e}', False
+    stored = ai_service.report_store.get(key)
+    return stored, 'included' if stored is not None else 'missing', True
+
+
+def _zip_date(dpr: dict) -> Tuple[int, int, int, int, int, int]:
+    uploaded_at = dpr.get('uploaded_at')
+    if isinstance(uploaded_at, datetime) and uploaded_at.year >= 1980:
+        return uploaded_at.timetuple()[:6]
+    return time.localtime()[:6]
+
+
+def _index_row(dpr: dict, report_type: str, filename: str, status: str) -> list:
+    extraction = dpr.get('enhanced_extraction') or {}
+    title = extraction.get('project_title') or (dpr.get('extracted_data') or {}).get('project_title')
+    uploaded_at = dpr.get('uploaded_at')
+    return [str(dpr['_id']), title or '', extraction.get('state') or '', extraction.get('district') or '',
+            extraction.get('department') or '', uploaded_at.isoformat() if isinstance(uploaded_at, datetime) else '',
+            report_type, filename if status == 'included' else '', status]
+
+
+def stream_reports_zip(ai_service, dprs: Iterable[dict], report_types: Sequence[str] = tuple(REPORT_FILENAMES),
+                       workers: int = EXPORT_WORKERS, stats: Optional[dict] = None) -> Iterator[bytes]:
+    """
+    Yield a ZIP of the reports of `dprs` (documents with EXPORT_PROJECTION) in chunks
+
+    `stats`, if given, is filled with counts of included, rendered and skipped reports.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(included=0, rendered=0, skipped=0)
+    output = _ZipOutput()
+    # index.csv grows with the export; past 1 MB it spills to a temporary file
+    index = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', newline='', encoding='utf-8')
+    index_writer = csv.writer(index)
+    index_writer.writerow(INDEX_COLUMNS)
+    jobs = ((dpr, report_type) for dpr in dprs for report_type in report_types)
+
+    def prepare(dpr, report_type):
+        return (dpr, report_type) + _stored_report(ai_service, dpr, report_type)
+
+    with index, ThreadPoolExecutor(max(1, workers), thread_name_prefix='report-export') as pool:
+        try:
+            with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+                # Keep at most 2 * workers reports in flight ahead of the writer
+                window = deque()
+                for job in jobs:
+                    window.append(pool.submit(prepare, *job))
+                    if len(window) < 2 * max(1, workers):
+                        continue
+                    yield from _write_report(archive, output, index_writer, stats, *window.popleft().result())
+                while window:
+                    yield from _write_report(archive, output, index_writer, stats, *window.popleft().result())
+
+                index.seek(0)
+                with archive.open(zipfile.ZipInfo('index.csv', time.localtime()[:6]), 'w') as entry:
+                    for chunk in iter(lambda: index.read(CHUNK_SIZE), ''):
+                        entry.write(chunk.encode('utf-8'))
+                        yield output.take()
+            yield output.take()
+        finally:
+            # The client went away: drop the renders nobody will read
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _write_report(archive: zipfile.ZipFile, output: _ZipOutput, index_writer, stats: dict,
+                  dpr: dict, report_type: str, stored, status: str, rendered: bool) -> Iterator[bytes]:
+    filename = REPORT_FILENAMES[report_type].format(dpr_id=dpr['_id'])
+    index_writer.writerow(_index_row(dpr, report_type, filename, status))
+    if stored is None:
+        stats['skipped'] += 1
+        return
+    stats['included'] += 1
+    stats['rendered'] += bool(rendered)
+    with stored.open() as source, archive.open(zipfile.ZipInfo(filename, _zip_date(dpr)), 'w') as entry:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            entry.write(chunk)
+            yield output.take()
+    yield output.take()
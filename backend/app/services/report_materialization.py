@@ -0,0 +1,181 @@
+"""
+Background rendering of DPR reports that have not been downloaded yet
+
+Uploads and analyses only record each report's filename and content key
+(see dpr_report_placeholders in app/routes/dpr.py); a report is rendered
+on its first download. materialize_reports renders the ones still missing
+from the report store ahead of time, e.g. off-peak or before an export. It
+takes the same per-report locks as the downloads, so a report being
+downloaded while the job runs is still rendered once.
+
+With workers > 0 the reports are rendered and stored by a pool of worker
+processes, for nightly bulk runs. Each worker sets up once what every report
+shares: a ReportGenerator with the compiled paragraph and table styles, the
+font metrics reportlab loads on its first report, and
+configure_batch_rendering. It draws charts in process. The parent keeps
+reading DPRs and writing their report keys.
+"""
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.ai.report_cache import REPORT_FILENAMES
+from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+
+REPORT_TYPES = tuple(REPORT_FILENAMES)
+
+# DPRs whose report keys are written per round trip
+CHUNK_SIZE = 100
+
+
+class DPRNotAnalysedError(ValueError):
+    """
+    The DPR has no enhanced extraction or AI risk scores to build reports from
+    """
+
+
+def report_inputs(dpr: dict) -> Tuple[EnhancedDPRExtraction, Dict[str, float], List[Recommendation]]:
+    """
+    The extraction, risk scores and recommendations of an analysed DPR document
+
+    Raises DPRNotAnalysedError if the DPR has no analysis, and pydantic's
+    ValidationError if its stored extraction is invalid. Invalid
+    recommendations are left out.
+    """
+    extraction_data = dpr.get('enhanced_extraction')
+    risk_scores = dpr.get('ai_risk_scores')
+    if not extraction_data or not risk_scores:
+        raise DPRNotAnalysedError(f"DPR {dpr.get('_id')} has not been analysed")
+    recommendations = []
+    for rec_data in dpr.get('recommendations') or []:
+        try:
+            recommendations.append(Recommendation(**rec_data))
+        except Exception:
+            pass
+    return EnhancedDPRExtraction(**extraction_data), risk_scores, recommendations
+
+
+def materialize_reports(ai_service, dprs_collection, report_types=REPORT_TYPES, limit: int = None,
+                        progress: Optional[Callable[[dict], None]] = None, workers: int = 0) -> dict:
+    """
+    Render every analysed DPR's reports that are not in the report store yet
+
+    Also corrects keys recorded before the DPR was re-analysed or rescored.
+    `workers` > 0 renders in that many worker processes instead of this one.
+    Returns counts of rendered, already stored and failed reports.
+    """
+    stats = {'dprs': 0, 'rendered': 0, 'stored': 0, 'failed': 0}
+    start = time.perf_counter()
+    cursor = dprs_collection.find(
+        {'enhanced_extraction': {'$type': 'object'}, 'ai_risk_scores': {'$type': 'object'}},
+        projection={'enhanced_extraction': 1, 'ai_risk_scores': 1, 'recommendations': 1, 'reports': 1}
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+
+    pool = None
+    if workers > 0:
+        # spawn, not fork: workers should not inherit this process's threads or connections
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker,
+                                   initargs=(ai_service.report_store, ai_service.report_generator.chart_backend))
+    # (future, DPR _id, key update) of reports submitted to the pool and not
+    # collected yet, a couple per worker
+    pending = deque()
+    ops = []
+
+    def collect():
+        future, _id, key_update = pending.popleft()
+        try:
+            future.result()
+        except Exception:
+            stats['failed'] += 1
+            return
+        stats['rendered'] += 1
+        if key_update:
+            ops.append(UpdateOne({'_id': _id}, {'$set': key_update}))
+
+    try:
+        for dpr in cursor:
+            stats['dprs'] += 1
+            dpr_id = str(dpr['_id'])
+            try:
+                inputs = report_inputs(dpr)
+            except Exception:
+                stats['failed'] += len(report_types)
+                continue
+            recorded = dpr.get('reports') or {}
+            update = {}
+            for report_type in report_types:
+                field = f'{report_type}_report'
+                try:
+                    key = ai_service.report_key(report_type, *inputs)
+                    key_update = {}
+                    if recorded.get(f'{field}_key') != key:
+                        key_update = {f'reports.{field}': REPORT_FILENAMES[report_type].format(dpr_id=dpr_id),
+                                      f'reports.{field}_key': key}
+                    if ai_service.report_store.exists(key):
+                        stats['stored'] += 1
+                    elif pool is not None:
+                        # collect() records the key once the worker has rendered the report
+                        pending.append((pool.submit(_render_in_worker, report_type, dpr_id, inputs),
+                                        dpr['_id'], key_update))
+                        while len(pending) > 2 * workers:
+                            collect()
+                        continue
+                    else:
+                        ai_service.get_or_generate_report(report_type, dpr_id, *inputs)
+                        stats['rendered'] += 1
+                except Exception:
+                    stats['failed'] += 1
+                    continue
+                update.update(key_update)
+            if update:
+                ops.append(UpdateOne({'_id': dpr['_id']}, {'$set': update}))
+            if len(ops) >= CHUNK_SIZE:
+                dprs_collection.bulk_write(ops, ordered=False)
+                ops = []
+            if progress and stats['dprs'] % CHUNK_SIZE == 0:
+                progress(_with_rate(stats, start))
+        while pending:
+            collect()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    if ops:
+        dprs_collection.bulk_write(ops, ordered=False)
+    return _with_rate(stats, start)
+
+
+# This worker process's AIService, set up by _init_worker
+_worker_service = None
+
+
+def _init_worker(report_store, chart_backend: str) -> None:
+    """
+    Set up what every report a worker renders shares, before its first report
+    """
+    global _worker_service
+    from app.ai import matplotlib_charts
+    from app.ai.ai_service import AIService
+    from app.ai.report_generator import ReportGenerator, configure_batch_rendering
+
+    configure_batch_rendering()
+    # Charts are drawn in this worker; the pool already uses the cores
+    matplotlib_charts.CHART_WORKERS = 0
+    _worker_service = AIService()
+    _worker_service.report_store = report_store
+    _worker_service.report_generator = ReportGenerator(chart_backend)
+
+
+def _render_in_worker(report_type: str, dpr_id: str, inputs: tuple) -> None:
+    _worker_service.get_or_generate_report(report_type, dpr_id, *inputs)
+
+
+def _with_rate(stats: dict, start: float) -> dict:
+    seconds = time.perf_counter() - start
+    return dict(stats, seconds=seconds, reports_per_minute=stats['rendered'] * 60 / seconds if seconds else 0.0)
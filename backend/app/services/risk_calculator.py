@@ -1,97 +1,147 @@
-import random
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
 from app.models.dpr import DPRExtraction
 from app.models.risk import RiskScore
+from app.utils.normalization import parse_money_inr
+
+# Budgets below this many rupees (1 crore) are treated as small
+SMALL_BUDGET_INR = 1e7
+
+# Seed of the per-DPR variation; scores are a function of (seed, DPR ID, extraction)
+RISK_SCORE_SEED = 42
+
+# DPRExtraction fields whose presence the scores depend on
+SCORED_FIELDS = ['project_title', 'budget', 'timeline', 'resource_allocation', 'location', 'environmental_risks']
+
+RISK_TYPES = ['cost_overruns', 'schedule_delays', 'resource_shortages', 'environmental_risks']
+
+# Budget classes for the cost overrun score
+NO_BUDGET, SMALL_BUDGET, LARGE_BUDGET, UNPARSED_BUDGET = 0, 1, 2, 3
+
+# Score = base + uniform(low, high)
+COST_BANDS = {
+    NO_BUDGET: (70.0, 10, 30),
+    SMALL_BUDGET: (30.0, 10, 30),
+    LARGE_BUDGET: (20.0, 5, 20),
+    UNPARSED_BUDGET: (40.0, 10, 30),
+}
+# (base, low, high) when the field is present, then when it is missing
+PRESENCE_BANDS = {
+    'schedule_delays': ('timeline', (20.0, 5, 25), (60.0, 20, 40)),
+    'resource_shortages': ('resource_allocation', (25.0, 10, 30), (65.0, 15, 35)),
+    'environmental_risks': ('environmental_risks', (40.0, 20, 40), (15.0, 5, 20)),
+}
+# Added to every score when at least this many SCORED_FIELDS are missing
+MISSING_FIELD_PENALTIES = [
+    (4, {'cost_overruns': 20.0, 'schedule_delays': 25.0, 'resource_shortages': 25.0, 'environmental_risks': 15.0}),
+    (2, {'cost_overruns': 10.0, 'schedule_delays': 15.0, 'resource_shortages': 15.0, 'environmental_risks': 10.0}),
+]
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    z = x + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def dpr_keys(dpr_ids: Sequence[str]) -> np.ndarray:
+    """
+    64-bit keys of DPR IDs, the per-DPR input of the score variation
+    """
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(str(dpr_id).encode(), digest_size=8).digest(), 'little') for dpr_id in dpr_ids],
+        dtype=np.uint64
+    )
+
+
+def _uniforms(keys: np.ndarray, seed: int, count: int) -> np.ndarray:
+    """
+    (n, count) uniforms in [0, 1), fixed for each (seed, key) and independent of the batch
+    """
+    with np.errstate(over='ignore'):
+        base = _splitmix64(keys ^ _splitmix64(np.array([seed], dtype=np.uint64)))
+        streams = _splitmix64(base[:, None] + np.arange(count, dtype=np.uint64)[None, :])
+    return (streams >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
 
-def calculate_risk_scores(extracted_data: DPRExtraction) -> RiskScore:
+def budget_classes(has_budget: np.ndarray, budget_inr: np.ndarray) -> np.ndarray:
+    """
+    Budget class of each DPR from whether a budget was extracted and its amount (NaN if unparsed)
+    """
+    budget_inr = np.asarray(budget_inr, dtype=np.float64)
+    classes = np.where(budget_inr < SMALL_BUDGET_INR, SMALL_BUDGET, LARGE_BUDGET)
+    classes = np.where(np.isnan(budget_inr), UNPARSED_BUDGET, classes)
+    return np.where(np.asarray(has_budget, dtype=bool), classes, NO_BUDGET)
+
+
+def calculate_risk_scores_batch(present: Dict[str, np.ndarray], budget_inr: np.ndarray, dpr_ids: Sequence[str],
+                                seed: int = RISK_SCORE_SEED) -> Dict[str, np.ndarray]:
+    """
+    Rule-based risk scores (0-100) for a columnar batch of DPRs
+
+    `present` maps each of SCORED_FIELDS to a boolean array, `budget_inr` is
+    the budget in rupees (NaN when it could not be parsed) and `dpr_ids`
+    seeds each DPR's variation, so a DPR scores the same alone or in any
+    batch. Returns one float array per entry in RISK_TYPES.
+    """
+    present = {field: np.asarray(present[field], dtype=bool) for field in SCORED_FIELDS}
+    u = _uniforms(dpr_keys(dpr_ids), seed, len(RISK_TYPES))
+
+    bands = np.array([COST_BANDS[c] for c in sorted(COST_BANDS)])[budget_classes(present['budget'], budget_inr)]
+    scores = {'cost_overruns': bands[:, 0] + bands[:, 1] + (bands[:, 2] - bands[:, 1]) * u[:, 0]}
+    for column, risk_type in enumerate(RISK_TYPES[1:], start=1):
+        field, if_present, if_missing = PRESENCE_BANDS[risk_type]
+        base, low, high = (np.where(present[field], a, b) for a, b in zip(if_present, if_missing))
+        scores[risk_type] = base + low + (high - low) * u[:, column]
+    scores = {risk_type: np.minimum(100.0, score) for risk_type, score in scores.items()}
+
+    # Increase overall risk if many fields are missing
+    missing_fields = len(SCORED_FIELDS) - np.sum([present[field] for field in SCORED_FIELDS], axis=0)
+    penalty_applied = np.zeros(len(missing_fields), dtype=bool)
+    for threshold, penalties in MISSING_FIELD_PENALTIES:
+        rows = (missing_fields >= threshold) & ~penalty_applied
+        for risk_type, penalty in penalties.items():
+            scores[risk_type] = np.where(rows, scores[risk_type] + penalty, scores[risk_type])
+        penalty_applied |= rows
+
+    return {risk_type: np.clip(score, 0.0, 100.0) for risk_type, score in scores.items()}
+
+
+def extraction_columns(extractions: List[DPRExtraction]) -> Dict[str, np.ndarray]:
+    """
+    Presence flags and budget_inr of DPRExtractions, as calculate_risk_scores_batch takes them
+    """
+    columns = {field: np.array([bool(getattr(e, field)) for e in extractions], dtype=bool) for field in SCORED_FIELDS}
+    budget_inr = []
+    for e in extractions:
+        amount = e.budget_inr
+        if amount is None and e.budget:
+            amount = parse_money_inr(e.budget)
+        budget_inr.append(np.nan if amount is None else amount)
+    columns['budget_inr'] = np.array(budget_inr, dtype=np.float64)
+    return columns
+
+
+def calculate_risk_scores(extracted_data: DPRExtraction, dpr_id: Optional[str] = None) -> RiskScore:
     """
     Calculate risk scores based on extracted DPR data.
     In a real implementation, this would use ML models like XGBoost.
-    For this prototype, we'll use rule-based logic with some randomness.
+    For this prototype, we'll use rule-based logic with some variation per DPR.
+
+    The variation is seeded by `dpr_id`, so the same DPR always gets the same
+    scores and calculate_risk_scores_batch can recompute them in bulk. Without
+    a `dpr_id` it is seeded by the extraction's content, so different projects
+    still vary.
     """
-    
-    # Initialize risk scores
-    cost_overruns = 0.0
-    schedule_delays = 0.0
-    resource_shortages = 0.0
-    environmental_risks = 0.0
-    
-    # Cost Overruns Risk (0-100)
-    if extracted_data.budget:
-        # If budget is mentioned but seems low, higher risk
-        budget_text = extracted_data.budget.lower()
-        if "lakh" in budget_text or "thousand" in budget_text:
-            cost_overruns = min(100.0, 30.0 + random.uniform(10, 30))
-        elif "crore" in budget_text or "million" in budget_text:
-            cost_overruns = min(100.0, 20.0 + random.uniform(5, 20))
-        else:
-            cost_overruns = min(100.0, 40.0 + random.uniform(10, 30))
-    else:
-        # No budget mentioned - high risk
-        cost_overruns = 70.0 + random.uniform(10, 30)
-    
-    # Schedule Delays Risk (0-100)
-    if extracted_data.timeline:
-        # If timeline is mentioned, lower risk
-        schedule_delays = 20.0 + random.uniform(5, 25)
-    else:
-        # No timeline mentioned - high risk
-        schedule_delays = 60.0 + random.uniform(20, 40)
-    
-    # Resource Shortages Risk (0-100)
-    if extracted_data.resource_allocation:
-        # If resource allocation is mentioned, lower risk
-        resource_shortages = 25.0 + random.uniform(10, 30)
-    else:
-        # No resource allocation mentioned - high risk
-        resource_shortages = 65.0 + random.uniform(15, 35)
-    
-    # Environmental Risks (0-100)
-    if extracted_data.environmental_risks:
-        # If environmental risks are mentioned, moderate to high risk
-        environmental_risks = 40.0 + random.uniform(20, 40)
-    else:
-        # No environmental risks mentioned - lower risk
-        environmental_risks = 15.0 + random.uniform(5, 20)
-    
-    # Additional logic for incomplete DPRs
-    # Count how many key fields are missing
-    missing_fields = 0
-    if not extracted_data.project_title:
-        missing_fields += 1
-    if not extracted_data.budget:
-        missing_fields += 1
-    if not extracted_data.timeline:
-        missing_fields += 1
-    if not extracted_data.resource_allocation:
-        missing_fields += 1
-    if not extracted_data.location:
-        missing_fields += 1
-    if not extracted_data.environmental_risks:
-        missing_fields += 1
-    
-    # Increase overall risk if many fields are missing
-    if missing_fields >= 4:
-        # Significantly incomplete DPR - very high risk
-        cost_overruns = min(100.0, cost_overruns + 20.0)
-        schedule_delays = min(100.0, schedule_delays + 25.0)
-        resource_shortages = min(100.0, resource_shortages + 25.0)
-        environmental_risks = min(100.0, environmental_risks + 15.0)
-    elif missing_fields >= 2:
-        # Moderately incomplete DPR - increased risk
-        cost_overruns = min(100.0, cost_overruns + 10.0)
-        schedule_delays = min(100.0, schedule_delays + 15.0)
-        resource_shortages = min(100.0, resource_shortages + 15.0)
-        environmental_risks = min(100.0, environmental_risks + 10.0)
-    
-    # Ensure scores are within 0-100 range
-    cost_overruns = max(0.0, min(100.0, cost_overruns))
-    schedule_delays = max(0.0, min(100.0, schedule_delays))
-    resource_shortages = max(0.0, min(100.0, resource_shortages))
-    environmental_risks = max(0.0, min(100.0, environmental_risks))
-    
-    return RiskScore(
-        cost_overruns=cost_overruns,
-        schedule_delays=schedule_delays,
-        resource_shortages=resource_shortages,
-        environmental_risks=environmental_risks
-    )
\ No newline at end of file
+    if dpr_id is None:
+        dpr_id = 'extraction:' + extracted_data.model_dump_json()
+    columns = extraction_columns([extracted_data])
+    budget_inr = columns.pop('budget_inr')
+    scores = calculate_risk_scores_batch(columns, budget_inr, [dpr_id])
+    return RiskScore(**{risk_type: float(score[0]) for risk_type, score in scores.items()})
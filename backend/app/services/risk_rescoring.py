@@ -0,0 +1,232 @@
+"""
+Bulk rescoring of stored DPRs with the current risk models
+
+Streams `enhanced_extraction` from the dprs collection (projected down to the
+fields the features need), predicts risk scores a chunk at a time with
+RiskPredictor.predict_risks_batch and writes the results back with unordered
+bulk_write upserts: one per DPR into risks, one per DPR into dprs. The
+documents written are the same as POST /api/risk/assess_with_ai/{dpr_id}
+writes for a single DPR.
+
+DPRs uploaded through plain /upload have no enhanced extraction and were
+scored by the rule-based risk_calculator; rescore_legacy_scores recomputes
+those in bulk with calculate_risk_scores_batch.
+
+Upserts into risks rely on the unique dpr_id index created by init_db.py.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from app.models.ai_models import EnhancedDPRExtraction
+from app.models.dpr import DPRExtraction
+from app.services.risk_calculator import calculate_risk_scores_batch, extraction_columns
+from app.ai.risk_predictor import TARGETS
+from app.utils.normalization import NORMALIZED_FIELDS
+
+# DPRs scored and written per round trip
+CHUNK_SIZE = 1000
+
+# enhanced_extraction fields read by the features, completeness score and risk document
+EXTRACTION_FIELDS = [
+    'project_title', 'department', 'estimated_cost', 'contingency', 'duration',
+    'state', 'district', 'num_employees', 'milestones', 'machinery',
+    'raw_materials', 'guidelines_followed', 'missing_documents',
+    'estimated_cost_inr', 'contingency_inr', 'duration_months',
+]
+
+PROJECTION = {f'enhanced_extraction.{field}': 1 for field in EXTRACTION_FIELDS}
+
+
+def build_updates(dprs: List[dict], ai_service) -> Tuple[List[UpdateOne], List[UpdateOne]]:
+    """
+    Score a chunk of DPR documents and return the (risks, dprs) write operations
+    """
+    # Stored extractions were validated when they were saved
+    extractions = [EnhancedDPRExtraction.model_construct(**dpr['enhanced_extraction']) for dpr in dprs]
+    predictor = ai_service.risk_predictor
+    X = np.vstack([predictor.features_to_array(ai_service.dpr_features(e)) for e in extractions])
+    scores = predictor.predict_risks_batch(X)
+
+    calculated_at = datetime.utcnow()
+    risk_ops, dpr_ops = [], []
+    for dpr, extraction, row in zip(dprs, extractions, scores):
+        dpr_id = str(dpr['_id'])
+        risk_scores = {target: float(score) for target, score in zip(TARGETS, row)}
+        completeness_score = ai_service.calculate_completeness_score(extraction, verbose=False)
+        recommendations = [
+            rec.model_dump()
+            for rec in ai_service.generate_recommendations(risk_scores, completeness_score, verbose=False)
+        ]
+        risk_ops.append(UpdateOne(
+            {"dpr_id": dpr_id},
+            {"$set": {
+                "dpr_id": dpr_id,
+                "project_title": extraction.project_title or "Unknown Project",
+                "calculated_at": calculated_at,
+                "risk_scores": risk_scores,
+                "completeness_score": completeness_score,
+                "recommendations": recommendations
+            }},
+            upsert=True
+        ))
+        dpr_set = {
+            "ai_risk_scores": risk_scores,
+            "recommendations": recommendations,
+            "completeness_score": completeness_score,
+            "risk_model_version": predictor.version
+        }
+        # dpr_features normalized extractions stored before the numeric fields existed
+        for field in NORMALIZED_FIELDS:
+            dpr_set[f"enhanced_extraction.{field}"] = getattr(extraction, field)
+        dpr_ops.append(UpdateOne({"_id": dpr['_id']}, {"$set": dpr_set}))
+    return risk_ops, dpr_ops
+
+
+def build_legacy_updates(dprs: List[dict]) -> List[UpdateOne]:
+    """
+    Rule-based risk score upserts for a chunk of plain-upload DPR documents
+    """
+    extractions = [DPRExtraction.model_construct(**(dpr.get('extracted_data') or {})) for dpr in dprs]
+    columns = extraction_columns(extractions)
+    budget_inr = columns.pop('budget_inr')
+    dpr_ids = [str(dpr['_id']) for dpr in dprs]
+    scores = calculate_risk_scores_batch(columns, budget_inr, dpr_ids)
+
+    calculated_at = datetime.utcnow()
+    return [
+        UpdateOne(
+            {"dpr_id": dpr_id},
+            {"$set": {
+                "dpr_id": dpr_id,
+                "project_title": extraction.project_title or "Unknown Project",
+                "calculated_at": calculated_at,
+                "risk_scores": {risk_type: float(score[i]) for risk_type, score in scores.items()}
+            }},
+            upsert=True
+        )
+        for i, (dpr_id, extraction) in enumerate(zip(dpr_ids, extractions))
+    ]
+
+
+def _chunks(cursor: Iterable[dict], size: int) -> Iterable[List[dict]]:
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rescore_portfolio(chunk_size: int = CHUNK_SIZE, dry_run: bool = False, progress=None) -> Dict[str, object]:
+    """
+    Rescore every DPR that has an enhanced extraction
+
+    `progress`, if given, is called with the running stats after each chunk.
+    With dry_run, scores are computed but nothing is written.
+    """
+    from app.ai.ai_service import get_ai_service
+    from app.database import get_dprs_collection, get_risks_collection
+
+    ai_service = get_ai_service()
+    dprs_collection = get_dprs_collection()
+    risks_collection = get_risks_collection()
+
+    cursor = dprs_collection.find(
+        {"enhanced_extraction": {"$type": "object"}},
+        projection=PROJECTION,
+        batch_size=chunk_size
+    )
+    stats = {
+        "model_version": ai_service.risk_predictor.version,
+        "rescored": 0,
+        "failed": 0,
+        "seconds": 0.0,
+        "docs_per_second": 0.0,
+        "dry_run": dry_run
+    }
+    start = time.perf_counter()
+    for chunk in _chunks(cursor, chunk_size):
+        try:
+            risk_ops, dpr_ops = build_updates(chunk, ai_service)
+            if not dry_run:
+                risks_collection.bulk_write(risk_ops, ordered=False)
+                dprs_collection.bulk_write(dpr_ops, ordered=False)
+            stats["rescored"] += len(chunk)
+        except Exception as e:
+            print(f"Error rescoring chunk starting at DPR {chunk[0]['_id']}: {e}")
+            stats["failed"] += len(chunk)
+        stats["seconds"] = time.perf_counter() - start
+        stats["docs_per_second"] = stats["rescored"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress:
+            progress(dict(stats))
+    return stats
+
+
+def rescore_legacy_scores(chunk_size: int = CHUNK_SIZE, dry_run: bool = False, progress=None) -> Dict[str, object]:
+    """
+    Recompute the rule-based scores of every DPR without an enhanced extraction
+    """
+    from app.database import get_dprs_collection, get_risks_collection
+
+    risks_collection = get_risks_collection()
+    cursor = get_dprs_collection().find(
+        {"enhanced_extraction": {"$not": {"$type": "object"}}},
+        projection={"extracted_data": 1},
+        batch_size=chunk_size
+    )
+    stats = {"rescored": 0, "failed": 0, "seconds": 0.0, "docs_per_second": 0.0, "dry_run": dry_run}
+    start = time.perf_counter()
+    for chunk in _chunks(cursor, chunk_size):
+        try:
+            risk_ops = build_legacy_updates(chunk)
+            if not dry_run:
+                risks_collection.bulk_write(risk_ops, ordered=False)
+            stats["rescored"] += len(chunk)
+        except Exception as e:
+            print(f"Error rescoring chunk starting at DPR {chunk[0]['_id']}: {e}")
+            stats["failed"] += len(chunk)
+        stats["seconds"] = time.perf_counter() - start
+        stats["docs_per_second"] = stats["rescored"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress:
+            progress(dict(stats))
+    return stats
+
+
+# Latest background run, for GET /api/risk/rescore
+_rescore_state = {"status": "idle", "stats": None, "error": None}
+_rescore_lock = threading.Lock()
+
+
+def start_rescore(chunk_size: int = CHUNK_SIZE) -> bool:
+    """
+    Rescore the portfolio in a background thread; returns False if a run is already in progress
+    """
+    with _rescore_lock:
+        if _rescore_state["status"] == "running":
+            return False
+        _rescore_state.update(status="running", stats=None, error=None)
+
+    def run():
+        try:
+            stats = rescore_portfolio(chunk_size, progress=lambda s: _rescore_state.update(stats=s))
+            _rescore_state.update(status="done", stats=stats)
+        except Exception as e:
+            _rescore_state.update(status="failed", error=str(e))
+
+    threading.Thread(target=run, name="risk-rescore", daemon=True).start()
+    return True
+
+
+def get_rescore_state() -> dict:
+    return {
+        "status": _rescore_state["status"],
+        "stats": _rescore_state["stats"],
+        "error": _rescore_state["error"]
+    }
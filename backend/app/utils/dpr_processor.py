@@ -1,7 +1,3 @@
-import pdfplumber
-import docx
-import pytesseract
-from PIL import Image
 import io
 import re
 from typing import Dict, List, Optional
@@ -9,6 +5,8 @@ from app.models.dpr import DPRExtraction
 
 def extract_text_from_pdf(file_content: bytes) -> str:
     """Extract text from PDF file"""
+    import pdfplumber
+    
     text = ""
     with pdfplumber.open(io.BytesIO(file_content)) as pdf:
         for page in pdf.pages:
@@ -17,6 +15,8 @@ def extract_text_from_pdf(file_content: bytes) -> str:
 
 def extract_text_from_word(file_content: bytes) -> str:
     """Extract text from Word document"""
+    import docx
+    
     doc = docx.Document(io.BytesIO(file_content))
     text = ""
     for paragraph in doc.paragraphs:
@@ -25,6 +25,9 @@ def extract_text_from_word(file_content: bytes) -> str:
 
 def extract_text_from_image(file_content: bytes) -> str:
     """Extract text from image using OCR"""
+    import pytesseract
+    from PIL import Image
+    
     image = Image.open(io.BytesIO(file_content))
     text = pytesseract.image_to_string(image)
     return text
@@ -32,10 +35,10 @@ def extract_text_from_image(file_content: bytes) -> str:
 def extract_dpr_elements(text: str) -> DPRExtraction:
     """Extract key DPR elements from text with improved handling of missing information"""
     # Import AI service inside the function to avoid circular imports
-    from app.ai.ai_service import AIService
+    from app.ai.ai_service import get_ai_service
     
-    # Initialize AI service
-    ai_service = AIService()
+    # Use the shared AI service
+    ai_service = get_ai_service()
     
     # Use AI service with specialized extraction instead of old NLP extractor
     enhanced_extraction = ai_service.extract_dpr_entities(text)
@@ -43,6 +46,7 @@ def extract_dpr_elements(text: str) -> DPRExtraction:
     return DPRExtraction(
         project_title=enhanced_extraction.project_title,
         budget=enhanced_extraction.budget,
+        budget_inr=enhanced_extraction.estimated_cost_inr,
         timeline=enhanced_extraction.timeline,
         resource_allocation=enhanced_extraction.resource_allocation,
         location=enhanced_extraction.location,
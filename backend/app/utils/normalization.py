@@ -0,0 +1,128 @@
+"""
+Canonical numeric values for money and duration strings
+
+Extracted DPR fields are free text: "₹1,23,45,678", "₹150 crore",
+"Rs. 12.5 Cr", "45 lakh", "2 million", "18 months", "1 year 6 months".
+parse_money_inr and parse_duration_months turn them into rupees and months.
+normalize_extraction runs them once per DPR, when it is extracted, and stores
+the results on the extraction (estimated_cost_inr, contingency_inr,
+duration_months) so nothing downstream parses the strings again.
+"""
+import re
+from typing import Optional
+
+# Rupees per unit
+MONEY_UNITS = {
+    'thousand': 1e3, 'k': 1e3,
+    'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5, 'l': 1e5,
+    'million': 1e6, 'millions': 1e6, 'mn': 1e6,
+    'crore': 1e7, 'crores': 1e7, 'cr': 1e7,
+    'billion': 1e9, 'billions': 1e9, 'bn': 1e9,
+}
+
+# Months per unit
+DURATION_UNITS = {
+    'year': 12.0, 'years': 12.0, 'yr': 12.0, 'yrs': 12.0,
+    'month': 1.0, 'months': 1.0, 'mo': 1.0, 'mos': 1.0,
+    'week': 12 / 52, 'weeks': 12 / 52, 'wk': 12 / 52, 'wks': 12 / 52,
+    'day': 12 / 365, 'days': 12 / 365,
+}
+
+# Amounts in these currencies are not converted to rupees
+FOREIGN_CURRENCY = re.compile(r'[$€£]|\b(?:usd|eur|gbp)\b', re.IGNORECASE)
+
+# A number with optional thousands separators (Western or Indian grouping) and the word after it
+_MONEY = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([a-z]+)?', re.IGNORECASE)
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)[\s-]*([a-z]+)', re.IGNORECASE)
+_PARENTHESIZED = re.compile(r'\([^)]*\)')
+
+# A number without a unit is only taken as months up to this; larger ones are years or IDs, e.g. "2024-2026"
+MAX_BARE_DURATION_MONTHS = 240
+
+# Fields set by normalize_extraction
+NORMALIZED_FIELDS = ('estimated_cost_inr', 'contingency_inr', 'duration_months')
+
+
+def parse_money_inr(text) -> Optional[float]:
+    """
+    Amount in rupees of the first number in `text`, scaled by the unit after it
+
+    Returns None when there is no number or the amount is in another currency.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    if FOREIGN_CURRENCY.search(text):
+        return None
+    # "Rs." and "INR" are prefixes, not units
+    text = re.sub(r'\b(?:rs|inr|rupees?)\b\.?', ' ', text, flags=re.IGNORECASE)
+    match = _MONEY.search(text)
+    if not match:
+        return None
+    digits = match.group(1).replace(',', '')
+    try:
+        value = float(digits)
+    except ValueError:
+        return None
+    unit = (match.group(2) or '').lower()
+    return value * MONEY_UNITS.get(unit, 1.0)
+
+
+def parse_duration_months(text) -> Optional[float]:
+    """
+    Duration in months of `text`, summing every "<number> <unit>" in it
+
+    Parenthesized restatements ("24 months (2 years)") are not added on. A
+    bare number is taken as months if it is at most MAX_BARE_DURATION_MONTHS.
+    Returns None when there is no such duration, e.g. for a range of years.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    months = _sum_durations(_PARENTHESIZED.sub(' ', text))
+    if months is None:
+        months = _sum_durations(text)
+    if months is None:
+        bare = re.search(r'\d+(?:\.\d+)?', text)
+        if not bare:
+            return None
+        months = float(bare.group(0))
+        if not 0 < months <= MAX_BARE_DURATION_MONTHS:
+            return None
+    return round(months, 2)
+
+
+def _sum_durations(text: str) -> Optional[float]:
+    months = None
+    for number, unit in _DURATION.findall(text):
+        scale = DURATION_UNITS.get(unit.lower())
+        if scale is not None:
+            months = (months or 0.0) + float(number) * scale
+    return months
+
+
+def normalize_extraction(extraction):
+    """
+    Store the numeric cost, contingency and duration on an EnhancedDPRExtraction and return it
+
+    An extraction of another model without those fields is converted to
+    app.models.ai_models.EnhancedDPRExtraction first; use the returned object.
+    """
+    if not set(NORMALIZED_FIELDS) <= set(type(extraction).model_fields):
+        from app.models.ai_models import EnhancedDPRExtraction
+        extraction = EnhancedDPRExtraction(**extraction.model_dump())
+    extraction.estimated_cost_inr = parse_money_inr(extraction.estimated_cost)
+    extraction.contingency_inr = parse_money_inr(extraction.contingency)
+    extraction.duration_months = parse_duration_months(extraction.duration)
+    return extraction
+
+
+def ensure_normalized(extraction):
+    """
+    Normalize an extraction stored before the numeric fields existed; others are returned as they are
+    """
+    if not set(NORMALIZED_FIELDS) <= extraction.model_fields_set:
+        extraction = normalize_extraction(extraction)
+    return extraction
@@ -0,0 +1,134 @@
+"""
+Download responses for files in a store, with ETags and byte ranges
+
+stored_file_response answers a GET for a StoredReport (app/ai/report_store.py):
+
+- ETag is the content key, so If-None-Match gets a 304 without reading the file
+- a single `Range: bytes=...` is served as 206 Partial Content (If-Range is
+  honoured); unsatisfiable ranges get 416, and multi-range or malformed
+  headers get the whole file, as RFC 9110 allows
+- local files go out with the ASGI zero-copy send extension (os.sendfile)
+  when the server offers it, and are otherwise read in chunks off the event
+  loop, as are GridFS files
+"""
+import re
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 256 * 1024
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (offset, count) of a single byte range, or None to send the whole file
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        count = min(int(last), size)
+        if count == 0:
+            raise RangeNotSatisfiable()
+        return size - count, count
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, end - start + 1
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag` (weak comparison)
+    """
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+class StoredFileResponse(Response):
+    """
+    `count` bytes of a stored file from `offset`
+    """
+
+    def __init__(self, stored, offset: int, count: int, status_code: int, headers: dict, media_type: str):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.stored = stored
+        self.offset = offset
+        self.count = count
+        self.headers['content-length'] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if scope.get('method') == 'HEAD' or self.count == 0:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        f = await anyio.to_thread.run_sync(self.stored.open)
+        try:
+            if self.stored.path is not None and 'http.response.zerocopysend' in scope.get('extensions', {}):
+                await send({'type': 'http.response.zerocopysend', 'file': f,
+                            'offset': self.offset, 'count': self.count})
+                return
+            await anyio.to_thread.run_sync(f.seek, self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+            if remaining > 0:
+                # The file was shorter than its recorded size; end the body
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            await anyio.to_thread.run_sync(f.close)
+
+
+def stored_file_response(request: Request, stored, filename: str,
+                         media_type: str = 'application/pdf') -> Response:
+    """
+    Response to a GET or HEAD for `stored`, downloaded as `filename`
+    """
+    etag = f'"{stored.key}"'
+    headers = {
+        'etag': etag,
+        'accept-ranges': 'bytes',
+        # The same URL serves a new report when the DPR is re-analysed, so revalidate
+        'cache-control': 'no-cache',
+        'content-disposition': f'attachment; filename="{filename}"',
+    }
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get('if-range')
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = parse_range(request.headers.get('range'), stored.size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers=dict(headers, **{'content-range': f'bytes */{stored.size}'}))
+
+    if byte_range is None:
+        return StoredFileResponse(stored, 0, stored.size, 200, headers, media_type)
+    offset, count = byte_range
+    headers['content-range'] = f'bytes {offset}-{offset + count - 1}/{stored.size}'
+    return StoredFileResponse(stored, offset, count, 206, headers, media_type)
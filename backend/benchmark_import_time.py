@@ -0,0 +1,133 @@
+"""
+Import-time budget for the API process
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and fails
+(exit code 1) when:
+
+- any module in HEAVY_MODULES is imported at startup, or
+- the cumulative import time of `main` exceeds the budget, or
+- `/healthz` does not answer within the target time after starting uvicorn
+
+Usage:
+    python benchmark_import_time.py [--import-budget 2.0] [--healthz-budget 5.0] [--skip-healthz]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must only be imported on the code paths that need them
+HEAVY_MODULES = [
+    "matplotlib",
+    "seaborn",
+    "reportlab",
+    "xgboost",
+    "pandas",
+    "sklearn",
+    "spacy",
+]
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Parse -X importtime output into {module: cumulative seconds}
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        cumulative[module.strip()] = int(cumulative_us) / 1e6
+    return cumulative
+
+
+def measure_imports() -> dict:
+    """
+    Import main with -X importtime in a fresh interpreter
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_healthz(timeout: float) -> float:
+    """
+    Start uvicorn and return the seconds until /healthz answers
+    """
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.05)
+        return float("inf")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget", type=float,
+                        default=float(os.getenv("IMPORT_BUDGET_SECONDS", "2.0")))
+    parser.add_argument("--healthz-budget", type=float,
+                        default=float(os.getenv("HEALTHZ_BUDGET_SECONDS", "5.0")))
+    parser.add_argument("--skip-healthz", action="store_true")
+    args = parser.parse_args()
+
+    failures = []
+    cumulative = measure_imports()
+
+    import_seconds = cumulative["main"]
+    print(f"import main: {import_seconds:.3f}s (budget {args.import_budget:.3f}s)")
+    if import_seconds > args.import_budget:
+        failures.append(f"import main took {import_seconds:.3f}s")
+
+    top_level = {module.split(".")[0] for module in cumulative}
+    for module in HEAVY_MODULES:
+        if module in top_level:
+            failures.append(f"{module} is imported at startup")
+
+    if not args.skip_healthz:
+        healthz_seconds = measure_healthz(args.healthz_budget)
+        print(f"/healthz up after: {healthz_seconds:.3f}s (budget {args.healthz_budget:.3f}s)")
+        if healthz_seconds > args.healthz_budget:
+            failures.append(f"/healthz not up within {args.healthz_budget:.3f}s")
+
+    if failures:
+        print("Startup budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("Startup budget OK")
+
+
+if __name__ == "__main__":
+    main()
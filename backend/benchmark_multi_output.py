@@ -0,0 +1,109 @@
+"""
+Compare the per-target risk models against a single multi-output model
+
+Trains both layouts on dpr_training_dataset.csv with the same 80/20 split and
+hyperparameters as RiskPredictor.train_model, then reports:
+
+- accuracy: RMSE per target on the held-out 20%
+- latency:  predict_risks_batch with the compiled models at 1 row (mean over
+            1,000 calls) and at 100k rows
+- memory:   tree nodes, compiled array bytes and pickled size
+
+Nothing is written to models/.
+
+Usage:
+    python benchmark_multi_output.py [--dataset dpr_training_dataset.csv]
+"""
+import argparse
+import os
+import pickle
+import time
+import warnings
+
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+from app.ai.risk_predictor import RiskPredictor, TARGETS
+from app.ai.tree_ensemble import compile_model
+from benchmark_risk_batch import random_features
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PARAMS = dict(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42)
+
+
+def compiled_bytes(compiled) -> int:
+    return sum(
+        array.nbytes
+        for array in (compiled.feature, compiled.threshold, compiled.children,
+                      compiled.default_left, compiled.value)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=os.path.join(BACKEND_DIR, "dpr_training_dataset.csv"))
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    predictor = RiskPredictor()
+    X, y = predictor.prepare_data(args.dataset)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    start = time.perf_counter()
+    per_target = {target: xgb.XGBRegressor(**PARAMS).fit(X_train, y_train[target]) for target in TARGETS}
+    per_target_fit = time.perf_counter() - start
+
+    start = time.perf_counter()
+    multi_output = xgb.XGBRegressor(
+        **PARAMS, tree_method='hist', multi_strategy='multi_output_tree'
+    ).fit(X_train, y_train)
+    multi_output_fit = time.perf_counter() - start
+
+    print(f"Training: per-target {per_target_fit:.2f}s, multi-output {multi_output_fit:.2f}s")
+    print()
+    print(f"{'RMSE':<22} {'per-target':>11} {'multi-output':>13}")
+    multi_pred = multi_output.predict(X_test)
+    for column, target in enumerate(TARGETS):
+        truth = y_test[target].to_numpy()
+        single_rmse = np.sqrt(np.mean((truth - per_target[target].predict(X_test)) ** 2))
+        multi_rmse = np.sqrt(np.mean((truth - multi_pred[:, column]) ** 2))
+        print(f"{target:<22} {single_rmse:>11.4f} {multi_rmse:>13.4f}")
+
+    layouts = {
+        "per-target": {"models": {t: compile_model(m) for t, m in per_target.items()}, "multi": None},
+        "multi-output": {"models": {}, "multi": compile_model(multi_output)},
+    }
+    pickled = {
+        "per-target": sum(len(pickle.dumps(m)) for m in per_target.values()),
+        "multi-output": len(pickle.dumps(multi_output)),
+    }
+
+    single = random_features(1)
+    batch = random_features(100_000)
+    print()
+    print(f"{'layout':<14} {'nodes':>8} {'compiled (KB)':>14} {'pickle (KB)':>12} "
+          f"{'1 row (ms)':>11} {'100k rows (s)':>14}")
+    for name, layout in layouts.items():
+        predictor.models = layout["models"]
+        predictor.multi_output_model = layout["multi"]
+        compiled = list(layout["models"].values()) or [layout["multi"]]
+
+        predictor.predict_risks_batch(single)
+        start = time.perf_counter()
+        for _ in range(1_000):
+            predictor.predict_risks_batch(single)
+        # Seconds for 1,000 calls is milliseconds per call
+        single_ms = time.perf_counter() - start
+        start = time.perf_counter()
+        predictor.predict_risks_batch(batch)
+        batch_seconds = time.perf_counter() - start
+
+        print(f"{name:<14} {sum(c.n_nodes for c in compiled):>8} "
+              f"{sum(compiled_bytes(c) for c in compiled) / 1024:>14.0f} {pickled[name] / 1024:>12.0f} "
+              f"{single_ms:>11.3f} {batch_seconds:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark for the portfolio risk report, without a database
+
+Times each step of GET /api/reports/portfolio on synthetic DPR documents
+(state, department and ai_risk_scores, as load_snapshot projects them):
+
+- snapshot:  PortfolioSnapshot.from_documents, the columns built from the documents
+- loop:      the same matrices with a dict of running sums per document, for comparison
+- numpy:     portfolio_risk.portfolio_summary (np.unique + np.bincount)
+- render:    ReportGenerator.generate_portfolio_report, into memory
+
+Reading the documents from MongoDB is not included.
+
+Usage:
+    python benchmark_portfolio_report.py [--docs 100000]
+"""
+import argparse
+import io
+import random
+import time
+from collections import defaultdict
+
+from app.ai.report_generator import ReportGenerator
+from app.services.portfolio_risk import PORTFOLIO_DIMENSIONS, PortfolioSnapshot, portfolio_summary
+from app.services.risk_calculator import RISK_TYPES
+
+STATES = ['Assam', 'Meghalaya', 'Manipur', 'Mizoram', 'Nagaland', 'Tripura', 'Arunachal Pradesh', 'Sikkim']
+DEPARTMENTS = ['Public Works Department', 'Water Resources', 'Power', 'Health', 'Education', 'Rural Development',
+               'Urban Development', 'Transport', 'Agriculture', 'Tourism', 'Forest', 'Irrigation']
+
+
+def synthetic_dprs(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            'enhanced_extraction': {
+                'state': rng.choice(STATES) if rng.random() < 0.95 else None,
+                'department': rng.choice(DEPARTMENTS) + (f' Cell {rng.randint(1, 30)}' if rng.random() < 0.2 else ''),
+            },
+            'ai_risk_scores': {risk_type: rng.random() for risk_type in RISK_TYPES},
+        }
+        for _ in range(n)
+    ]
+
+
+def loop_matrices(dprs: list) -> dict:
+    matrices = {}
+    for dimension in PORTFOLIO_DIMENSIONS:
+        sums = defaultdict(lambda: [0.0] * len(RISK_TYPES))
+        counts = defaultdict(int)
+        for dpr in dprs:
+            label = ((dpr['enhanced_extraction'] or {}).get(dimension) or '').strip().lower()
+            counts[label] += 1
+            row = sums[label]
+            for j, risk_type in enumerate(RISK_TYPES):
+                row[j] += dpr['ai_risk_scores'].get(risk_type, 0.0)
+        matrices[dimension] = {label: [s / counts[label] for s in row] for label, row in sums.items()}
+    return matrices
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dprs = synthetic_dprs(args.docs)
+    generator = ReportGenerator()
+
+    snapshot, snapshot_seconds = timed(PortfolioSnapshot.from_documents, dprs)
+    _, loop_seconds = timed(loop_matrices, dprs)
+    summary, numpy_seconds = timed(portfolio_summary, snapshot)
+    pdf, render_seconds = timed(generator.generate_portfolio_report, summary, io.BytesIO())
+
+    print(f"{'step':<10} {'time for ' + format(args.docs, ',') + ' DPRs (s)':>28}")
+    print(f"{'snapshot':<10} {snapshot_seconds:>28.3f}")
+    print(f"{'loop':<10} {loop_seconds:>28.3f}  (not used; for comparison)")
+    print(f"{'numpy':<10} {numpy_seconds:>28.3f}")
+    print(f"{'render':<10} {render_seconds:>28.3f}  ({len(pdf.getvalue()) / 1024:.0f} KB)")
+    print(f"{'total':<10} {snapshot_seconds + numpy_seconds + render_seconds:>28.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for the risk prediction cache
+
+Runs AIService.predict_dpr_risks over a stream of synthetic DPR extractions
+with and without the prediction cache and reports calls/second and the hit
+rate. Fields are missing about as often as in real uploads, so many DPRs
+fall back to the same defaults and share a feature vector.
+
+Usage:
+    python benchmark_prediction_cache.py [--dprs 20000] [--missing 0.4]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from app.ai.ai_service import AIService
+from app.ai.prediction_cache import PREDICTION_CACHE_SIZE, PredictionCache
+from app.models.ai_models import EnhancedDPRExtraction
+from app.utils.normalization import normalize_extraction
+
+
+def synthetic_extractions(n: int, missing: float, seed: int = 42) -> list:
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < missing else value
+
+    extractions = []
+    for _ in range(n):
+        extraction = EnhancedDPRExtraction(
+            estimated_cost=maybe(f"₹{rng.choice([50, 100, 150, 200, 250, 500])} crore"),
+            contingency=maybe(f"₹{rng.choice([5, 10, 15, 20])} crore"),
+            duration=maybe(f"{rng.choice([12, 18, 24, 36])} months"),
+            num_employees=maybe(rng.randint(10, 200)),
+            machinery=maybe(["Excavator"] * rng.randint(1, 5)),
+            raw_materials=maybe(["Cement"] * rng.randint(1, 6)),
+            guidelines_followed=rng.random() < 0.7,
+            missing_documents=["EIA"] * rng.randint(0, 2)
+        )
+        extractions.append(normalize_extraction(extraction))
+    return extractions
+
+
+def run(ai_service: AIService, extractions: list) -> float:
+    start = time.perf_counter()
+    # predict_dpr_risks prints progress for every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        for extraction in extractions:
+            ai_service.predict_dpr_risks(extraction)
+    return len(extractions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dprs", type=int, default=20_000)
+    parser.add_argument("--missing", type=float, default=0.4, help="share of fields left unextracted")
+    args = parser.parse_args()
+
+    extractions = synthetic_extractions(args.dprs, args.missing)
+    ai_service = AIService()
+    ai_service.risk_predictor
+
+    ai_service.prediction_cache = PredictionCache(max_size=0)
+    uncached_rate = run(ai_service, extractions)
+
+    ai_service.prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE)
+    cached_rate = run(ai_service, extractions)
+    stats = ai_service.prediction_cache.stats()
+
+    print(f"{'cache':<10} {'calls/s':>10} {'us/call':>10}")
+    print(f"{'off':<10} {uncached_rate:>10,.0f} {1e6 / uncached_rate:>10.1f}")
+    print(f"{'on':<10} {cached_rate:>10,.0f} {1e6 / cached_rate:>10.1f}")
+    print(f"hit rate {stats['hit_rate']:.1%} ({stats['hits']:,} hits, {stats['misses']:,} misses, "
+          f"{stats['size']:,}/{stats['max_size']:,} entries, {stats['evictions']:,} evictions)")
+
+
+if __name__ == "__main__":
+    main()
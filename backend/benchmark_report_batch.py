@@ -0,0 +1,124 @@
+"""
+Benchmark for bulk report rendering (materialize_reports), without a database
+
+Renders both reports of synthetic analysed DPRs into a temporary report
+store, as `python materialize_reports.py` does, in three ways:
+
+- default:   in this process, with reportlab's default settings
+- batch:     in this process after configure_batch_rendering()
+- pool:      in --workers worker processes (materialize_reports(workers=N)),
+             each set up once with the batch settings; includes starting them
+
+Every mode starts from an empty store and reports reports per minute. The
+pool only pays off with a spare core per worker.
+
+Usage:
+    python benchmark_report_batch.py [--dprs 200] [--workers 2]
+"""
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+
+from bson import ObjectId
+
+from app.ai.ai_service import AIService
+from app.ai.report_generator import configure_batch_rendering
+from app.ai.report_store import LocalReportStore
+from app.services.report_materialization import materialize_reports
+from app.services.risk_calculator import RISK_TYPES
+
+STATES = ['Assam', 'Meghalaya', 'Manipur', 'Mizoram', 'Nagaland', 'Tripura', 'Arunachal Pradesh', 'Sikkim']
+PRIORITIES = ['High', 'Medium', 'Low']
+
+
+def synthetic_dprs(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            '_id': ObjectId(),
+            'enhanced_extraction': {
+                'project_title': f'Road Project {i}',
+                'state': rng.choice(STATES),
+                'estimated_cost': f'₹{rng.randint(10, 500)} crore',
+                'duration': f'{rng.randint(6, 48)} months',
+                'num_employees': rng.randint(20, 500),
+            },
+            'ai_risk_scores': {risk_type: rng.random() for risk_type in RISK_TYPES},
+            'recommendations': [
+                {'improvement_type': 'Budget Rebalance', 'description': f'Action {j} for project {i}',
+                 'priority': rng.choice(PRIORITIES)}
+                for j in range(rng.randint(1, 5))
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+class DPRs:
+    """
+    The find/limit/bulk_write subset of a DPR collection that materialize_reports uses
+    """
+
+    def __init__(self, dprs):
+        self.dprs = dprs
+
+    def find(self, query, projection=None):
+        return self
+
+    def limit(self, n):
+        return DPRs(self.dprs[:n])
+
+    def __iter__(self):
+        return iter(self.dprs)
+
+    def bulk_write(self, ops, ordered=True):
+        pass
+
+
+@contextlib.contextmanager
+def quiet():
+    # Silence the per-report messages, the workers' included
+    with open(os.devnull, 'w') as devnull:
+        saved = os.dup(1)
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def run(dprs: list, workers: int = 0) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        ai_service.report_store = LocalReportStore(tmp)
+        with quiet():
+            return materialize_reports(ai_service, DPRs(dprs), workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dprs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    dprs = synthetic_dprs(args.dprs)
+    run(dprs[:2])  # warm up imports and fonts
+
+    results = [('default', run(dprs))]
+    configure_batch_rendering()
+    results.append(('batch', run(dprs)))
+    results.append((f'pool ({args.workers})', run(dprs, args.workers)))
+
+    print(f"{os.cpu_count()} CPUs, {args.dprs:,} DPRs, {args.dprs * 2:,} reports")
+    print(f"{'mode':<12} {'seconds':>9} {'ms/report':>10} {'reports/min':>12}")
+    for mode, stats in results:
+        assert stats['failed'] == 0, stats
+        print(f"{mode:<12} {stats['seconds']:>9.2f} {stats['seconds'] * 1000 / stats['rendered']:>10.1f} "
+              f"{stats['reports_per_minute']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark for report chart backends
+
+Generates the analytical report (three charts) and the recommendation report
+for a sample DPR with each chart backend and reports the average time per
+analytical report and the PDF sizes. The matplotlib backend is run with its
+charts rendered one after another in this process (workers 0) and in the
+warm worker pool (--workers, REPORT_CHART_WORKERS in the server).
+
+Usage:
+    python benchmark_report_charts.py [--runs 5] [--workers 2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from app.ai import matplotlib_charts
+from app.ai.report_generator import ReportGenerator
+from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+from app.utils.normalization import normalize_extraction
+
+EXTRACTION = normalize_extraction(EnhancedDPRExtraction(
+    project_title="Road Construction in Assam", department="Public Works Department", state="Assam",
+    district="Guwahati", duration="18 months", estimated_cost="₹150 crore", contingency="₹10 crore",
+    start_date="01/06/2024", end_date="01/12/2025", num_employees=150, risk_zone="Flood"
+))
+RISK_SCORES = {'cost_overruns': 0.72, 'schedule_delays': 0.45, 'resource_shortages': 0.21, 'environmental_risks': 0.64}
+RECOMMENDATIONS = [
+    Recommendation(improvement_type="Budget Rebalance", description="Increase contingency budget by 10%", priority="High"),
+    Recommendation(improvement_type="Risk Mitigation", description="Flood mitigation planning", priority="Medium"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2, help="chart worker processes for the pooled run")
+    args = parser.parse_args()
+
+    runs = [('vector', 'vector', 0), ('matplotlib', 'matplotlib', 0),
+            (f'matplotlib/{args.workers}', 'matplotlib', args.workers)]
+    print(f"{'backend':<14} {'s/report':>9} {'analytical KB':>14} {'recommendation KB':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, backend, workers in runs:
+            matplotlib_charts.CHART_WORKERS = workers
+            generator = ReportGenerator(chart_backend=backend)
+            analytical = os.path.join(tmp, f"{backend}_{workers}_analytical.pdf")
+            recommendation = os.path.join(tmp, f"{backend}_{workers}_recommendation.pdf")
+            # The first report pays for imports and font loading (and starts the pool)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.generate_analytical_report("bench", EXTRACTION, RISK_SCORES, RECOMMENDATIONS, analytical)
+                start = time.perf_counter()
+                for _ in range(args.runs):
+                    generator.generate_analytical_report("bench", EXTRACTION, RISK_SCORES, RECOMMENDATIONS, analytical)
+                seconds = (time.perf_counter() - start) / args.runs
+                generator.generate_recommendation_report("bench", EXTRACTION, RISK_SCORES, RECOMMENDATIONS,
+                                                         recommendation)
+            print(f"{name:<14} {seconds:>9.3f} {os.path.getsize(analytical) / 1024:>14.1f} "
+                  f"{os.path.getsize(recommendation) / 1024:>18.1f}")
+
+    matplotlib_charts.shutdown_chart_pool()
+
+
+if __name__ == "__main__":
+    main()
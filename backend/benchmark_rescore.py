@@ -0,0 +1,98 @@
+"""
+Benchmark for bulk risk rescoring, without a database
+
+Times the scoring side of a rescore on synthetic enhanced extractions:
+
+- per-DPR: what POST /api/risk/assess_with_ai does for each DPR (validate the
+           extraction, predict, completeness score, recommendations)
+- bulk:    risk_rescoring.build_updates, one chunk of CHUNK_SIZE at a time
+
+Database time is not included. The per-DPR route also makes four round
+trips per DPR (find_one, find_one, update/insert, update_one); the bulk path
+makes two bulk_write calls per chunk. Run rescore_risks.py against a real
+database for end-to-end docs/second.
+
+Usage:
+    python benchmark_rescore.py [--docs 100000]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import warnings
+
+from bson import ObjectId
+
+from app.ai.ai_service import get_ai_service
+from app.models.ai_models import EnhancedDPRExtraction
+from app.services.risk_rescoring import CHUNK_SIZE, build_updates
+
+MAX_PER_DPR_DOCS = 2_000
+
+
+def synthetic_dprs(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            '_id': ObjectId(),
+            'enhanced_extraction': {
+                'project_title': f'Project {i}',
+                'department': 'Public Works Department',
+                'estimated_cost': f'₹{rng.randint(50, 500)} crore',
+                'contingency': f'₹{rng.randint(1, 40)} crore',
+                'duration': f'{rng.randint(6, 36)} months',
+                'state': 'Assam',
+                'district': 'Guwahati',
+                'num_employees': rng.randint(10, 200),
+                'machinery': ['Excavator'] * rng.randint(1, 5),
+                'raw_materials': ['Cement'] * rng.randint(1, 6),
+                'guidelines_followed': rng.random() < 0.7,
+                'missing_documents': ['EIA'] * rng.randint(0, 2),
+            }
+        }
+        for i in range(n)
+    ]
+
+
+def per_dpr(ai_service, dpr: dict):
+    extraction = EnhancedDPRExtraction(**dpr['enhanced_extraction'])
+    risk_scores = ai_service.predict_dpr_risks(extraction)
+    completeness_score = ai_service.calculate_completeness_score(extraction)
+    recommendations = ai_service.generate_recommendations(risk_scores, completeness_score)
+    return risk_scores, [rec.dict() for rec in recommendations]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # The per-DPR path calls the deprecated Recommendation.dict()
+    warnings.simplefilter("ignore")
+    ai_service = get_ai_service()
+    ai_service.risk_predictor
+    dprs = synthetic_dprs(args.docs)
+
+    sample = dprs[:MAX_PER_DPR_DOCS]
+    start = time.perf_counter()
+    # The per-DPR path prints progress for every DPR
+    with contextlib.redirect_stdout(io.StringIO()):
+        for dpr in sample:
+            per_dpr(ai_service, dpr)
+    per_dpr_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, len(dprs), CHUNK_SIZE):
+        build_updates(dprs[offset:offset + CHUNK_SIZE], ai_service)
+    bulk_seconds = time.perf_counter() - start
+    bulk_rate = len(dprs) / bulk_seconds
+
+    print(f"{'path':<10} {'docs/s':>10} {'time for ' + format(args.docs, ',') + ' (s)':>22}")
+    print(f"{'per-DPR':<10} {per_dpr_rate:>10,.0f} {args.docs / per_dpr_rate:>21.1f}*")
+    print(f"{'bulk':<10} {bulk_rate:>10,.0f} {bulk_seconds:>22.1f}")
+    print(f"* extrapolated from {len(sample):,} DPRs; database time excluded for both")
+
+
+if __name__ == "__main__":
+    main()
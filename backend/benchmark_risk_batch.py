@@ -0,0 +1,77 @@
+"""
+Benchmark for batch risk inference
+
+Compares the previous per-DPR path (one-row DataFrame, reindex, one
+model.predict per target) against RiskPredictor.predict_risks_batch at batch
+sizes 1, 100 and 100k. The per-DPR path is timed on at most 1,000 rows and
+extrapolated for larger batches.
+
+Usage:
+    python benchmark_risk_batch.py
+"""
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from app.ai.risk_predictor import RiskPredictor
+
+BATCH_SIZES = [1, 100, 100_000]
+MAX_LEGACY_ROWS = 1_000
+
+
+def random_features(n: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(0.0, 0.3, n),      # contingency_ratio
+        rng.integers(6, 37, n),        # duration_months
+        rng.integers(10, 201, n),      # num_employees
+        rng.integers(2, 6, n),         # num_machinery
+        rng.integers(2, 7, n),         # num_materials
+        rng.integers(0, 2, n),         # compliance_score
+        rng.integers(0, 3, n),         # missing_docs_count
+    ]).astype(np.float32)
+
+
+def legacy_predict(predictor: RiskPredictor, features: dict) -> dict:
+    """
+    The per-DPR prediction path as it was before predict_risks_batch
+    """
+    X = pd.DataFrame([features])
+    for col in predictor.feature_columns:
+        if col not in X.columns:
+            X[col] = 0
+    X = X[predictor.feature_columns].fillna(0)
+    return {
+        target: float(max(0.0, min(1.0, model.predict(X)[0])))
+        for target, model in predictor.models.items()
+    }
+
+
+def main():
+    warnings.simplefilter("ignore")
+    predictor = RiskPredictor()
+
+    print(f"{'batch':>8} {'per-DPR (s)':>13} {'batch (s)':>11} {'speedup':>9} {'rows/s (batch)':>16}")
+    for n in BATCH_SIZES:
+        X = random_features(n)
+
+        rows = [dict(zip(predictor.feature_columns, row)) for row in X[:MAX_LEGACY_ROWS]]
+        start = time.perf_counter()
+        for features in rows:
+            legacy_predict(predictor, features)
+        legacy_seconds = (time.perf_counter() - start) * n / len(rows)
+
+        start = time.perf_counter()
+        predictor.predict_risks_batch(X)
+        batch_seconds = time.perf_counter() - start
+
+        note = "*" if n > MAX_LEGACY_ROWS else " "
+        print(f"{n:>8} {legacy_seconds:>12.4f}{note} {batch_seconds:>11.4f} "
+              f"{legacy_seconds / batch_seconds:>8.1f}x {n / batch_seconds:>16,.0f}")
+    print("* extrapolated from the first 1,000 rows")
+
+
+if __name__ == "__main__":
+    main()
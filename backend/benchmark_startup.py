@@ -0,0 +1,68 @@
+"""
+Startup benchmark for the backend
+
+Measures import time and peak RSS of the API process in a fresh interpreter
+for each scenario:
+
+- database: only app.database (the floor every scenario pays)
+- lazy:     import main, AI components are created on first use
+- eager:    import main, then initialize every AI component in four
+            separate AIService instances, which is what the routers used
+            to do at import time
+
+Usage:
+    python benchmark_startup.py
+"""
+import os
+import subprocess
+import sys
+import json
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = {
+    "database": "import app.database",
+    "lazy": "import main",
+    "eager": (
+        "import main\n"
+        "from app.ai.ai_service import AIService\n"
+        "for _ in range(4):\n"
+        "    AIService().preload()\n"
+    ),
+}
+
+RUNNER = """
+import json, resource, time
+start = time.perf_counter()
+exec(compile({code!r}, '<benchmark>', 'exec'))
+elapsed = time.perf_counter() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print('BENCHMARK ' + json.dumps({{'seconds': elapsed, 'rss_mb': rss_mb}}))
+"""
+
+
+def run_scenario(code: str) -> dict:
+    """
+    Run one scenario in a fresh interpreter and return its measurements
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(code=code)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCHMARK "):
+            return json.loads(line[len("BENCHMARK "):])
+    raise RuntimeError(f"Scenario failed:\n{result.stderr[-2000:]}")
+
+
+def main():
+    print(f"{'scenario':<10} {'import (s)':>12} {'peak RSS (MB)':>15}")
+    for name, code in SCENARIOS.items():
+        measurements = run_scenario(code)
+        print(f"{name:<10} {measurements['seconds']:>12.2f} {measurements['rss_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
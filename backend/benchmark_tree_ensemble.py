@@ -0,0 +1,100 @@
+"""
+Benchmark for the compiled risk models
+
+Compares the pickled XGBoost models against their compiled .npz form
+(see compile_models.py):
+
+- load: fresh interpreter, load all four models (includes importing
+        xgboost for the pickles), wall time and peak RSS
+- latency: RiskPredictor.predict_risks_batch at 1 row (mean over 1,000
+           calls) and at 100k rows
+
+Usage:
+    python benchmark_tree_ensemble.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+import joblib
+
+from app.ai.risk_predictor import RiskPredictor, TARGETS
+from app.ai.tree_ensemble import CompiledEnsemble
+from benchmark_risk_batch import random_features
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BACKEND_DIR, "models")
+
+LOADERS = {
+    "pickle": (
+        "import warnings; warnings.simplefilter('ignore')\n"
+        "import joblib\n"
+        "models = [joblib.load(f'models/xgboost_{t}_model.pkl') for t in TARGETS]\n"
+    ),
+    "compiled": (
+        "from app.ai.tree_ensemble import CompiledEnsemble\n"
+        "models = [CompiledEnsemble.load(f'models/xgboost_{t}_model.npz') for t in TARGETS]\n"
+    ),
+}
+
+RUNNER = """
+import json, resource, time
+TARGETS = {targets!r}
+start = time.perf_counter()
+exec(compile({code!r}, '<benchmark>', 'exec'))
+elapsed = time.perf_counter() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print('BENCHMARK ' + json.dumps({{'seconds': elapsed, 'rss_mb': rss_mb}}))
+"""
+
+
+def measure_load(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(code=code, targets=TARGETS)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCHMARK "):
+            return json.loads(line[len("BENCHMARK "):])
+    raise RuntimeError(f"Load failed:\n{result.stderr[-2000:]}")
+
+
+def main():
+    warnings.simplefilter("ignore")
+
+    print(f"{'models':<10} {'load (s)':>10} {'peak RSS (MB)':>15}")
+    for name, code in LOADERS.items():
+        measurements = measure_load(code)
+        print(f"{name:<10} {measurements['seconds']:>10.3f} {measurements['rss_mb']:>15.1f}")
+
+    variants = {
+        "pickle": {t: joblib.load(os.path.join(MODELS_DIR, f"xgboost_{t}_model.pkl")) for t in TARGETS},
+        "compiled": {t: CompiledEnsemble.load(os.path.join(MODELS_DIR, f"xgboost_{t}_model.npz")) for t in TARGETS},
+    }
+    single = random_features(1)
+    batch = random_features(100_000)
+
+    print()
+    print(f"{'models':<10} {'1 row (ms)':>12} {'100k rows (s)':>15}")
+    predictor = RiskPredictor()
+    for name, models in variants.items():
+        predictor.models = models
+        predictor.predict_risks_batch(single)
+        start = time.perf_counter()
+        for _ in range(1_000):
+            predictor.predict_risks_batch(single)
+        # Seconds for 1,000 calls is milliseconds per call
+        single_ms = time.perf_counter() - start
+        start = time.perf_counter()
+        predictor.predict_risks_batch(batch)
+        batch_seconds = time.perf_counter() - start
+        print(f"{name:<10} {single_ms:>12.3f} {batch_seconds:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
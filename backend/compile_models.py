@@ -0,0 +1,73 @@
+"""
+Compile the pickled risk models into NumPy tree ensembles
+
+For every models/{xgboost,randomforest}_*_model.pkl, writes the compiled
+models/*_model.npz next to it and checks that both give identical predictions
+on random feature rows. RiskPredictor serves the .npz files, so xgboost and
+scikit-learn are only needed here, not at serving time.
+
+Each .npz records the sha256 of its pickle; RiskPredictor ignores a compiled
+model whose pickle has changed since it was compiled.
+
+Usage:
+    python compile_models.py [--models-dir models] [--rows 100000]
+"""
+import argparse
+import glob
+import os
+import sys
+import warnings
+
+import joblib
+import numpy as np
+
+from app.ai.tree_ensemble import CompiledEnsemble, compile_model, file_digest
+from benchmark_risk_batch import random_features
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def compile_file(pickle_path: str, X: np.ndarray) -> float:
+    """
+    Compile one pickled model and return the largest prediction difference
+    """
+    with warnings.catch_warnings():
+        # The pickles may come from other xgboost / scikit-learn versions
+        warnings.simplefilter("ignore")
+        model = joblib.load(pickle_path)
+    compiled_path = pickle_path[:-len('.pkl')] + '.npz'
+    compiled = compile_model(model)
+    compiled.source_digest = file_digest(pickle_path)
+    compiled.save(compiled_path)
+
+    compiled = CompiledEnsemble.load(compiled_path)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        expected = model.predict(X)
+    return float(np.abs(compiled.predict(X) - expected).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models-dir", default=os.path.join(BACKEND_DIR, "models"))
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    X = random_features(args.rows)
+    failures = []
+    for kind in ("xgboost", "randomforest"):
+        for pickle_path in sorted(glob.glob(os.path.join(args.models_dir, f"{kind}_*_model.pkl"))):
+            max_diff = compile_file(pickle_path, X)
+            name = os.path.basename(pickle_path)
+            print(f"{name:<45} max |diff| = {max_diff:.3g}")
+            if max_diff != 0.0:
+                failures.append(name)
+
+    if failures:
+        print(f"Compiled predictions differ for: {', '.join(failures)}")
+        sys.exit(1)
+    print("All compiled models match their originals")
+
+
+if __name__ == "__main__":
+    main()
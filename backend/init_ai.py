@@ -18,8 +18,7 @@ def main():
         # Step 1: Generate training dataset
         print("Step 1: Generating training dataset...")
         dataset_generator = DatasetGenerator()
-        dataset = dataset_generator.generate_dataset(1000)  # Generate 1000 samples
-        dataset_generator.save_dataset_to_csv(dataset, "dpr_training_dataset.csv")
+        dataset_generator.write_dataset("dpr_training_dataset.csv", 1000)  # Generate 1000 samples
         print("Training dataset generated successfully!")
         
         # Step 2: Train risk prediction model
@@ -1,4 +1,35 @@
+from pymongo import UpdateOne
+
 from app.database import get_users_collection, get_dprs_collection, get_risks_collection, get_feedbacks_collection
+from app.models.ai_models import EnhancedDPRExtraction
+from app.utils.normalization import NORMALIZED_FIELDS, normalize_extraction
+
+
+def normalize_stored_extractions(chunk_size: int = 1000) -> int:
+    """
+    Add estimated_cost_inr, contingency_inr and duration_months to DPRs stored before they existed
+    """
+    dprs_collection = get_dprs_collection()
+    cursor = dprs_collection.find(
+        {"enhanced_extraction": {"$type": "object"},
+         "enhanced_extraction.duration_months": {"$exists": False}},
+        projection={"enhanced_extraction.estimated_cost": 1, "enhanced_extraction.contingency": 1,
+                    "enhanced_extraction.duration": 1}
+    )
+    updated = 0
+    ops = []
+    for dpr in cursor:
+        extraction = normalize_extraction(EnhancedDPRExtraction.model_construct(**dpr["enhanced_extraction"]))
+        ops.append(UpdateOne(
+            {"_id": dpr["_id"]},
+            {"$set": {f"enhanced_extraction.{field}": getattr(extraction, field) for field in NORMALIZED_FIELDS}}
+        ))
+        if len(ops) == chunk_size:
+            updated += dprs_collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += dprs_collection.bulk_write(ops, ordered=False).modified_count
+    return updated
 
 def init_db():
     """
@@ -11,6 +42,10 @@ def init_db():
     # Create indexes for dprs collection
     dprs_collection = get_dprs_collection()
     dprs_collection.create_index("uploaded_by")
+    # Numeric cost and duration for dashboard sorting
+    dprs_collection.create_index("enhanced_extraction.estimated_cost_inr")
+    dprs_collection.create_index("enhanced_extraction.duration_months")
+    print(f"Normalized cost and duration of {normalize_stored_extractions()} stored DPRs")
     
     # Create indexes for risks collection
     risks_collection = get_risks_collection()
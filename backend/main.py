@@ -1,9 +1,10 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import os
+import sys
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -90,17 +91,33 @@ async def root():
 @app.get("/health")
 async def health_check():
     logger.info("Health check endpoint accessed")
-    # Check database connection status
-    try:
-        from app.database import get_database
-        db = get_database()
-        if db is not None:
-            db.list_collection_names()  # This will raise an exception if connection fails
-            return {"status": "healthy", "database": "connected"}
-        else:
-            return {"status": "healthy", "database": "disconnected"}
-    except Exception as e:
-        return {"status": "healthy", "database": f"error: {str(e)}"}
+    # Report the cached connection state; the background probe keeps it fresh
+    from app.database import get_connection_state
+    state = get_connection_state()
+    if state["connected"]:
+        return {"status": "healthy", "database": "connected"}
+    if state["checked_at"] is None:
+        return {"status": "healthy", "database": "unknown"}
+    return {"status": "healthy", "database": f"error: {state['error']}"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness for load balancers, answered from cached state without a database round-trip"""
+    from app.database import get_connection_state
+    from app.ai.ai_service import get_warm_up_state, is_warm_up_ready
+    state = get_connection_state()
+    ready = state["connected"] and is_warm_up_ready()
+    body = {
+        "status": "ready" if ready else "not ready",
+        "database": {
+            "connected": state["connected"],
+            "checked_at": state["checked_at"].isoformat() if state["checked_at"] else None,
+            "latency_ms": state["latency_ms"],
+            "error": state["error"]
+        },
+        "warm_up": get_warm_up_state()
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
 # Add a simple health check endpoint for deployment verification
 @app.get("/healthz")
@@ -127,16 +144,28 @@ async def get_sample_dpr():
 async def startup_event():
     logger.info("Application startup")
     logger.info("CORS configuration should be active")
-    try:
-        # Test database connection
-        from app.database import get_database
-        db = get_database()
-        if db is not None:
-            db.list_collection_names()  # This will raise an exception if connection fails
-            logger.info("Database connection verified at startup")
+    # Check the database in the background so a slow handshake doesn't delay startup
+    from app.database import start_connection_probe
+    start_connection_probe()
+    # Preload the models in the background; /ready stays unhealthy until it succeeds.
+    # Workers forked by serve.py inherit models the master already warmed up.
+    from app.ai.ai_service import start_warm_up, disable_warm_up, is_warm_up_ready
+    if not is_warm_up_ready():
+        if os.getenv("AI_WARMUP", "1") == "1":
+            start_warm_up()
         else:
-            logger.warning("Database is None at startup")
-    except Exception as e:
-        logger.error(f"Database connection failed at startup: {e}")
-        # Don't crash the app, just log the error
-        pass
+            disable_warm_up()
+    # Pick up model versions activated in the registry without a restart
+    from app.ai.ai_service import start_model_watcher
+    start_model_watcher()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.database import stop_connection_probe
+    from app.ai.ai_service import stop_model_watcher
+    stop_connection_probe()
+    stop_model_watcher()
+    # Only started if a matplotlib report was rendered
+    charts = sys.modules.get('app.ai.matplotlib_charts')
+    if charts is not None:
+        charts.shutdown_chart_pool()
@@ -0,0 +1,58 @@
+"""
+Manage risk model versions in the model registry
+
+    python manage_models.py publish [--source models] [--activate] [--notes "..."]
+    python manage_models.py activate <version>
+    python manage_models.py list
+
+`publish` copies the model files in --source (backend/models by default, where
+RiskPredictor.save_models writes) into a new immutable version. Serving
+processes switch to a version within MODEL_POLL_INTERVAL seconds of it being
+activated, or immediately on POST /api/risk/models/reload.
+
+The registry is a local directory unless MODEL_REGISTRY=gridfs.
+"""
+import argparse
+import sys
+
+from app.ai.model_registry import MODELS_DIR, get_model_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("publish", help="publish the models in a directory as a new version")
+    publish.add_argument("--source", default=MODELS_DIR)
+    publish.add_argument("--activate", action="store_true")
+    publish.add_argument("--notes")
+
+    activate = commands.add_parser("activate", help="make a published version the one to serve")
+    activate.add_argument("version")
+
+    commands.add_parser("list", help="list published versions")
+    args = parser.parse_args()
+
+    registry = get_model_registry()
+    if args.command == "publish":
+        version = registry.publish(args.source, activate=args.activate, notes=args.notes)
+        print(version)
+    elif args.command == "activate":
+        try:
+            registry.activate(args.version)
+        except KeyError as e:
+            print(e.args[0])
+            sys.exit(1)
+        print(f"Active model version: {args.version}")
+    else:
+        versions = registry.list_versions()
+        if not versions:
+            print("No published versions; serving backend/models")
+        for entry in versions:
+            marker = "*" if entry["active"] else " "
+            print(f"{marker} {entry['version']}  {entry['created_at']}  {len(entry['files'])} files"
+                  + (f"  {entry['notes']}" if entry.get("notes") else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Render the reports of analysed DPRs that have not been downloaded yet
+
+Uploads only record report placeholders and each report is rendered on its
+first download; run this off-peak (or before a bulk export) to render the
+rest ahead of time. Reports already in the report store are skipped.
+For nightly bulk runs, --workers renders in that many worker processes,
+each with its report styles and settings set up once.
+
+Usage:
+    python materialize_reports.py [--limit N] [--type analytical|recommendation] [--workers N]
+"""
+import argparse
+
+from app.ai.ai_service import get_ai_service
+from app.database import get_dprs_collection
+from app.services.report_materialization import REPORT_TYPES, materialize_reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="DPRs to process at most")
+    parser.add_argument("--type", choices=REPORT_TYPES, default=None, help="only this report type")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes rendering reports (default 0: render in this process)")
+    args = parser.parse_args()
+
+    def progress(stats):
+        print(f"  {stats['dprs']:>9,} DPRs  {stats['rendered']:>9,} rendered  "
+              f"{stats['reports_per_minute']:>8,.0f} reports/min")
+
+    report_types = (args.type,) if args.type else REPORT_TYPES
+    stats = materialize_reports(get_ai_service(), get_dprs_collection(), report_types, args.limit, progress,
+                                args.workers)
+    print(f"Rendered {stats['rendered']:,} reports for {stats['dprs']:,} DPRs ({stats['stored']:,} already stored, "
+          f"{stats['failed']:,} failed) in {stats['seconds']:.1f}s: {stats['reports_per_minute']:,.0f} reports/min")
+
+
+if __name__ == "__main__":
+    main()
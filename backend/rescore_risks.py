@@ -0,0 +1,43 @@
+"""
+Rescore every analyzed DPR with the current risk models
+
+Run after activating a new model version so stored ai_risk_scores,
+recommendations and risk assessments match it. Prints progress and the
+throughput in documents per second.
+
+With --legacy, recomputes the rule-based scores of DPRs uploaded without AI
+analysis instead; those scores are seeded by DPR ID, so reruns give the
+same values.
+
+Usage:
+    python rescore_risks.py [--chunk-size 1000] [--dry-run] [--legacy]
+"""
+import argparse
+
+from app.services.risk_rescoring import CHUNK_SIZE, rescore_legacy_scores, rescore_portfolio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="score without writing")
+    parser.add_argument("--legacy", action="store_true", help="rescore plain uploads with the rule-based scorer")
+    args = parser.parse_args()
+
+    def progress(stats):
+        print(f"  {stats['rescored']:>9,} rescored  {stats['docs_per_second']:>9,.0f} docs/s")
+
+    if args.legacy:
+        stats = rescore_legacy_scores(args.chunk_size, dry_run=args.dry_run, progress=progress)
+        print(f"Rescored {stats['rescored']:,} plain-upload DPRs ({stats['failed']:,} failed) in "
+              f"{stats['seconds']:.1f}s: {stats['docs_per_second']:,.0f} docs/s" + (" (dry run)" if args.dry_run else ""))
+        return
+
+    stats = rescore_portfolio(args.chunk_size, dry_run=args.dry_run, progress=progress)
+    print(f"Rescored {stats['rescored']:,} DPRs ({stats['failed']:,} failed) with model version "
+          f"{stats['model_version'] or 'unversioned'} in {stats['seconds']:.1f}s: "
+          f"{stats['docs_per_second']:,.0f} docs/s" + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Pre-fork server launcher
+
+Loads the app and warms up the AI models once in a master process, then forks
+worker processes that serve the same listening socket. Workers inherit the
+loaded spaCy pipeline and risk models copy-on-write, so adding a worker costs
+only the pages it writes to.
+
+The socket is bound before the models load. While they load, the master
+answers /health and /healthz itself, so platform health checks pass during
+warm-up, and every other path gets 503.
+
+Signals handled by the master:
+    SIGTERM / SIGINT  graceful shutdown of all workers
+    SIGHUP            rolling restart, one worker at a time
+    SIGUSR1           log the unique RSS of every worker
+
+Usage:
+    python serve.py [--host 0.0.0.0] [--port 8000] [--workers 2]
+
+Host, port and worker count default to HOST, PORT and WEB_CONCURRENCY.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("serve")
+
+# Seconds a worker gets to finish in-flight requests before it is killed
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+
+def unique_rss_mb(pid: int):
+    """
+    Memory only this process holds (private pages), in MB
+
+    Shared copy-on-write pages inherited from the master are not counted.
+    Returns None where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            private_kb = sum(
+                int(line.split()[1])
+                for line in smaps
+                if line.startswith(("Private_Clean:", "Private_Dirty:"))
+            )
+        return private_kb / 1024
+    except OSError:
+        return None
+
+
+class _WorkerServer(uvicorn.Server):
+    """
+    uvicorn server that tells the master once it is accepting connections
+    """
+
+    def __init__(self, config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        try:
+            await super().startup(sockets=sockets)
+            # uvicorn sets should_exit when the lifespan startup fails
+            if not self.should_exit:
+                os.write(self.ready_fd, b"1")
+        finally:
+            os.close(self.ready_fd)
+
+
+class PreloadResponder:
+    """
+    Answers connections on the listening socket while the master loads the models
+
+    /health and /healthz get 200. Everything else, /ready included, gets 503
+    with Retry-After. Stop it before forking the first worker.
+    """
+
+    HEALTH_PATHS = ('/health', '/healthz')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name="preload-responder", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sock.settimeout(None)
+
+    def _serve(self):
+        # Wake up regularly to notice stop()
+        self.sock.settimeout(0.2)
+        while not self._stop.is_set():
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            with conn:
+                try:
+                    self._respond(conn)
+                except OSError:
+                    pass
+
+    def _respond(self, conn: socket.socket):
+        conn.settimeout(2)
+        request_line = conn.recv(4096).split(b"\r\n", 1)[0].split(b" ")
+        path = request_line[1].split(b"?", 1)[0].decode("latin-1") if len(request_line) > 1 else ""
+        if path in self.HEALTH_PATHS:
+            status, body = "200 OK", b'{"status": "healthy", "warm_up": "loading"}'
+        else:
+            status, body = "503 Service Unavailable", b'{"status": "not ready", "warm_up": "loading"}'
+        head = (f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Retry-After: 5\r\nConnection: close\r\n\r\n")
+        conn.sendall(head.encode("latin-1") + body)
+
+
+class Master:
+    def __init__(self, app, host: str, port: int, workers: int):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.workers = {}  # pid -> ready pipe read end
+        self.stopping = set()
+        self.sock = None
+        self.shutting_down = False
+        self.restart_requested = False
+        self.memory_report_requested = False
+
+    def bind(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+        logger.info(f"Listening on http://{self.host}:{self.port}")
+
+    def spawn_worker(self) -> int:
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+                signal.signal(signum, signal.SIG_DFL)
+            config = uvicorn.Config(self.app, log_level="info", timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+            try:
+                _WorkerServer(config, ready_write).run(sockets=[self.sock])
+            finally:
+                os._exit(0)
+        os.close(ready_write)
+        self.workers[pid] = ready_read
+        logger.info(f"Started worker {pid}")
+        return pid
+
+    def wait_until_ready(self, pid: int, timeout: float = 60) -> bool:
+        """
+        Block until the worker reports that it is serving
+        """
+        ready_read = self.workers.get(pid)
+        if ready_read is None:
+            return False
+        deadline = time.monotonic() + timeout
+        os.set_blocking(ready_read, False)
+        while time.monotonic() < deadline:
+            try:
+                if os.read(ready_read, 1):
+                    return True
+            except BlockingIOError:
+                pass
+            if self._reap() and pid not in self.workers:
+                return False
+            time.sleep(0.05)
+        return False
+
+    def stop_worker(self, pid: int):
+        """
+        Ask a worker to finish in-flight requests and exit, killing it after the grace period
+        """
+        self.stopping.add(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while pid in self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        if pid in self.workers:
+            logger.warning(f"Worker {pid} did not exit in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self._forget(pid)
+
+    def rolling_restart(self):
+        """
+        Replace workers one by one so the socket is never left without a server
+        """
+        logger.info("Rolling restart")
+        for old_pid in list(self.workers):
+            new_pid = self.spawn_worker()
+            if not self.wait_until_ready(new_pid):
+                logger.error(f"Replacement worker {new_pid} failed to start, keeping {old_pid}")
+                continue
+            self.stop_worker(old_pid)
+        logger.info("Rolling restart finished")
+
+    def report_memory(self):
+        for pid in sorted(self.workers):
+            uss = unique_rss_mb(pid)
+            usage = f"{uss:.1f} MB" if uss is not None else "unavailable"
+            logger.info(f"Worker {pid} unique RSS: {usage}")
+        master_uss = unique_rss_mb(os.getpid())
+        if master_uss is not None:
+            logger.info(f"Master {os.getpid()} unique RSS: {master_uss:.1f} MB")
+
+    def _forget(self, pid: int):
+        self.stopping.discard(pid)
+        ready_read = self.workers.pop(pid, None)
+        if ready_read is not None:
+            os.close(ready_read)
+
+    def _reap(self) -> bool:
+        reaped = False
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return reaped
+            if pid == 0:
+                return reaped
+            reaped = True
+            if pid in self.workers:
+                if pid not in self.stopping and not self.shutting_down:
+                    logger.warning(f"Worker {pid} exited with status {status}")
+                self._forget(pid)
+
+    def _handle_signal(self, signum, frame):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self.shutting_down = True
+        elif signum == signal.SIGHUP:
+            self.restart_requested = True
+        elif signum == signal.SIGUSR1:
+            self.memory_report_requested = True
+
+    def run(self):
+        if self.sock is None:
+            self.bind()
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, self._handle_signal)
+
+        for _ in range(self.num_workers):
+            pid = self.spawn_worker()
+            self.wait_until_ready(pid)
+        self.report_memory()
+
+        while not self.shutting_down:
+            if self.restart_requested:
+                self.restart_requested = False
+                self.rolling_restart()
+            if self.memory_report_requested:
+                self.memory_report_requested = False
+                self.report_memory()
+            self._reap()
+            # Replace workers that died unexpectedly
+            while len(self.workers) < self.num_workers and not self.shutting_down:
+                self.spawn_worker()
+            time.sleep(0.5)
+
+        logger.info("Shutting down workers")
+        for pid in list(self.workers):
+            self.stopping.add(pid)
+            os.kill(pid, signal.SIGTERM)
+        for pid in list(self.workers):
+            self.stop_worker(pid)
+        self.sock.close()
+
+
+def load_app():
+    """
+    Import the app and, unless AI_WARMUP=0, load the AI models before any worker is forked
+    """
+    from main import app
+    from app.ai.ai_service import run_warm_up, get_warm_up_state
+    from app.ai.model_registry import reset_model_registry
+    from app.database import close_client
+
+    # AI_WARMUP=0 turns the preload off, as in main.py; workers then load the
+    # models on first use
+    if os.getenv("AI_WARMUP", "1") == "1":
+        run_warm_up()
+        logger.info(f"Models loaded in master: {get_warm_up_state()}")
+    # A MongoClient opened by the warm-up (MODEL_REGISTRY=gridfs) must not be
+    # shared with forked workers; each one reconnects on first use
+    reset_model_registry()
+    close_client()
+    # Move everything loaded so far out of the garbage collector's reach so
+    # collections in the workers don't write to (and so copy) shared pages
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork server for the DPR API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        logger.warning("fork() is not available on this platform, running a single uvicorn process")
+        uvicorn.run("main:app", host=args.host, port=args.port)
+        return
+
+    master = Master(None, args.host, args.port, args.workers)
+    master.bind()
+    responder = PreloadResponder(master.sock)
+    responder.start()
+    try:
+        master.app = load_app()
+    finally:
+        responder.stop()
+    master.run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
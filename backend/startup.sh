@@ -18,5 +18,5 @@ else
 fi
 
 # Start the application
-echo "Starting uvicorn server..."
-exec uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000}
\ No newline at end of file
+echo "Starting server..."
+exec python serve.py
\ No newline at end of file
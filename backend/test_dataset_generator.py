@@ -0,0 +1,57 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import pandas as pd
+
+from app.ai.dataset_generator import DATASET_COLUMNS, DatasetGenerator
+
+DATASET = os.path.join(os.path.dirname(__file__), 'dpr_training_dataset.csv')
+
+
+def test_written_dataset_matches_training_csv_schema():
+    reference = pd.read_csv(DATASET)
+    assert list(reference.columns) == DATASET_COLUMNS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = DatasetGenerator()
+        csv_path = os.path.join(tmp, 'dataset.csv')
+        parquet_path = os.path.join(tmp, 'dataset.parquet')
+        generator.write_dataset(csv_path, size=2500, chunk_rows=1000)
+        generator.write_dataset(parquet_path, size=2500, chunk_rows=1000)
+
+        df = pd.read_csv(csv_path)
+        assert list(df.columns) == DATASET_COLUMNS
+        assert (df.dtypes == reference.dtypes).all()
+        assert df['dpr_id'].is_unique and len(df) == 2500
+
+        parquet = pd.read_parquet(parquet_path)
+        assert list(parquet.columns) == DATASET_COLUMNS
+        pd.testing.assert_frame_equal(parquet[['dpr_id', 'risk_label']].fillna('None'),
+                                      df[['dpr_id', 'risk_label']].fillna('None'))
+
+
+def test_generation_is_seeded_and_follows_labelling_rules():
+    generator = DatasetGenerator()
+    first = pd.DataFrame(generator.generate_columns(5000, seed=7))
+    assert first.equals(pd.DataFrame(generator.generate_columns(5000, seed=7)))
+    assert not first.equals(pd.DataFrame(generator.generate_columns(5000, seed=8)))
+
+    rules = {
+        'Cost Overrun': first['contingency_ratio'] < 0.05,
+        'Delay': first['duration_months'] < 12,
+        'Environmental': first['risk_zone'] != 'None',
+        'Resource': first['num_employees'] < 30,
+    }
+    for label, applies in rules.items():
+        assert applies[first['risk_label'] == label].all()
+    any_rule = pd.concat(rules.values(), axis=1).any(axis=1)
+    assert (any_rule == (first['risk_label'] != 'None')).all()
+    assert (first['compliance_score'] == first['guidelines_followed'].astype(int)).all()
+
+
+if __name__ == "__main__":
+    test_written_dataset_matches_training_csv_schema()
+    test_generation_is_seeded_and_follows_labelling_rules()
+    print("Dataset generator tests passed!")
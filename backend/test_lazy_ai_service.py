@@ -0,0 +1,47 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.ai.ai_service import AIService, get_ai_service
+
+
+def test_components_are_created_on_first_use():
+    """
+    A fresh AIService should not build any component until it is accessed
+    """
+    ai_service = AIService()
+    assert ai_service.loaded_components() == []
+
+    ai_service.chatbot
+    assert ai_service.loaded_components() == ['chatbot']
+
+
+def test_concurrent_first_use_creates_one_component():
+    """
+    Threads racing on first access must all see the same component
+    """
+    ai_service = AIService()
+    seen = []
+
+    def access():
+        seen.append(ai_service.chatbot)
+
+    threads = [threading.Thread(target=access) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(component) for component in seen}) == 1
+
+
+def test_get_ai_service_is_shared():
+    assert get_ai_service() is get_ai_service()
+
+
+if __name__ == "__main__":
+    test_components_are_created_on_first_use()
+    test_concurrent_first_use_creates_one_component()
+    test_get_ai_service_is_shared()
+    print("Lazy AI service tests passed!")
@@ -0,0 +1,113 @@
+import sys
+import os
+import glob
+import shutil
+import tempfile
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import numpy as np
+
+import app.ai.model_registry as model_registry
+from app.ai.ai_service import AIService
+from app.ai.model_registry import LocalModelRegistry, MODELS_DIR
+from app.ai.risk_predictor import RiskPredictor
+
+FEATURES = {'contingency_ratio': 0.07, 'duration_months': 18, 'num_employees': 150}
+
+
+def copy_models(target_dir: str, pattern: str = 'xgboost_*_model.*'):
+    os.makedirs(target_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(MODELS_DIR, pattern)):
+        shutil.copy2(path, target_dir)
+
+
+def test_publish_activate_and_load():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'source')
+        copy_models(source)
+        registry = LocalModelRegistry(os.path.join(tmp, 'registry'))
+
+        assert registry.resolve_active() == (None, MODELS_DIR)
+        version = registry.publish(source)
+        assert registry.active_version() is None
+        # Publishing identical files again reuses the version
+        assert registry.publish(source) == version
+
+        registry.activate(version)
+        active, model_dir = registry.resolve_active()
+        assert active == version
+        assert sorted(os.listdir(model_dir)) == sorted(os.listdir(source))
+
+        predictor = RiskPredictor(model_dir, active)
+        assert predictor.model_info()['version'] == version
+        assert predictor.model_info()['load_seconds'] >= 0
+
+        try:
+            registry.activate('no-such-version')
+        except KeyError:
+            return
+        raise AssertionError("Expected KeyError for an unknown version")
+
+
+def test_reload_swaps_predictor_without_failing_requests():
+    """
+    Predictions keep succeeding while the active version changes underneath them
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = LocalModelRegistry(os.path.join(tmp, 'registry'))
+        xgboost_dir = os.path.join(tmp, 'xgboost')
+        forest_dir = os.path.join(tmp, 'forest')
+        copy_models(xgboost_dir)
+        copy_models(forest_dir, 'randomforest_*_model.*')
+        first = registry.publish(xgboost_dir, activate=True)
+        second = registry.publish(forest_dir)
+
+        original_registry = model_registry._registry
+        model_registry._registry = registry
+        try:
+            ai_service = AIService()
+            assert ai_service.risk_predictor.version == first
+
+            errors = []
+            stop = threading.Event()
+
+            def predict():
+                while not stop.is_set():
+                    scores = ai_service.risk_predictor.predict_risks_batch(np.ones((4, 7)))
+                    if scores.shape != (4, 4):
+                        errors.append(scores.shape)
+
+            threads = [threading.Thread(target=predict) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            registry.activate(second)
+            ai_service.reload_risk_predictor()
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            assert not errors
+            assert ai_service.risk_predictor.version == second
+            assert ai_service.risk_predictor.model_info()['model_types'] == ['CompiledEnsemble']
+        finally:
+            model_registry._registry = original_registry
+
+
+def test_incomplete_registries_cannot_be_created():
+    class ManifestOnly(model_registry.ModelRegistry):
+        def read_manifest(self):
+            return {}
+
+    try:
+        ManifestOnly()
+        assert False, "a registry without storage methods was created"
+    except TypeError as error:
+        assert '_store' in str(error)
+
+
+if __name__ == "__main__":
+    test_publish_activate_and_load()
+    test_reload_swaps_predictor_without_failing_requests()
+    test_incomplete_registries_cannot_be_created()
+    print("Model registry tests passed!")
@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.models.ai_models import EnhancedDPRExtraction
+from app.models.dpr import DPRExtraction
+from app.services.risk_calculator import calculate_risk_scores
+from app.utils.normalization import ensure_normalized, normalize_extraction, parse_duration_months, parse_money_inr
+
+
+def test_money_units_and_indian_grouping():
+    assert parse_money_inr("₹1,23,45,678") == 12345678
+    assert parse_money_inr("₹150 crore") == 150e7
+    assert parse_money_inr("Rs. 12.5 Cr.") == 12.5e7
+    assert parse_money_inr("45 lakh") == 45e5
+    assert parse_money_inr("INR 2 million") == 2e6
+    assert parse_money_inr("₹ 1,500.50") == 1500.5
+    assert parse_money_inr("$2 million") is None
+    assert parse_money_inr("not stated") is None
+
+
+def test_duration_units():
+    assert parse_duration_months("18 months") == 18
+    assert parse_duration_months("1 year 6 months") == 18
+    assert parse_duration_months("2.5 years") == 30
+    assert parse_duration_months("24-month") == 24
+    assert parse_duration_months("18") == 18
+    assert parse_duration_months("about six months") is None
+    # A restatement in brackets is not added on
+    assert parse_duration_months("24 months (2 years)") == 24
+    assert parse_duration_months("2 years (24 months)") == 24
+    assert parse_duration_months("(18 months)") == 18
+    # Years and out-of-range bare numbers are not months
+    assert parse_duration_months("April 2024 to March 2026") is None
+    assert parse_duration_months("2024-2026") is None
+    assert parse_duration_months("500") is None
+    assert parse_duration_months("0") is None
+
+
+def test_features_use_normalized_values():
+    from app.ai.ai_service import AIService
+
+    extraction = normalize_extraction(EnhancedDPRExtraction(
+        estimated_cost="₹1,50,00,00,000", contingency="₹10 crore", duration="1.5 years"
+    ))
+    assert extraction.estimated_cost_inr == 150e7 and extraction.duration_months == 18
+    features = AIService().dpr_features(extraction)
+    assert abs(features['contingency_ratio'] - 10 / 150) < 1e-12
+    assert features['duration_months'] == 18
+
+    # Extractions stored before the numeric fields existed are normalized on first use
+    stored = EnhancedDPRExtraction.model_construct(estimated_cost="₹90 lakh", contingency="₹9 lakh", duration="9 months")
+    assert AIService().dpr_features(stored)['contingency_ratio'] == 0.1
+    assert ensure_normalized(stored).duration_months == 9
+
+
+def test_extractions_of_other_models_are_converted():
+    from pydantic import BaseModel
+
+    class OtherExtraction(BaseModel):
+        project_title: str = None
+        estimated_cost: str = None
+        duration: str = None
+
+    extraction = normalize_extraction(OtherExtraction(project_title="Bridge", estimated_cost="₹5 crore",
+                                                      duration="6 months"))
+    assert isinstance(extraction, EnhancedDPRExtraction)
+    assert extraction.project_title == "Bridge" and extraction.estimated_cost_inr == 5e7
+    assert extraction.duration_months == 6
+
+
+def test_risk_calculator_reads_budget_amount():
+    # A crore budget falls in the 20-40 band before the missing-field penalty
+    scores = calculate_risk_scores(DPRExtraction(budget="₹1,20,00,000", budget_inr=1.2e7, timeline="12 months",
+                                                 resource_allocation="x", location="y", environmental_risks="z",
+                                                 project_title="t"))
+    assert 25 <= scores.cost_overruns <= 40
+
+
+if __name__ == "__main__":
+    test_money_units_and_indian_grouping()
+    test_duration_units()
+    test_features_use_normalized_values()
+    test_extractions_of_other_models_are_converted()
+    test_risk_calculator_reads_budget_amount()
+    print("Normalization tests passed!")
@@ -0,0 +1,80 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.ai.ai_service import AIService
+from app.ai.report_store import LocalReportStore
+from app.services.portfolio_risk import OTHER, UNKNOWN, PortfolioSnapshot, portfolio_summary, risk_matrix
+
+
+def make_dpr(state, department, cost, delays, resources=0.5, environment=0.5):
+    scores = {'cost_overruns': cost, 'schedule_delays': delays, 'resource_shortages': resources,
+              'environmental_risks': environment}
+    return {'enhanced_extraction': {'state': state, 'department': department},
+            'ai_risk_scores': {k: v for k, v in scores.items() if v is not None}}
+
+
+DPRS = [
+    make_dpr('Assam', 'Public Works Department', 0.2, 0.4),
+    make_dpr(' assam ', 'public works department', 0.4, 0.8),
+    make_dpr('Assam', 'Power', 0.9, None),
+    make_dpr('Kerala', None, 1.0, 0.0),
+    make_dpr(None, 'Power', 0.0, 0.6, environment=None),
+]
+
+
+def test_matrices_group_case_insensitively():
+    snapshot = PortfolioSnapshot.from_documents(DPRS)
+    assert len(snapshot) == 5
+
+    state = risk_matrix(snapshot, 'state')
+    assert state['labels'] == ['Assam', 'Kerala', UNKNOWN]
+    assert state['counts'] == [3, 1, 1]
+    assert state['means'][0] == [0.5, 0.6, 0.5, 0.5]
+    assert state['means'][2] == [0.0, 0.6, 0.5, None]
+
+    department = risk_matrix(snapshot, 'department')
+    # Ties in size are ordered by name
+    assert department['labels'] == ['Power', 'Public Works Department', UNKNOWN]
+    assert department['counts'] == [2, 2, 1]
+
+    merged = risk_matrix(snapshot, 'state', max_rows=2)
+    assert merged['labels'] == ['Assam', OTHER]
+    assert merged['counts'] == [3, 2]
+    assert merged['means'][1][:2] == [0.5, 0.3]
+
+
+def test_summary_and_empty_portfolio():
+    summary = portfolio_summary(PortfolioSnapshot.from_documents(DPRS))
+    assert summary['dprs'] == 5
+    assert summary['overall'] == [0.5, 0.45, 0.5, 0.5]
+    assert set(summary['matrices']) == {'state', 'department'}
+
+    empty = portfolio_summary(PortfolioSnapshot.from_documents([]))
+    assert empty['dprs'] == 0 and empty['overall'] == [None] * 4
+    assert empty['matrices']['state'] == {'labels': [], 'counts': [], 'means': []}
+
+
+def test_portfolio_report_is_rendered_once_per_summary():
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        store = ai_service.report_store = LocalReportStore(tmp)
+        summary = portfolio_summary(PortfolioSnapshot.from_documents(DPRS * 20))
+        key = ai_service.get_or_generate_portfolio_report(summary)
+        with store.get(key).open() as f:
+            assert f.read(5) == b'%PDF-'
+        assert ai_service.get_or_generate_portfolio_report(summary) == key
+
+        changed = portfolio_summary(PortfolioSnapshot.from_documents(DPRS[:4]))
+        assert ai_service.get_or_generate_portfolio_report(changed) != key
+
+        empty = portfolio_summary(PortfolioSnapshot.from_documents([]))
+        assert store.exists(ai_service.get_or_generate_portfolio_report(empty))
+
+
+if __name__ == "__main__":
+    test_matrices_group_case_insensitively()
+    test_summary_and_empty_portfolio()
+    test_portfolio_report_is_rendered_once_per_summary()
+    print("All portfolio report tests passed")
@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import numpy as np
+
+from app.ai.ai_service import AIService
+from app.ai.prediction_cache import PredictionCache
+from app.models.ai_models import EnhancedDPRExtraction
+
+
+def test_lru_eviction_and_stats():
+    cache = PredictionCache(max_size=2)
+    keys = [cache.key('v1', np.array([i] * 7, dtype=np.float32)) for i in range(3)]
+    cache.put(keys[0], {'a': 0.1})
+    cache.put(keys[1], {'a': 0.2})
+    assert cache.get(keys[0]) == {'a': 0.1}   # keys[0] is now the most recently used
+    cache.put(keys[2], {'a': 0.3})             # evicts keys[1]
+    assert cache.get(keys[1]) is None
+    assert cache.key('v2', np.zeros(7, np.float32)) != cache.key('v1', np.zeros(7, np.float32))
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (1, 1, 1, 2)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_predictions_are_cached_per_model_version():
+    ai_service = AIService()
+    extraction = EnhancedDPRExtraction(estimated_cost="₹100 crore", contingency="₹5 crore", duration="18 months")
+    first = ai_service.predict_dpr_risks(extraction)
+    first['cost_overruns'] = -1.0  # callers get copies
+    second = ai_service.predict_dpr_risks(extraction)
+    assert second['cost_overruns'] != -1.0
+    assert second == ai_service.risk_predictor.predict_risks(ai_service.dpr_features(extraction))
+    assert ai_service.prediction_cache.stats()['hits'] == 1
+
+    # A new model version starts with an empty cache
+    ai_service.reload_risk_predictor()
+    assert ai_service.prediction_cache.stats()['size'] == 0
+    assert ai_service.predict_dpr_risks(extraction) == second
+    assert ai_service.prediction_cache.stats()['misses'] == 2
+
+
+if __name__ == "__main__":
+    test_lru_eviction_and_stats()
+    test_predictions_are_cached_per_model_version()
+    print("Prediction cache tests passed!")
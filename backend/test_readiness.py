@@ -0,0 +1,83 @@
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from fastapi.testclient import TestClient
+
+import main
+from app import database
+from app.ai import ai_service
+
+
+@contextmanager
+def saved_state():
+    """
+    Restore the cached connection and warm-up state the test changes
+    """
+    connection_state = dict(database._connection_state)
+    warm_up_state = dict(ai_service._warm_up_state)
+    try:
+        yield
+    finally:
+        database._connection_state.clear()
+        database._connection_state.update(connection_state)
+        ai_service._warm_up_state.clear()
+        ai_service._warm_up_state.update(warm_up_state)
+
+
+def test_ready_reflects_cached_connection_state():
+    """
+    /ready and /health answer from the cached probe state without querying MongoDB
+    """
+    with saved_state():
+        client = TestClient(main.app)
+
+        database._connection_state.update(connected=False, checked_at=datetime.utcnow(), error="timeout")
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["database"]["error"] == "timeout"
+        assert client.get("/health").json()["database"] == "error: timeout"
+
+        ai_service._warm_up_state["status"] = "done"
+        database._connection_state.update(connected=True, latency_ms=2.5, error=None)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert client.get("/health").json()["database"] == "connected"
+
+
+def test_ready_waits_for_warm_up():
+    with saved_state():
+        client = TestClient(main.app)
+        database._connection_state.update(connected=True, checked_at=datetime.utcnow(), error=None)
+
+        ai_service._warm_up_state["status"] = "running"
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["warm_up"]["status"] == "running"
+
+        ai_service._warm_up_state["status"] = "done"
+        assert client.get("/ready").status_code == 200
+
+
+def test_ready_fails_after_failed_warm_up():
+    with saved_state():
+        client = TestClient(main.app)
+        database._connection_state.update(connected=True, checked_at=datetime.utcnow(), error=None)
+
+        ai_service._warm_up_state.update(status="failed", error="model file missing")
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["warm_up"]["error"] == "model file missing"
+
+        ai_service._warm_up_state["status"] = "disabled"
+        assert client.get("/ready").status_code == 200
+
+
+if __name__ == "__main__":
+    test_ready_reflects_cached_connection_state()
+    test_ready_waits_for_warm_up()
+    test_ready_fails_after_failed_warm_up()
+    print("Readiness tests passed!")
@@ -0,0 +1,110 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from bson import ObjectId
+
+from app.ai.ai_service import AIService
+from app.ai.report_generator import ReportGenerator
+from app.ai.report_store import LocalReportStore
+from app.services.report_materialization import DPRNotAnalysedError, materialize_reports, report_inputs
+
+RISK_SCORES = {'cost_overruns': 0.72, 'schedule_delays': 0.45, 'resource_shortages': 0.21, 'environmental_risks': 0.64}
+
+
+def make_dpr(n):
+    return {'_id': ObjectId(),
+            'enhanced_extraction': {'project_title': f'Road {n}', 'state': 'Assam', 'estimated_cost': f'₹{100 + n} crore'},
+            'ai_risk_scores': RISK_SCORES,
+            'recommendations': [{'improvement_type': 'Budget Rebalance', 'description': 'Increase contingency',
+                                 'priority': 'High'}]}
+
+
+class DPRs:
+    """
+    The find/limit/bulk_write subset of a DPR collection that materialize_reports uses
+    """
+
+    def __init__(self, dprs):
+        self.dprs = dprs
+        self.updates = []
+
+    def find(self, query, projection=None):
+        return self
+
+    def limit(self, n):
+        return DPRs(self.dprs[:n])
+
+    def __iter__(self):
+        return iter(self.dprs)
+
+    def bulk_write(self, ops, ordered=True):
+        self.updates.extend(ops)
+
+
+def test_generators_share_compiled_styles():
+    first, second = ReportGenerator(), ReportGenerator('matplotlib')
+    assert first.custom_styles is second.custom_styles and first.styles is second.styles
+    assert first.custom_styles['Heading'].fontSize == 16
+
+
+def test_worker_pool_renders_what_is_missing():
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        store = ai_service.report_store = LocalReportStore(tmp)
+        dprs = DPRs([make_dpr(n) for n in range(4)])
+
+        stats = materialize_reports(ai_service, dprs, ('analytical',), limit=1)
+        assert (stats['rendered'], stats['stored']) == (1, 0)
+
+        dprs.updates = []
+        stats = materialize_reports(ai_service, dprs, workers=2)
+        assert stats['dprs'] == 4 and stats['failed'] == 0
+        assert (stats['rendered'], stats['stored']) == (7, 1)
+        assert stats['reports_per_minute'] > 0
+        # One update per report rendered by the pool, and the stored one's key
+        recorded = [update._doc['$set'] for update in dprs.updates]
+        assert len(recorded) == 8
+        assert len([r for r in recorded if 'reports.recommendation_report_key' in r]) == 4
+        for update in recorded:
+            key = update.get('reports.recommendation_report_key') or update['reports.analytical_report_key']
+            with store.get(key).open() as f:
+                assert f.read(5) == b'%PDF-'
+
+        assert materialize_reports(ai_service, dprs, workers=2)['stored'] == 8
+
+
+class ReadOnlyReportStore(LocalReportStore):
+    def put(self, key, write):
+        raise OSError('read-only')
+
+
+def test_worker_pool_records_only_rendered_reports():
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        ai_service.report_store = ReadOnlyReportStore(tmp)
+        dprs = DPRs([make_dpr(n) for n in range(2)])
+
+        stats = materialize_reports(ai_service, dprs, workers=1)
+        assert (stats['rendered'], stats['failed']) == (0, 4)
+        assert dprs.updates == []
+
+
+def test_report_inputs_of_unanalysed_dprs():
+    extraction, risk_scores, recommendations = report_inputs(make_dpr(0))
+    assert extraction.project_title == 'Road 0' and risk_scores == RISK_SCORES and len(recommendations) == 1
+    for dpr in ({'_id': 1}, {'_id': 2, 'enhanced_extraction': {'project_title': 'Road'}}):
+        try:
+            report_inputs(dpr)
+            assert False, dpr
+        except DPRNotAnalysedError:
+            pass
+
+
+if __name__ == "__main__":
+    test_generators_share_compiled_styles()
+    test_worker_pool_renders_what_is_missing()
+    test_worker_pool_records_only_rendered_reports()
+    test_report_inputs_of_unanalysed_dprs()
+    print("All report batch tests passed")
@@ -0,0 +1,110 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.ai.ai_service import AIService
+from app.ai.report_cache import parse_report_filename, report_key
+from app.ai.report_store import LocalReportStore
+from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+
+EXTRACTION = EnhancedDPRExtraction(project_title="Road Construction in Assam", duration="18 months",
+                                   estimated_cost="₹150 crore", num_employees=150)
+RISK_SCORES = {'cost_overruns': 0.72, 'schedule_delays': 0.45, 'resource_shortages': 0.21, 'environmental_risks': 0.64}
+RECOMMENDATIONS = [Recommendation(improvement_type="Budget Rebalance", description="Increase contingency", priority="High")]
+
+
+def test_key_covers_every_input():
+    key = report_key('analytical', EXTRACTION, RISK_SCORES, RECOMMENDATIONS, '1/vector')
+    assert key == report_key('analytical', EXTRACTION.model_copy(), dict(reversed(RISK_SCORES.items())),
+                             RECOMMENDATIONS, '1/vector')
+    changed = [
+        report_key('recommendation', EXTRACTION, RISK_SCORES, RECOMMENDATIONS, '1/vector'),
+        report_key('analytical', EXTRACTION.model_copy(update={'state': 'Assam'}), RISK_SCORES, RECOMMENDATIONS,
+                   '1/vector'),
+        report_key('analytical', EXTRACTION, {**RISK_SCORES, 'cost_overruns': 0.73}, RECOMMENDATIONS, '1/vector'),
+        report_key('analytical', EXTRACTION, RISK_SCORES, [], '1/vector'),
+        report_key('analytical', EXTRACTION, RISK_SCORES, RECOMMENDATIONS, '2/vector'),
+    ]
+    assert key not in changed and len(set(changed)) == len(changed)
+
+
+def test_filenames_map_back_to_dpr_and_type():
+    assert parse_report_filename('68e37bbbf42881a132dcc548_Heatmap_Analysis.pdf') == \
+        ('68e37bbbf42881a132dcc548', 'analytical')
+    assert parse_report_filename('dpr1_Recommendations_Report.pdf') == ('dpr1', 'recommendation')
+    assert parse_report_filename('../dpr1_Heatmap_Analysis.pdf') is None
+    assert parse_report_filename('notes.pdf') is None
+
+
+def test_unchanged_reports_are_not_rendered_again():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            ai_service = AIService()
+            store = ai_service.report_store = LocalReportStore(os.path.join(tmp, 'reports'))
+            filename, key = ai_service.get_or_generate_report('analytical', 'dpr1', EXTRACTION, RISK_SCORES,
+                                                              RECOMMENDATIONS)
+            assert filename == 'dpr1_Heatmap_Analysis.pdf'
+            with store.get(key).open() as f:
+                assert f.read(5) == b'%PDF-'
+            # Stored under a sharded path, and nothing written to the working directory
+            assert store.path(key) == os.path.join(tmp, 'reports', key[:2], key[2:4], f'{key}.pdf')
+            assert sorted(os.listdir(tmp)) == ['reports']
+
+            # Same DPR, same inputs: found in the store
+            start = time.perf_counter()
+            assert ai_service.get_or_generate_report('analytical', 'dpr1', EXTRACTION, RISK_SCORES,
+                                                     RECOMMENDATIONS) == (filename, key)
+            assert time.perf_counter() - start < 0.05
+
+            # Another DPR with the same inputs reuses the stored PDF
+            size = store.get(key).size
+            other, other_key = ai_service.get_or_generate_report('analytical', 'dpr2', EXTRACTION, RISK_SCORES,
+                                                                 RECOMMENDATIONS)
+            assert (other, other_key) == ('dpr2_Heatmap_Analysis.pdf', key)
+            assert store.get(key).size == size
+
+            # Changed scores give a new report
+            _, new_key = ai_service.get_or_generate_report('analytical', 'dpr1', EXTRACTION,
+                                                           {**RISK_SCORES, 'cost_overruns': 0.1}, RECOMMENDATIONS)
+            assert new_key != key and store.exists(new_key)
+        finally:
+            os.chdir(cwd)
+
+
+def test_concurrent_first_requests_render_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        store = ai_service.report_store = LocalReportStore(tmp)
+        generator = ai_service.report_generator
+        renders = []
+        render = generator.generate_recommendation_report
+
+        def counted(*args):
+            renders.append(threading.get_ident())
+            time.sleep(0.05)  # keep the first render in flight while the others arrive
+            return render(*args)
+
+        generator.generate_recommendation_report = counted
+        key = ai_service.report_key('recommendation', EXTRACTION, RISK_SCORES, RECOMMENDATIONS)
+        assert not store.exists(key)
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: ai_service.get_or_generate_report(
+                'recommendation', f'dpr{i}', EXTRACTION, RISK_SCORES, RECOMMENDATIONS), range(8)))
+        assert {result_key for _, result_key in results} == {key}
+        assert len(renders) == 1 and store.exists(key)
+        # The lock file goes once the report is stored
+        assert os.listdir(os.path.join(tmp, '.locks')) == []
+
+
+if __name__ == "__main__":
+    test_key_covers_every_input()
+    test_filenames_map_back_to_dpr_and_type()
+    test_unchanged_reports_are_not_rendered_again()
+    test_concurrent_first_requests_render_once()
+    print("Report cache tests passed!")
@@ -0,0 +1,84 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from reportlab.graphics.shapes import Drawing
+from reportlab.platypus import Image
+
+from app.ai.matplotlib_charts import render_charts, shutdown_chart_pool
+from app.ai.report_generator import ReportGenerator
+from app.models.ai_models import EnhancedDPRExtraction, Recommendation
+
+EXTRACTION = EnhancedDPRExtraction(project_title="Road Construction in Assam", duration="18 months",
+                                   estimated_cost="₹150 crore", num_employees=150)
+RISK_SCORES = {'cost_overruns': 0.72, 'schedule_delays': 0.45, 'resource_shortages': 0.05, 'environmental_risks': 0.64}
+RECOMMENDATIONS = [Recommendation(improvement_type="Budget Rebalance", description="Increase contingency", priority="High")]
+
+
+def test_vector_charts_are_drawings():
+    generator = ReportGenerator(chart_backend='vector')
+    for chart in ('risk', 'pie', 'correlation', 'cost_timeline'):
+        assert isinstance(generator._chart(chart, RISK_SCORES, EXTRACTION), Drawing)
+    # Risks at or below 0.1 are left out of the pie, as with matplotlib
+    pie = generator._chart('pie', RISK_SCORES).contents[-1]
+    assert len(pie.data) == 3
+
+
+def test_reports_with_each_backend():
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {}
+        for backend in ('vector', 'matplotlib'):
+            generator = ReportGenerator(chart_backend=backend)
+            path = os.path.join(tmp, f'{backend}.pdf')
+            generator.generate_analytical_report('dpr', EXTRACTION, RISK_SCORES, RECOMMENDATIONS, path)
+            with open(path, 'rb') as f:
+                assert f.read(5) == b'%PDF-'
+            sizes[backend] = os.path.getsize(path)
+        assert isinstance(ReportGenerator(chart_backend='matplotlib')._chart('risk', RISK_SCORES), Image)
+        assert sizes['vector'] * 10 < sizes['matplotlib']
+
+
+def test_reports_render_in_memory():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            generator = ReportGenerator(chart_backend='vector')
+            for report_type in ('analytical', 'recommendation'):
+                pdf = generator.render_report(report_type, 'dpr', EXTRACTION, RISK_SCORES, RECOMMENDATIONS)
+                assert pdf[:5] == b'%PDF-' and pdf.rstrip().endswith(b'%%EOF')
+            assert os.listdir(tmp) == []
+        finally:
+            os.chdir(cwd)
+
+
+def test_unknown_backend_is_rejected():
+    try:
+        ReportGenerator(chart_backend='svg')
+    except ValueError:
+        return
+    assert False, "expected ValueError"
+
+
+def test_chart_pool_matches_serial_rendering():
+    jobs = [('risk', (RISK_SCORES,)), ('pie', (RISK_SCORES,)), ('cost_timeline', (150.0, 18.0))]
+    try:
+        pooled = render_charts(jobs, workers=2)
+    finally:
+        shutdown_chart_pool()
+    serial = render_charts(jobs, workers=0)
+    assert len(pooled) == len(jobs)
+    for png, expected in zip(pooled, serial):
+        assert png[:8] == b'\x89PNG\r\n\x1a\n'
+        # The worker's reused figure draws the same chart as a fresh one
+        assert abs(len(png) - len(expected)) < len(expected) * 0.05
+
+
+if __name__ == "__main__":
+    test_vector_charts_are_drawings()
+    test_reports_with_each_backend()
+    test_reports_render_in_memory()
+    test_unknown_backend_is_rejected()
+    test_chart_pool_matches_serial_rendering()
+    print("Report chart tests passed!")
@@ -0,0 +1,98 @@
+import sys
+import os
+import tempfile
+import anyio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.ai.report_store import LocalReportStore
+from app.utils.stored_file_response import StoredFileResponse, stored_file_response
+
+CONTENT = bytes(range(256)) * 1000
+KEY = 'ab' * 32
+
+
+def _client(store):
+    app = FastAPI()
+
+    @app.get('/report')
+    def report(request: Request):
+        return stored_file_response(request, store.get(KEY), 'dpr1_Heatmap_Analysis.pdf')
+
+    return TestClient(app)
+
+
+def _write(path):
+    with open(path, 'wb') as f:
+        f.write(CONTENT)
+
+
+def test_full_and_conditional_downloads():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalReportStore(tmp)
+        store.put(KEY, _write)
+        client = _client(store)
+
+        response = client.get('/report')
+        assert response.status_code == 200 and response.content == CONTENT
+        assert response.headers['etag'] == f'"{KEY}"'
+        assert response.headers['accept-ranges'] == 'bytes'
+        assert response.headers['content-length'] == str(len(CONTENT))
+        assert 'dpr1_Heatmap_Analysis.pdf' in response.headers['content-disposition']
+
+        response = client.get('/report', headers={'If-None-Match': f'W/"other", "{KEY}"'})
+        assert response.status_code == 304 and response.content == b''
+        assert client.get('/report', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_range_requests():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalReportStore(tmp)
+        store.put(KEY, _write)
+        client = _client(store)
+        size = len(CONTENT)
+
+        response = client.get('/report', headers={'Range': 'bytes=100-299'})
+        assert response.status_code == 206 and response.content == CONTENT[100:300]
+        assert response.headers['content-range'] == f'bytes 100-299/{size}'
+
+        # Open-ended, suffix and over-long ranges
+        assert client.get('/report', headers={'Range': f'bytes={size - 10}-'}).content == CONTENT[-10:]
+        assert client.get('/report', headers={'Range': 'bytes=-500'}).content == CONTENT[-500:]
+        assert client.get('/report', headers={'Range': f'bytes=0-{size * 2}'}).content == CONTENT
+
+        response = client.get('/report', headers={'Range': f'bytes={size}-'})
+        assert response.status_code == 416 and response.headers['content-range'] == f'bytes */{size}'
+
+        # Multiple ranges, and If-Range with a stale ETag, get the whole file
+        assert client.get('/report', headers={'Range': 'bytes=0-1,5-6'}).status_code == 200
+        response = client.get('/report', headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+        assert response.status_code == 200 and response.content == CONTENT
+        assert client.get('/report', headers={'Range': 'bytes=0-9', 'If-Range': f'"{KEY}"'}).status_code == 206
+
+
+def test_zero_copy_send_when_the_server_offers_it():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalReportStore(tmp)
+        store.put(KEY, _write)
+        response = StoredFileResponse(store.get(KEY), 100, 200, 206, {}, 'application/pdf')
+        messages = []
+
+        async def send(message):
+            if message['type'] == 'http.response.zerocopysend':
+                message = dict(message, data=os.pread(message['file'].fileno(), message['count'], message['offset']))
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'extensions': {'http.response.zerocopysend': {}}}
+        anyio.run(response, scope, None, send)
+        assert [m['type'] for m in messages] == ['http.response.start', 'http.response.zerocopysend']
+        assert messages[1]['data'] == CONTENT[100:300]
+
+
+if __name__ == "__main__":
+    test_full_and_conditional_downloads()
+    test_range_requests()
+    test_zero_copy_send_when_the_server_offers_it()
+    print("Report download tests passed!")
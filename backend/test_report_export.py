@@ -0,0 +1,106 @@
+import sys
+import os
+import csv
+import io
+import tempfile
+import zipfile
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from bson import ObjectId
+
+from app.ai.ai_service import AIService
+from app.ai.report_store import LocalReportStore
+from app.services import report_export
+from app.services.report_export import export_query, quarter_range, stream_reports_zip
+
+RISK_SCORES = {'cost_overruns': 0.72, 'schedule_delays': 0.45, 'resource_shortages': 0.21, 'environmental_risks': 0.64}
+
+
+def make_dpr(n, analysed=True):
+    dpr = {'_id': ObjectId(), 'uploaded_at': datetime(2024, 8, n + 1),
+           'extracted_data': {'project_title': f'Bridge {n}'}}
+    if analysed:
+        dpr['enhanced_extraction'] = {'project_title': f'Road {n}', 'state': 'Assam', 'district': 'Kamrup',
+                                      'estimated_cost': f'₹{100 + n} crore', 'duration': '18 months'}
+        dpr['ai_risk_scores'] = RISK_SCORES
+        dpr['recommendations'] = [{'improvement_type': 'Budget Rebalance', 'description': 'Increase contingency',
+                                   'priority': 'High'}, {'bad': 'record'}]
+    return dpr
+
+
+def test_quarters_and_filters():
+    assert quarter_range('2024-Q1') == (datetime(2024, 1, 1), datetime(2024, 4, 1))
+    assert quarter_range('2024-Q4') == (datetime(2024, 10, 1), datetime(2025, 1, 1))
+    for bad in ('2024-Q5', '2024Q1', 'Q3'):
+        try:
+            quarter_range(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    assert export_query() == {}
+    query = export_query(district=' Kamrup (Metro) ', quarter='2024-Q3', uploaded_by='auditor')
+    assert query['enhanced_extraction.district'] == {'$regex': r'^Kamrup\ \(Metro\)$', '$options': 'i'}
+    assert query['uploaded_at'] == {'$gte': datetime(2024, 7, 1), '$lt': datetime(2024, 10, 1)}
+    assert query['uploaded_by'] == 'auditor'
+
+
+def test_export_streams_a_zip_and_renders_missing_reports():
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        ai_service.report_store = LocalReportStore(tmp)
+        dprs = [make_dpr(n) for n in range(5)] + [make_dpr(5, analysed=False)]
+
+        # One report already stored, so it is copied rather than rendered
+        _, stored_key = ai_service.get_or_generate_report(
+            'analytical', str(dprs[0]['_id']), *report_export.report_inputs(dprs[0]))
+
+        old_chunk_size = report_export.CHUNK_SIZE
+        report_export.CHUNK_SIZE = 4096
+        try:
+            stats = {}
+            chunks = list(stream_reports_zip(ai_service, iter(dprs), workers=2, stats=stats))
+        finally:
+            report_export.CHUNK_SIZE = old_chunk_size
+
+        assert stats == {'included': 10, 'rendered': 9, 'skipped': 2}
+        # Streamed piecewise: no chunk much larger than one read plus zip headers
+        assert len(chunks) > 20 and max(len(chunk) for chunk in chunks) < 4096 + 1024
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        assert archive.testzip() is None
+        names = archive.namelist()
+        assert len(names) == 11 and names[-1] == 'index.csv'
+        first = f"{dprs[0]['_id']}_Heatmap_Analysis.pdf"
+        assert names[0] == first
+        with ai_service.report_store.get(stored_key).open() as f:
+            assert archive.read(first) == f.read()
+        assert all(archive.read(name).startswith(b'%PDF-') for name in names[:-1])
+        assert archive.getinfo(first).date_time[:3] == (2024, 8, 1)
+
+        rows = list(csv.DictReader(io.StringIO(archive.read('index.csv').decode('utf-8'))))
+        assert len(rows) == 12
+        assert rows[0]['project_title'] == 'Road 0' and rows[0]['district'] == 'Kamrup'
+        assert rows[0]['status'] == 'included' and rows[0]['file'] == first
+        skipped = [row for row in rows if row['dpr_id'] == str(dprs[5]['_id'])]
+        assert [row['status'] for row in skipped] == ['not analysed', 'not analysed']
+        assert skipped[0]['project_title'] == 'Bridge 5' and skipped[0]['file'] == ''
+
+
+def test_export_of_one_report_type():
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_service = AIService()
+        ai_service.report_store = LocalReportStore(tmp)
+        stats = {}
+        data = b''.join(stream_reports_zip(ai_service, [make_dpr(0)], ['recommendation'], stats=stats))
+        names = zipfile.ZipFile(io.BytesIO(data)).namelist()
+        assert len(names) == 2 and names[0].endswith('_Recommendations_Report.pdf')
+        assert stats['included'] == 1
+
+
+if __name__ == "__main__":
+    test_quarters_and_filters()
+    test_export_streams_a_zip_and_renders_missing_reports()
+    test_export_of_one_report_type()
+    print("All report export tests passed")
@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.ai.ai_service import AIService
+from app.ai.report_payload import ReportPayloadCache, analytical_payload, payload_key
+from app.models.ai_models import EnhancedDPRExtraction
+
+EXTRACTION_DATA = {'project_title': 'Road Construction in Assam', 'state': 'Assam', 'duration': '18 months',
+                   'estimated_cost': '₹150 crore', 'num_employees': 150}
+RISK_SCORES = {'cost_overruns': 0.72, 'schedule_delays': 0.45, 'resource_shortages': 0.21, 'environmental_risks': 0.04}
+
+
+def test_payload_has_the_analytical_report_sections():
+    payload = analytical_payload('dpr1', EnhancedDPRExtraction(**EXTRACTION_DATA), RISK_SCORES)
+    assert payload['project_info']['project_title'] == 'Road Construction in Assam'
+    assert payload['project_info']['department'] is None
+    assert payload['insights']['num_employees'] == 150
+    assert [risk['level'] for risk in payload['risks']] == ['High Risk', 'Medium Risk', 'Low Risk', 'Low Risk']
+
+    # Pie chart shares leave out scores of 0.1 and below
+    assert set(payload['risk_distribution']) == {'cost_overruns', 'schedule_delays', 'resource_shortages'}
+    assert abs(sum(payload['risk_distribution'].values()) - 1) < 1e-9
+    matrix = payload['correlation']['matrix']
+    assert len(matrix) == 4 and matrix[0][0] == 1.0 and abs(matrix[0][1] - 0.73) < 1e-9
+
+    relationships = payload['risk_relationships']
+    assert relationships['highest'] == {'risk_type': 'cost_overruns', 'score': 0.72}
+    assert relationships['lowest']['risk_type'] == 'environmental_risks'
+    assert relationships['level'] == 'LOW'
+    assert payload['data_quality'] == {'missing': ['Complete timeline information'], 'complete': False}
+    assert abs(payload['overall_quality']['score'] - 0.355) < 1e-9
+    assert payload['overall_quality']['rating'] == 'Good'
+    json.dumps(payload)
+
+
+def test_payload_is_cached_per_analysis():
+    ai_service = AIService()
+    key, body = ai_service.analytical_payload_json('dpr1', EXTRACTION_DATA, RISK_SCORES)
+    assert json.loads(body)['dpr_id'] == 'dpr1'
+    assert ai_service.analytical_payload_json('dpr1', dict(reversed(EXTRACTION_DATA.items())), RISK_SCORES) == \
+        (key, body)
+    assert ai_service.report_payload_cache.stats()['hits'] == 1
+
+    rescored = ai_service.analytical_payload_json('dpr1', EXTRACTION_DATA, {**RISK_SCORES, 'cost_overruns': 0.3})
+    assert rescored[0] != key and json.loads(rescored[1])['risks'][0]['level'] == 'Low Risk'
+    # Same analysis on another DPR: its own ID in the payload
+    assert payload_key('dpr2', EXTRACTION_DATA, RISK_SCORES) != key
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ReportPayloadCache(max_size=2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    assert cache.get('a') == b'1'
+    cache.put('c', b'3')
+    assert cache.get('b') is None and cache.get('a') == b'1' and cache.get('c') == b'3'
+    assert cache.stats()['size'] == 2
+
+
+if __name__ == "__main__":
+    test_payload_has_the_analytical_report_sections()
+    test_payload_is_cached_per_analysis()
+    test_cache_evicts_least_recently_used()
+    print("All report payload tests passed")
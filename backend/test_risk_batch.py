@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import numpy as np
+
+from app.ai.risk_predictor import RiskPredictor, TARGETS
+
+
+def test_batch_matches_single_predictions():
+    """
+    predict_risks_batch returns one row per DPR matching predict_risks
+    """
+    predictor = RiskPredictor()
+    rows = [
+        {'contingency_ratio': 0.07, 'duration_months': 18, 'num_employees': 150, 'num_machinery': 3,
+         'num_materials': 5, 'compliance_score': 1, 'missing_docs_count': 0},
+        {'contingency_ratio': 0.01, 'duration_months': 6, 'num_employees': 10},
+    ]
+    X = np.vstack([predictor.features_to_array(row) for row in rows])
+
+    scores = predictor.predict_risks_batch(X)
+    assert scores.shape == (2, len(TARGETS))
+    assert ((scores >= 0) & (scores <= 1)).all()
+
+    for row, batch_scores in zip(rows, scores):
+        single = predictor.predict_risks(row)
+        assert list(single) == TARGETS
+        assert np.allclose([single[target] for target in TARGETS], batch_scores)
+
+
+def test_batch_rejects_wrong_feature_count():
+    predictor = RiskPredictor()
+    try:
+        predictor.predict_risks_batch(np.zeros((3, 5)))
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for a (3, 5) feature matrix")
+
+
+def test_multi_output_model_predicts_every_target():
+    """
+    A multi-output model replaces the per-target models column for column
+    """
+    predictor = RiskPredictor()
+    X, y = predictor.prepare_data(os.path.join(os.path.dirname(__file__), 'dpr_training_dataset.csv'))
+    assert list(y.columns) == TARGETS
+    assert set(np.unique(y.to_numpy())) <= {0.0, 1.0}
+
+    import xgboost as xgb
+    model = xgb.XGBRegressor(n_estimators=10, max_depth=3, tree_method='hist',
+                             multi_strategy='multi_output_tree').fit(X, y)
+    predictor.models = {}
+    predictor.multi_output_model = model
+
+    scores = predictor.predict_risks_batch(X.to_numpy()[:5])
+    assert np.allclose(scores, np.clip(model.predict(X.to_numpy()[:5]), 0, 1))
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_predictions()
+    test_batch_rejects_wrong_feature_count()
+    test_multi_output_model_predicts_every_target()
+    print("Batch risk prediction tests passed!")
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import numpy as np
+from bson import ObjectId
+
+from app.models.dpr import DPRExtraction
+from app.services.risk_calculator import (
+    RISK_TYPES, SCORED_FIELDS, calculate_risk_scores, calculate_risk_scores_batch, extraction_columns
+)
+from app.services.risk_rescoring import build_legacy_updates
+
+EXTRACTIONS = [
+    DPRExtraction(project_title="Road", budget="₹50 lakh", timeline="18 months", resource_allocation="x",
+                  location="Assam", environmental_risks="Flood"),
+    DPRExtraction(project_title="Bridge", budget="₹1,20,00,00,000", budget_inr=1.2e9, timeline="2 years"),
+    DPRExtraction(budget="to be decided"),
+    DPRExtraction(),
+]
+
+
+def test_scores_are_reproducible_and_batch_independent():
+    ids = [f"dpr-{i}" for i in range(len(EXTRACTIONS))]
+    columns = extraction_columns(EXTRACTIONS)
+    budget_inr = columns.pop('budget_inr')
+    batch = calculate_risk_scores_batch(columns, budget_inr, ids)
+
+    for i, (extraction, dpr_id) in enumerate(zip(EXTRACTIONS, ids)):
+        single = calculate_risk_scores(extraction, dpr_id)
+        assert single == calculate_risk_scores(extraction, dpr_id)
+        for risk_type in RISK_TYPES:
+            assert getattr(single, risk_type) == batch[risk_type][i]
+
+    # Scores do not depend on the other DPRs in the batch
+    reversed_columns = {field: values[::-1] for field, values in columns.items()}
+    reversed_batch = calculate_risk_scores_batch(reversed_columns, budget_inr[::-1], ids[::-1])
+    for risk_type in RISK_TYPES:
+        assert np.array_equal(reversed_batch[risk_type][::-1], batch[risk_type])
+
+    # Without an ID the extraction's content seeds the variation
+    alone = calculate_risk_scores(EXTRACTIONS[3])
+    assert alone == calculate_risk_scores(DPRExtraction())
+    assert alone != calculate_risk_scores(DPRExtraction(technical_sections=["Drainage"]))
+
+    # A different seed gives different variation
+    assert not np.array_equal(calculate_risk_scores_batch(columns, budget_inr, ids, seed=7)['cost_overruns'],
+                              batch['cost_overruns'])
+
+
+def test_score_bands_follow_the_rules():
+    n = 10_000
+    rng = np.random.default_rng(0)
+    present = {field: rng.random(n) < 0.5 for field in SCORED_FIELDS}
+    budget_inr = np.where(rng.random(n) < 0.2, np.nan, rng.uniform(1e5, 1e9, n))
+    scores = calculate_risk_scores_batch(present, budget_inr, [str(i) for i in range(n)])
+
+    missing = len(SCORED_FIELDS) - np.sum([present[field] for field in SCORED_FIELDS], axis=0)
+    complete = missing < 2
+    large = present['budget'] & (budget_inr >= 1e7) & complete
+    assert np.all((scores['cost_overruns'][large] >= 25) & (scores['cost_overruns'][large] < 40))
+    no_budget = ~present['budget']
+    assert np.all(scores['cost_overruns'][no_budget] >= 80)
+    for risk_type in RISK_TYPES:
+        assert np.all((scores[risk_type] >= 0) & (scores[risk_type] <= 100))
+
+
+def test_legacy_updates_match_upload_scores():
+    dprs = [{'_id': ObjectId(), 'extracted_data': extraction.model_dump()} for extraction in EXTRACTIONS]
+    for dpr, op, extraction in zip(dprs, build_legacy_updates(dprs), EXTRACTIONS):
+        assert op._filter == {'dpr_id': str(dpr['_id'])}
+        assert op._doc['$set']['risk_scores'] == calculate_risk_scores(extraction, str(dpr['_id'])).model_dump()
+
+
+if __name__ == "__main__":
+    test_scores_are_reproducible_and_batch_independent()
+    test_score_bands_follow_the_rules()
+    test_legacy_updates_match_upload_scores()
+    print("Risk calculator tests passed!")
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from bson import ObjectId
+
+from app.ai.ai_service import get_ai_service
+from app.models.ai_models import EnhancedDPRExtraction
+from app.services.risk_rescoring import build_updates
+
+EXTRACTIONS = [
+    {'project_title': 'Road Construction in Assam', 'estimated_cost': '₹150 crore', 'contingency': '₹10 crore',
+     'duration': '18 months', 'num_employees': 150, 'state': 'Assam', 'guidelines_followed': True,
+     'machinery': ['Excavator', 'Roller']},
+    {'project_title': 'Bridge', 'duration': '2 years', 'num_employees': 20, 'missing_documents': ['EIA']},
+    {},
+]
+
+
+def test_bulk_updates_match_single_assessment():
+    """
+    Bulk rescoring writes the same scores and recommendations as assess_with_ai
+    """
+    ai_service = get_ai_service()
+    dprs = [{'_id': ObjectId(), 'enhanced_extraction': data} for data in EXTRACTIONS]
+
+    risk_ops, dpr_ops = build_updates(dprs, ai_service)
+    assert len(risk_ops) == len(dpr_ops) == len(dprs)
+
+    for dpr, risk_op, dpr_op in zip(dprs, risk_ops, dpr_ops):
+        extraction = EnhancedDPRExtraction(**dpr['enhanced_extraction'])
+        expected_scores = ai_service.predict_dpr_risks(extraction)
+        completeness = ai_service.calculate_completeness_score(extraction)
+        expected_recommendations = [
+            rec.dict() for rec in ai_service.generate_recommendations(expected_scores, completeness)
+        ]
+
+        risk_doc = risk_op._doc['$set']
+        assert risk_op._filter == {'dpr_id': str(dpr['_id'])}
+        assert risk_op._upsert
+        assert risk_doc['risk_scores'] == expected_scores
+        assert risk_doc['recommendations'] == expected_recommendations
+        assert risk_doc['completeness_score'] == completeness
+
+        assert dpr_op._filter == {'_id': dpr['_id']}
+        assert dpr_op._doc['$set']['ai_risk_scores'] == expected_scores
+
+
+if __name__ == "__main__":
+    test_bulk_updates_match_single_assessment()
+    print("Risk rescoring tests passed!")
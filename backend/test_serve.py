@@ -0,0 +1,59 @@
+import sys
+import os
+import http.client
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from serve import Master, PreloadResponder
+
+
+def test_preload_responder_answers_health_checks():
+    """
+    While the models load, /health and /healthz get 200 and everything else 503
+    """
+    master = Master(None, '127.0.0.1', 0, 1)
+    master.bind()
+    responder = PreloadResponder(master.sock)
+    responder.start()
+    try:
+        port = master.sock.getsockname()[1]
+        for path, status in (('/health', 200), ('/healthz', 200), ('/ready', 503), ('/api/dprs?limit=5', 503)):
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', path)
+            response = conn.getresponse()
+            assert response.status == status, path
+            assert b'"warm_up": "loading"' in response.read()
+            if status == 503:
+                assert response.getheader('Retry-After') == '5'
+            conn.close()
+    finally:
+        responder.stop()
+        master.sock.close()
+
+
+def test_wait_until_ready():
+    """
+    A worker is ready once it writes to its pipe; without that the wait times out
+    """
+    master = Master(None, '127.0.0.1', 0, 1)
+    # No child processes here, so _reap finds nothing and the fake pid stays registered
+    pid = os.getpid()
+
+    ready_read, ready_write = os.pipe()
+    master.workers[pid] = ready_read
+    start = time.monotonic()
+    assert not master.wait_until_ready(pid, timeout=0.3)
+    assert time.monotonic() - start >= 0.3
+
+    os.write(ready_write, b"1")
+    assert master.wait_until_ready(pid, timeout=5)
+    os.close(ready_read)
+    os.close(ready_write)
+
+    assert not master.wait_until_ready(12345, timeout=5)
+
+
+if __name__ == "__main__":
+    test_preload_responder_answers_health_checks()
+    test_wait_until_ready()
+    print("All serve tests passed")
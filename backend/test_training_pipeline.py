@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.ai.risk_predictor import RiskPredictor, TARGETS
+from app.ai.training_pipeline import REPORT_FILE, train_from_dataset
+
+DATASET = os.path.join(os.path.dirname(__file__), 'dpr_training_dataset.csv')
+
+
+def test_train_from_dataset_writes_models_and_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, 'models')
+        cache_dir = os.path.join(tmp, 'cache')
+        params = {'n_estimators': 30}
+
+        report = train_from_dataset(DATASET, output_dir, workers=1, params=params, cache_dir=cache_dir)
+        assert report['rows'] == 1000
+        assert not report['feature_cache_hit']
+        assert [result['model'] for result in report['models']] == TARGETS
+        for result in report['models']:
+            assert result['seconds'] > 0
+            assert 1 <= result['trees'] <= 30
+
+        with open(os.path.join(output_dir, REPORT_FILE)) as f:
+            assert json.load(f)['models'] == report['models']
+
+        predictor = RiskPredictor(output_dir)
+        assert sorted(predictor.models) == sorted(TARGETS)
+
+        # The prepared feature matrix is reused
+        assert train_from_dataset(DATASET, output_dir, workers=1, params=params, cache_dir=cache_dir)['feature_cache_hit']
+
+
+def test_multi_output_training_replaces_per_target_models():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, 'models')
+        cache_dir = os.path.join(tmp, 'cache')
+        report = train_from_dataset(DATASET, output_dir, multi_output=True, workers=1,
+                                    params={'n_estimators': 30}, cache_dir=cache_dir)
+        assert report['models'][0]['targets'] == TARGETS
+
+        predictor = RiskPredictor(output_dir)
+        assert predictor.multi_output_model is not None
+        assert predictor.predict_risks_batch([[0.05, 12, 50, 3, 5, 1, 0]]).shape == (1, len(TARGETS))
+
+
+if __name__ == "__main__":
+    test_train_from_dataset_writes_models_and_report()
+    test_multi_output_training_replaces_per_target_models()
+    print("Training pipeline tests passed!")
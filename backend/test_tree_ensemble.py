@@ -0,0 +1,79 @@
+import sys
+import os
+import tempfile
+import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import joblib
+import numpy as np
+
+from app.ai.tree_ensemble import CompiledEnsemble, compile_model
+from app.ai.risk_predictor import TARGETS
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
+
+
+def random_rows(n: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.uniform(0.0, 0.3, n),
+        rng.integers(6, 37, n),
+        rng.integers(10, 201, n),
+        rng.integers(2, 6, n),
+        rng.integers(2, 7, n),
+        rng.integers(0, 2, n),
+        rng.integers(0, 3, n),
+    ]).astype(np.float32)
+    return X
+
+
+def load_pickle(path: str):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(path)
+
+
+def test_compiled_models_match_originals():
+    """
+    Compiled XGBoost and random forest models predict exactly what the originals do
+    """
+    X = random_rows(5000)
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in ('xgboost', 'randomforest'):
+            for target in TARGETS:
+                model = load_pickle(os.path.join(MODELS_DIR, f'{kind}_{target}_model.pkl'))
+                path = os.path.join(tmp, f'{kind}_{target}.npz')
+                compile_model(model).save(path)
+                compiled = CompiledEnsemble.load(path)
+
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    expected = model.predict(X)
+                assert np.array_equal(compiled.predict(X), expected.astype(np.float64)), (kind, target)
+
+
+def test_missing_values_follow_default_direction():
+    model = load_pickle(os.path.join(MODELS_DIR, 'xgboost_cost_overruns_model.pkl'))
+    X = random_rows(500)
+    X[::3, 2] = np.nan
+    X[::5, 0] = np.nan
+    assert np.array_equal(compile_model(model).predict(X), model.predict(X).astype(np.float64))
+
+
+def test_multi_output_model_matches_original():
+    import xgboost as xgb
+
+    X = random_rows(1000)
+    Y = np.random.default_rng(1).random((1000, len(TARGETS)))
+    model = xgb.XGBRegressor(n_estimators=20, max_depth=4, tree_method='hist',
+                             multi_strategy='multi_output_tree').fit(X, Y)
+    compiled = compile_model(model)
+    assert compiled.n_outputs == len(TARGETS)
+    assert np.array_equal(compiled.predict(X), model.predict(X).astype(np.float64))
+
+
+if __name__ == "__main__":
+    test_compiled_models_match_originals()
+    test_missing_values_follow_default_direction()
+    test_multi_output_model_matches_original()
+    print("Compiled tree ensemble tests passed!")
@@ -1,145 +1,62 @@
-# train_risk_label_model.py
+# train_risk_model.py
+"""
+Train the risk prediction models served by RiskPredictor
+
+Trains one XGBoost regressor per risk target (or one multi-output model) in
+parallel processes, with early stopping on a validation split, and saves
+them with their compiled copies to --output. A training report with the wall
+time, trees kept and validation RMSE of every target is written to
+--output/training_report.json.
+
+Datasets without target columns (like dpr_training_dataset.csv) are trained
+on 0/1 targets derived from risk_label. The prepared feature matrix is cached,
+so retraining on the same file skips parsing it.
+
+Usage:
+    python train_risk_model.py [--dataset dpr_training_dataset.csv] [--output models]
+                               [--workers 4] [--multi-output] [--max-trees 1000]
+"""
+import argparse
 import os
-import json
-import numpy as np
-import pandas as pd
-import joblib
 
-from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.ensemble import RandomForestClassifier
+from app.ai.model_registry import MODELS_DIR
+from app.ai.training_pipeline import DEFAULT_PARAMS, VALIDATION_FRACTION, REPORT_FILE, train_from_dataset
 
-RANDOM_STATE = 42
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# ❗ Use your uploaded dataset (ChatGPT environment)
-DATA_PATH = "/mnt/data/dpr_training_dataset.csv"
 
-# Clean model directory management
-MODEL_DIR = "./models"
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-# Features used for training (must be present in dataset)
-FEATURE_COLS = [
-    'contingency_ratio',
-    'duration_months',
-    'num_employees',
-    'num_machinery',
-    'num_materials',
-    'compliance_score',
-    'missing_docs_count'
-]
-
-def load_and_prepare(df_path: str):
-    """Loads and prepares the data for training."""
-    df = pd.read_csv(df_path)
-
-    print(f"\n📊 Dataset Loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-    print("Columns in dataset:", df.columns.tolist())
-
-    # Validate required columns
-    missing_feats = [c for c in FEATURE_COLS if c not in df.columns]
-    if missing_feats:
-        raise RuntimeError(f"Missing feature columns: {missing_feats}")
-
-    if 'risk_label' not in df.columns:
-        raise RuntimeError("❌ Target column 'risk_label' not found in dataset.")
-
-    # Drop rows with missing target
-    df_clean = df.dropna(subset=['risk_label']).copy()
-
-    # Process features
-    X = df_clean[FEATURE_COLS].copy()
-    X = X.apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    # Process target labels
-    y = df_clean['risk_label'].astype(str).copy()
-
-    return X, y, df_clean
-
-
-def build_classifier():
-    """Builds XGBoost if available, else falls back to RandomForest."""
-    try:
-        import xgboost as xgb
-        print("\n🟢 Using XGBoost Classifier")
-        return xgb.XGBClassifier(
-            n_estimators=400,
-            max_depth=6,
-            learning_rate=0.03,
-            subsample=0.9,
-            colsample_bytree=0.9,
-            random_state=RANDOM_STATE,
-            use_label_encoder=False,
-            eval_metric='mlogloss',
-            n_jobs=4
-        )
-    except Exception as e:
-        print("\n🟡 XGBoost unavailable. Falling back to RandomForest.")
-        return RandomForestClassifier(n_estimators=250, random_state=RANDOM_STATE)
-
-
-def train_and_evaluate(X, y, clf):
-    """Train and evaluate the model."""
-    print("\n🔄 Encoding target labels...")
-    le = LabelEncoder()
-    y_enc = le.fit_transform(y)
-
-    print("Classes found:", le.classes_)
-
-    # Stable split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y_enc, test_size=0.2, random_state=RANDOM_STATE, stratify=y_enc
-    )
-
-    print("\n🧪 Performing 5-Fold Cross Validation...")
-    skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE)
-    cv_scores = cross_val_score(clf, X, y_enc, cv=skf, scoring='accuracy')
-
-    print(f"📈 CV Accuracy Mean: {cv_scores.mean():.4f} | Std: {cv_scores.std():.4f}")
-
-    # Model training with early stopping (if supported)
-    try:
-        clf.fit(X_train, y_train, eval_set=[(X_test, y_test)],
-                early_stopping_rounds=10, verbose=False)
-    except TypeError:
-        clf.fit(X_train, y_train)
-
-    # Evaluate
-    y_pred = clf.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
-    print(f"\n🎯 Final Test Accuracy: {acc:.4f}\n")
-    
-    print("📘 Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=le.classes_))
-    
-    print("\n📊 Confusion Matrix:")
-    print(confusion_matrix(y_test, y_pred))
-
-    return clf, le
-
-
-def save_model(model, label_encoder):
-    """Save model, encoder & training summary."""
-    model_path = os.path.join(MODEL_DIR, "risk_label_model.pkl")
-    le_path = os.path.join(MODEL_DIR, "risk_label_encoder.pkl")
-
-    joblib.dump(model, model_path)
-    joblib.dump(label_encoder, le_path)
-
-    print("\n💾 Model Saved To:", model_path)
-    print("💾 Label Encoder Saved To:", le_path)
+def print_report(report: dict) -> None:
+    print(f"\n📊 {report['rows']:,} rows, feature cache {'hit' if report['feature_cache_hit'] else 'miss'} "
+          f"(prepare {report['prepare_seconds']:.2f}s)")
+    print(f"{'model':<22} {'seconds':>9} {'trees':>7}  validation RMSE")
+    for result in report['models']:
+        rmse = ", ".join(f"{target} {value:.4f}" for target, value in result['validation_rmse'].items())
+        print(f"{result['model']:<22} {result['seconds']:>9.2f} {result['trees']:>7}  {rmse}")
+    print(f"Wall time: {report['wall_seconds']:.2f}s")
 
 
 def main():
-    print("\n🚀 Starting Risk Label Model Training...\n")
-    
-    X, y, df_clean = load_and_prepare(DATA_PATH)
-    clf = build_classifier()
-    model, le = train_and_evaluate(X, y, clf)
-    save_model(model, le)
-
-    print("\n✨ Training Completed Successfully!")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=os.path.join(BACKEND_DIR, "dpr_training_dataset.csv"))
+    parser.add_argument("--output", default=MODELS_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="training processes (default: one per core)")
+    parser.add_argument("--multi-output", action="store_true", help="train one model for all targets")
+    parser.add_argument("--max-trees", type=int, default=DEFAULT_PARAMS['n_estimators'])
+    parser.add_argument("--validation-fraction", type=float, default=VALIDATION_FRACTION)
+    args = parser.parse_args()
+
+    print("\n🚀 Starting risk model training...")
+    report = train_from_dataset(
+        args.dataset,
+        output_dir=args.output,
+        multi_output=args.multi_output,
+        workers=args.workers,
+        params={'n_estimators': args.max_trees},
+        validation_fraction=args.validation_fraction
+    )
+    print_report(report)
+    print(f"\n💾 Models and {REPORT_FILE} saved to {args.output}")
+    print("Publish them with: python manage_models.py publish --activate")
 
 
 if __name__ == "__main__":